@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+End-to-end benchmark of twccli commands against the local mock gateway.
+
+Every scenario runs `twccli` in a fresh process, with TWCC_API_HOST and
+TWCC_COS_ENDPOINT pointed at `mock_gateway.py`, and records the wall time
+and the number of API / COS requests it made.
+
+    python benchmarks/bench_commands.py --files 10000 --latency 0.02
+    python benchmarks/bench_commands.py --only ls-vcs ls-ccs --json before.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_gateway import MockCos, MockGateway, write_data_path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUCKET = "bench"
+
+
+def mk_files(path, num, size=64):
+    for idx in range(num):
+        sub = os.path.join(path, "d%02d" % (idx % 16))
+        if not os.path.isdir(sub):
+            os.makedirs(sub)
+        with open(os.path.join(sub, "f%06d.bin" % idx), "wb") as fn:
+            fn.write(b"x" * size)
+
+
+def scenarios(gateway, args, src_dir):
+    ccs_ids = [
+        str(x["id"])
+        for x in gateway.store["sites"].values()
+        if x["_platform"] == gateway.clusters["CNTR"]
+    ][: args.ccs_ids]
+    return [
+        ("ls-vcs", ["ls", "vcs", "-all"]),
+        ("ls-ccs", ["ls", "ccs"] + ccs_ids),
+        (
+            "cp-cos",
+            ["cp", "cos", "-bkt", BUCKET, "-dir", src_dir, "-sync", "to-cos"],
+        ),
+        ("rm-cos", ["rm", "cos", "-bkt", BUCKET, "-r", "-f"]),
+    ]
+
+
+def run_twccli(cli_args, env):
+    cmd = [sys.executable, "-c", "from twccli.twccli import cli; cli()"] + cli_args
+    start_time = time.time()
+    proc = subprocess.run(
+        cmd,
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    return time.time() - start_time, proc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sites", type=int, default=1000, help="VCS / CCS sites each")
+    parser.add_argument("--ccs-ids", type=int, default=50, help="ids for `ls ccs`")
+    parser.add_argument("--files", type=int, default=10000, help="files for `cp cos`")
+    parser.add_argument("--latency", type=float, default=0.0, help="sec per API call")
+    parser.add_argument(
+        "--cos-latency", type=float, default=0.0, help="sec per COS call"
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--only", nargs="+", help="scenario names to run")
+    parser.add_argument("--json", dest="json_out", help="write results to this file")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="twccli-bench-")
+    data_path = os.path.join(work_dir, "twcc_data")
+    src_dir = os.path.join(work_dir, "upload")
+    gateway = MockGateway(
+        latency=args.latency, sizes={"vcs": args.sites, "ccs": args.sites}
+    )
+    cos = MockCos(latency=args.cos_latency, buckets=[BUCKET])
+    write_data_path(data_path, gateway)
+    mk_files(src_dir, args.files)
+
+    env = dict(os.environ)
+    env.update(
+        {
+            "TWCC_DATA_PATH": data_path,
+            "TWCC_API_HOST": gateway.url,
+            "TWCC_COS_ENDPOINT": cos.url,
+            "PYTHONPATH": ROOT,
+        }
+    )
+    for key in ("_TWCC_API_KEY_", "_TWCC_PROJECT_CODE_", "TWCC_CLI_CACHE"):
+        env.pop(key, None)
+
+    results = []
+    print(
+        "%-8s %10s %10s %10s  %s"
+        % ("scenario", "wall(s)", "api reqs", "cos reqs", "top requests")
+    )
+    try:
+        with gateway, cos:
+            for name, cli_args in scenarios(gateway, args, src_dir):
+                if args.only and not name in args.only:
+                    continue
+                for run in range(args.repeat):
+                    gateway.reset()
+                    cos.reset()
+                    wall, proc = run_twccli(cli_args, env)
+                    counts = dict(gateway.counts)
+                    counts.update(cos.counts)
+                    top = sorted(counts.items(), key=lambda x: -x[1])[:3]
+                    results.append(
+                        {
+                            "scenario": name,
+                            "run": run,
+                            "wall": round(wall, 3),
+                            "api_requests": gateway.total(),
+                            "cos_requests": cos.total(),
+                            "requests": counts,
+                            "returncode": proc.returncode,
+                        }
+                    )
+                    print(
+                        "%-8s %10.3f %10d %10d  %s"
+                        % (
+                            name,
+                            wall,
+                            gateway.total(),
+                            cos.total(),
+                            ", ".join(["%s: %d" % x for x in top]),
+                        )
+                    )
+                    if not proc.returncode == 0:
+                        print(proc.stderr.decode("utf8", "replace")[-2000:])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json_out:
+        with open(args.json_out, "w") as fn:
+            json.dump(
+                {"args": vars(args), "results": results}, fn, indent=2, sort_keys=True
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Rendering benchmark for `twccli.twcc.util.table_layout`.
+
+Rows are shaped like the output of `twccli ls vcs -all` and `twccli ls cos`,
+so this measures the table rendering alone without any API round-trip.
+
+    python benchmarks/bench_table_layout.py --rows 10000 100000
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from twccli.twcc.util import (
+    _table_layout_arrange_table_info,
+    _table_layout_data_cell_layout,
+    stream_table_layout,
+    table_layout,
+)
+
+
+def mk_vcs_rows(num):
+    return [
+        {
+            "id": 100000 + idx,
+            "name": "vcs-%06d" % idx,
+            "public_ip": "203.145.%d.%d" % (idx // 256 % 256, idx % 256),
+            "create_time": "2022-01-01 00:00:%02d" % (idx % 60),
+            "status": "Ready" if idx % 7 else "Error",
+            "Protected": " ",
+            "user": {"username": "u%04d" % (idx % 50), "display_name": "user"},
+        }
+        for idx in range(num)
+    ]
+
+
+def mk_cos_rows(num):
+    return [
+        {
+            "LastModified": "01/01/2022 00:00:%02d" % (idx % 60),
+            "Key": "dataset/part-%06d.tfrecord" % idx,
+            "Size": "%d.0 MiB" % (idx % 512),
+            "Versioning": 1,
+        }
+        for idx in range(num)
+    ]
+
+
+BENCHES = [
+    (
+        "ls vcs -all",
+        mk_vcs_rows,
+        [
+            "id",
+            "name",
+            "public_ip",
+            "create_time",
+            "status",
+            "Protected",
+            "user.username",
+        ],
+    ),
+    ("ls cos", mk_cos_rows, ["LastModified", "Key", "Size", "Versioning"]),
+]
+
+
+def timeit(func, *args, **kwargs):
+    start_time = time.time()
+    func(*args, **kwargs)
+    return time.time() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(
+        "%-12s %8s %10s %10s %10s %10s"
+        % ("case", "rows", "arrange", "cells", "total", "stream")
+    )
+    for name, mk_rows, cols in BENCHES:
+        for num in args.rows:
+            rows = mk_rows(num)
+            t_arrange = timeit(_table_layout_arrange_table_info, rows, cols)
+            table_info = _table_layout_arrange_table_info(rows, cols)
+            t_cells = timeit(_table_layout_data_cell_layout, table_info, is_warp=False)
+            t_total = timeit(table_layout, name, rows, cols, is_warp=False)
+            t_stream = timeit(
+                stream_table_layout, name, iter(rows), cols, out=io.StringIO()
+            )
+            print(
+                "%-12s %8d %9.3fs %9.3fs %9.3fs %9.3fs"
+                % (name, num, t_arrange, t_cells, t_total, t_stream)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,736 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Local stand-ins of the TWCC API gateway and of COS, for offline benchmarks.
+
+`MockGateway` answers the functions declared in `twccli/yaml/TWCC_API.yaml`
+from an in-memory dataset, `MockCos` is a small S3 compatible object store
+(path style, no auth check). Both count the requests they serve and can
+add a fixed latency to every answer.
+
+    python benchmarks/mock_gateway.py --port 8080 --cos-port 9000 --sites 500
+
+then point twccli at them:
+
+    export TWCC_API_HOST=http://127.0.0.1:8080
+    export TWCC_COS_ENDPOINT=http://127.0.0.1:9000
+"""
+
+import argparse
+import collections
+import datetime
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from twccli.twcc.session import Session2
+
+PROJECT_CODE = "BENCH0001"
+USERNAME = "bench"
+ACCESS_KEY = "bench-access"
+SECRET_KEY = "bench-secret"
+CREATE_TIME = "2022-01-01T00:00:00Z"
+
+# how many records of each kind the dataset holds
+DEFAULT_SIZES = {
+    "vcs": 100,
+    "ccs": 100,
+    "security-groups": 20,
+    "networks": 10,
+    "loadbalancers": 10,
+    "volumes": 50,
+    "ips": 20,
+    "secrets": 10,
+    "images": 20,
+    "keypairs": 5,
+    "solutions": 20,
+    "flavors": 20,
+}
+
+
+class _Server(object):
+    """ThreadingHTTPServer in a daemon thread, with request counters"""
+
+    handler = None
+
+    def __init__(self, port=0, latency=0.0):
+        self.latency = latency
+        self.counts = collections.Counter()
+        self._lock = threading.Lock()
+        handler = type("Handler", (self.handler,), {"mock": self})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d" % self.httpd.server_port
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def total(self):
+        return sum(self.counts.values())
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written apart, do not wait for the delayed ACK
+    disable_nagle_algorithm = True
+    mock = None
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self):
+        size = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(size) if size else b""
+
+    def _send(self, status, body=b"", headers=None):
+        if self.mock.latency:
+            time.sleep(self.mock.latency)
+        self.send_response(status)
+        for key, val in (headers or {}).items():
+            self.send_header(key, val)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and not self.command == "HEAD":
+            self.wfile.write(body)
+
+
+class _GatewayHandler(_Handler):
+    def _answer(self):
+        url = urlparse(self.path)
+        params = dict([(k, v[-1]) for (k, v) in parse_qs(url.query).items()])
+        body = self._body()
+        data = json.loads(body) if body else {}
+        status, ans = self.mock.dispatch(self.command, url.path, params, data)
+        self._send(
+            status,
+            json.dumps(ans).encode("utf8"),
+            {"Content-Type": "application/json"},
+        )
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _answer
+
+
+class MockGateway(_Server):
+    """In-memory TWCC API gateway
+
+    Args:
+        port (int): 0 picks a free port
+        latency (float): seconds added to every answer
+        sizes (dict): dataset size of each kind, see DEFAULT_SIZES
+    """
+
+    handler = _GatewayHandler
+
+    def __init__(self, port=0, latency=0.0, sizes=None):
+        _Server.__init__(self, port, latency)
+        config = Session2._getTwccliConfig()
+        self.funcs = set([x["name"] for x in config["avalible_funcs"]])
+        self.clusters = dict(config["production"]["resources"])
+        self.sizes = dict(DEFAULT_SIZES)
+        self.sizes.update(sizes or {})
+        self._ids = itertools.count(100000)
+        self._data_lock = threading.Lock()
+        self.projects = dict(
+            [(abbr, next(self._ids)) for abbr in sorted(self.clusters)]
+        )
+        self.store = collections.defaultdict(collections.OrderedDict)
+        self._populate()
+
+    def credential(self):
+        """Content of `TWCC_DATA_PATH/credential` for this dataset"""
+        from twccli.version import __version__
+
+        return {
+            "_default": {
+                "twcc_username": USERNAME,
+                "twcc_api_key": "bench-api-key",
+                "twcc_proj_code": PROJECT_CODE,
+                "twcc_s3_access_key": ACCESS_KEY,
+                "twcc_s3_secret_key": SECRET_KEY,
+            },
+            "_meta": {
+                "ctime": "2022-01-01 00:00:00",
+                "cli_version": __version__,
+            },
+            "projects": {PROJECT_CODE: dict(self.projects)},
+        }
+
+    def _user(self):
+        return {"username": USERNAME, "display_name": "Bench User"}
+
+    def _add(self, func, platform, rec):
+        rec.setdefault("id", next(self._ids))
+        rec.setdefault("create_time", CREATE_TIME)
+        rec.setdefault("user", self._user())
+        rec["_platform"] = platform
+        self.store[func][str(rec["id"])] = rec
+        return rec
+
+    def _new_site(self, abbr, idx, name=None):
+        site = self._add(
+            "sites",
+            self.clusters[abbr],
+            {
+                "name": name or "%s%04d" % (abbr.lower(), idx),
+                "desc": "",
+                "status": "Ready",
+                "public_ip": "203.145.%d.%d" % (idx // 250 % 250, idx % 250 + 1),
+                "termination_protection": False,
+                "project": self.projects[abbr],
+                "solution": "",
+                "servers": [],
+            },
+        )
+        if abbr == "VCS":
+            srv = self._add(
+                "servers",
+                self.clusters["VCS"],
+                {
+                    "name": site["name"],
+                    "site": site["id"],
+                    "status": "ACTIVE",
+                    "private_nets": [
+                        {
+                            "name": "default_network",
+                            "ip": "10.0.%d.%d" % (idx // 250 % 250, idx % 250 + 2),
+                        }
+                    ],
+                    "security_groups": [],
+                },
+            )
+            site["servers"] = [{"id": srv["id"]}]
+        return site
+
+    def _populate(self):
+        vcs, cntr = self.clusters["VCS"], self.clusters["CNTR"]
+        for idx in range(self.sizes["vcs"]):
+            self._new_site("VCS", idx)
+        for idx in range(self.sizes["ccs"]):
+            self._new_site("CNTR", idx)
+        simple = {
+            "security-groups": {"security_group_rules": []},
+            "networks": {"cidr": "10.0.0.0/24", "gateway": "10.0.0.1"},
+            "loadbalancers": {"listeners": [], "pools": [], "private_net": {}},
+            "volumes": {"size": 100, "volume_type": "hdd", "mountpoint": []},
+            "ips": {"address": "203.145.0.1", "type": "STATIC"},
+            "secrets": {"expire_time": None},
+            "images": {"os": "Ubuntu", "os_version": "20.04"},
+            "keypairs": {"fingerprint": "00:00"},
+        }
+        for func, extra in simple.items():
+            for idx in range(self.sizes[func]):
+                rec = dict(extra, name="%s%04d" % (func.replace("-", "")[:5], idx))
+                rec.update(
+                    {"status": "ACTIVE", "desc": "", "project": self.projects["VCS"]}
+                )
+                self._add(func, vcs, rec)
+        for idx in range(self.sizes["solutions"]):
+            sol = {
+                "name": "solution-%02d" % idx,
+                "category": "os" if idx % 2 else "container",
+            }
+            self._add("solutions", "goc", sol)
+        for idx in range(self.sizes["flavors"]):
+            for platform in (vcs, cntr):
+                flv = {
+                    "name": "flavor-%02d" % idx,
+                    "desc": "%d GPU" % (idx % 8),
+                    "spec": {},
+                }
+                self._add("flavors", platform, flv)
+        for abbr, platform in self.clusters.items():
+            self._add(
+                "projects", platform, {"id": self.projects[abbr], "name": PROJECT_CODE}
+            )
+        self._add(
+            "users",
+            "goc",
+            {"username": USERNAME, "display_name": "Bench User", "gpfs": {}},
+        )
+
+    def _split(self, path):
+        segs = [unquote(x) for x in re.sub("^/api/v[23]", "", path).split("/") if x]
+        platform = None
+        if len(segs) > 0 and not segs[0] in self.funcs:
+            platform, segs = segs[0], segs[1:]
+        if len(segs) == 0:
+            return platform, None, None, []
+        return platform, segs[0], segs[1] if len(segs) > 1 else None, segs[2:]
+
+    @staticmethod
+    def _public(rec):
+        return dict([(k, v) for (k, v) in rec.items() if not k == "_platform"])
+
+    def _matches(self, rec, platform, params):
+        if not isinstance(rec, dict):
+            return False
+        if not platform is None and not rec["_platform"] == platform:
+            return False
+        for key in ("site", "server"):
+            if key in params and not str(rec.get(key)) == params[key]:
+                return False
+        return True
+
+    def dispatch(self, verb, path, params, data):
+        platform, func, mid, sub = self._split(path)
+        self.count("%s %s%s" % (verb, func, "/" + "/".join(sub) if sub else ""))
+        if func is None or not func in self.funcs:
+            return 404, {"detail": "Not found."}
+
+        special = self._special(verb, func, mid, sub, params)
+        if not special is None:
+            return special
+
+        with self._data_lock:
+            table = self.store[func]
+            if mid is None:
+                if verb == "GET":
+                    return 200, [
+                        self._public(x)
+                        for x in table.values()
+                        if self._matches(x, platform, params)
+                    ]
+                if verb == "POST":
+                    if func == "sites":
+                        abbr = "VCS" if platform == self.clusters["VCS"] else "CNTR"
+                        rec = self._new_site(abbr, len(table), data.get("name"))
+                    else:
+                        rec = self._add(func, platform, dict(data, status="ACTIVE"))
+                    return 201, self._public(rec)
+                return 405, {"detail": "Method not allowed."}
+
+            if not mid in table:
+                return 404, {"detail": "Not found."}
+            rec = table[mid]
+            if verb == "GET":
+                return 200, self._public(rec)
+            if verb == "DELETE":
+                del table[mid]
+                return 204, {}
+            if verb in ("PUT", "PATCH"):
+                if sub == ["action"] and "status" in data:
+                    rec["status"] = "Ready"
+                else:
+                    rec.update(data)
+                return 200, self._public(rec)
+        return 405, {"detail": "Method not allowed."}
+
+    def _special(self, verb, func, mid, sub, params):
+        """sub resources which are not plain records"""
+        if func == "sites" and sub[:1] == ["container"] and verb == "GET":
+            return 200, {
+                "Pod": [
+                    {
+                        "flavor": "1 GPU + 04 cores + 090GB memory",
+                        "container": [
+                            {"image": "registry.twcc.ai/ngc/nvidia/tensorflow:21.06"}
+                        ],
+                    }
+                ],
+                "Service": [
+                    {
+                        "annotations": {"allocated-public-ip": "203.145.0.1"},
+                        "ports": [{"port": 22, "target_port": 22, "node_port": 30022}],
+                    }
+                ],
+            }
+        if func == "sites" and sub[:1] == ["container"]:
+            return 200, {}
+        if func == "projects" and sub[:1] == ["key"]:
+            return 200, {"public": {"access_key": ACCESS_KEY, "secret_key": SECRET_KEY}}
+        if func == "projects" and sub[:1] == ["solutions"]:
+            return 200, {"site_extra_prop": {"x-extra-property-flavor": {}}}
+        if func == "projects" and not mid is None and mid.endswith("user_quotas"):
+            return 200, []
+        if func == "project_quotas":
+            return 200, {"project": params.get("project"), "quota": {}}
+        if func == "iservice":
+            wallet = {
+                "計畫系統代碼": PROJECT_CODE,
+                "計畫名稱": "benchmark",
+                "錢包餘額": "1000",
+                "錢包ID": 1,
+                "錢包擁有者": USERNAME,
+                "計畫開始時間": "2022-01-01",
+                "計畫結束時間": "2032-01-01",
+            }
+            if mid == "user":
+                if sub == ["all_wallet"]:
+                    return 200, {"wallet": [wallet]}
+                return 200, {
+                    "wallet_code": 1,
+                    "su_qouta": "0",
+                    "obtained_su": "0",
+                    "prj_su_quota": "0",
+                    "prj_obtained_su": "0",
+                }
+            return 200, []
+        return None
+
+
+class _CosHandler(_Handler):
+    def _xml(self, status, tag, inner):
+        body = '<?xml version="1.0" encoding="UTF-8"?><%s>%s</%s>' % (tag, inner, tag)
+        self._send(status, body.encode("utf8"), {"Content-Type": "application/xml"})
+
+    def _error(self, status, code):
+        self._xml(status, "Error", "<Code>%s</Code>" % code)
+
+    def _payload(self):
+        body = self._body()
+        if "aws-chunked" in self.headers.get(
+            "Content-Encoding", ""
+        ) or self.headers.get("x-amz-content-sha256", "").startswith("STREAMING-"):
+            body = _decode_aws_chunked(body)
+        return body
+
+    def _answer(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query, keep_blank_values=True)
+        parts = url.path.lstrip("/").split("/", 1)
+        bkt = unquote(parts[0])
+        key = unquote(parts[1]) if len(parts) > 1 and parts[1] else None
+        op = self.mock.operation(self.command, bkt, key, query)
+        if op == "PutObject" and "x-amz-copy-source" in self.headers:
+            op = "CopyObject"
+        self.mock.count(op)
+        getattr(self, "_" + op, self._unknown)(bkt, key, query)
+
+    do_GET = do_PUT = do_POST = do_DELETE = do_HEAD = _answer
+
+    def _unknown(self, bkt, key, query):
+        self._error(501, "NotImplemented")
+
+    def _bucket(self, bkt):
+        with self.mock.lock:
+            return self.mock.buckets.get(bkt)
+
+    def _ListBuckets(self, bkt, key, query):
+        with self.mock.lock:
+            names = sorted(self.mock.buckets)
+        inner = "".join(
+            "<Bucket><Name>%s</Name><CreationDate>%s</CreationDate></Bucket>"
+            % (escape(x), _iso(0))
+            for x in names
+        )
+        self._xml(200, "ListAllMyBucketsResult", "<Buckets>%s</Buckets>" % inner)
+
+    def _CreateBucket(self, bkt, key, query):
+        self._body()
+        with self.mock.lock:
+            self.mock.buckets.setdefault(bkt, {})
+        self._send(200)
+
+    def _HeadBucket(self, bkt, key, query):
+        self._send(200 if not self._bucket(bkt) is None else 404)
+
+    def _DeleteBucket(self, bkt, key, query):
+        with self.mock.lock:
+            objs = self.mock.buckets.get(bkt)
+            if objs is None:
+                return self._error(404, "NoSuchBucket")
+            if len(objs) > 0:
+                return self._error(409, "BucketNotEmpty")
+            del self.mock.buckets[bkt]
+        self._send(204)
+
+    def _GetBucketVersioning(self, bkt, key, query):
+        self._xml(200, "VersioningConfiguration", "<Status>Suspended</Status>")
+
+    def _PutBucketVersioning(self, bkt, key, query):
+        self._body()
+        self._send(200)
+
+    def _PutObjectAcl(self, bkt, key, query):
+        self._body()
+        self._send(200)
+
+    def _GetObjectAcl(self, bkt, key, query):
+        self._xml(200, "AccessControlPolicy", "<AccessControlList></AccessControlList>")
+
+    def _sorted_keys(self, bkt, prefix):
+        objs = self._bucket(bkt)
+        if objs is None:
+            return None
+        with self.mock.lock:
+            return sorted([k for k in objs if k.startswith(prefix)])
+
+    def _ListObjects(self, bkt, key, query):
+        prefix = query.get("prefix", [""])[0]
+        max_keys = int(query.get("max-keys", ["1000"])[0])
+        v2 = query.get("list-type", [""])[0] == "2"
+        marker = query.get("continuation-token" if v2 else "marker", [""])[0]
+        marker = marker or query.get("start-after", [""])[0]
+        keys = self._sorted_keys(bkt, prefix)
+        if keys is None:
+            return self._error(404, "NoSuchBucket")
+        keys = [k for k in keys if k > marker]
+        page, truncated = keys[:max_keys], len(keys) > max_keys
+        objs = self._bucket(bkt)
+        inner = ["<Name>%s</Name><Prefix>%s</Prefix>" % (escape(bkt), escape(prefix))]
+        inner.append("<MaxKeys>%d</MaxKeys>" % max_keys)
+        inner.append("<IsTruncated>%s</IsTruncated>" % str(truncated).lower())
+        if truncated:
+            tag = "NextContinuationToken" if v2 else "NextMarker"
+            inner.append("<%s>%s</%s>" % (tag, escape(page[-1]), tag))
+        if v2:
+            inner.append("<KeyCount>%d</KeyCount>" % len(page))
+        for okey in page:
+            obj = objs.get(okey)
+            if obj is None:
+                continue
+            inner.append(
+                "<Contents><Key>%s</Key><LastModified>%s</LastModified>"
+                '<ETag>"%s"</ETag><Size>%d</Size><StorageClass>STANDARD</StorageClass>'
+                "</Contents>"
+                % (escape(okey), _iso(obj["mtime"]), obj["etag"], len(obj["body"]))
+            )
+        self._xml(200, "ListBucketResult", "".join(inner))
+
+    def _ListObjectVersions(self, bkt, key, query):
+        prefix = query.get("prefix", [""])[0]
+        keys = self._sorted_keys(bkt, prefix)
+        if keys is None:
+            return self._error(404, "NoSuchBucket")
+        objs = self._bucket(bkt)
+        inner = ["<Name>%s</Name><IsTruncated>false</IsTruncated>" % escape(bkt)]
+        for okey in keys:
+            obj = objs.get(okey)
+            if obj is None:
+                continue
+            inner.append(
+                "<Version><Key>%s</Key><VersionId>null</VersionId><IsLatest>true</IsLatest>"
+                '<LastModified>%s</LastModified><ETag>"%s"</ETag><Size>%d</Size></Version>'
+                % (escape(okey), _iso(obj["mtime"]), obj["etag"], len(obj["body"]))
+            )
+        self._xml(200, "ListVersionsResult", "".join(inner))
+
+    def _PutObject(self, bkt, key, query):
+        body = self._payload()
+        objs = self._bucket(bkt)
+        if objs is None:
+            return self._error(404, "NoSuchBucket")
+        obj = {
+            "body": body,
+            "etag": hashlib.md5(body).hexdigest(),
+            "mtime": time.time(),
+        }
+        with self.mock.lock:
+            objs[key] = obj
+        self._send(200, headers={"ETag": '"%s"' % obj["etag"]})
+
+    def _CopyObject(self, bkt, key, query):
+        self._body()
+        src_bkt, src_key = (
+            unquote(self.headers["x-amz-copy-source"]).lstrip("/").split("/", 1)
+        )
+        src = (self._bucket(src_bkt) or {}).get(src_key)
+        if src is None:
+            return self._error(404, "NoSuchKey")
+        with self.mock.lock:
+            self.mock.buckets[bkt][key] = dict(src, mtime=time.time())
+        self._xml(
+            200,
+            "CopyObjectResult",
+            '<ETag>"%s"</ETag><LastModified>%s</LastModified>'
+            % (src["etag"], _iso(time.time())),
+        )
+
+    def _obj(self, bkt, key):
+        return (self._bucket(bkt) or {}).get(key)
+
+    def _obj_headers(self, obj):
+        return {
+            "ETag": '"%s"' % obj["etag"],
+            "Last-Modified": _http_date(obj["mtime"]),
+            "Content-Type": "binary/octet-stream",
+        }
+
+    def _GetObject(self, bkt, key, query):
+        obj = self._obj(bkt, key)
+        if obj is None:
+            return self._error(404, "NoSuchKey")
+        self._send(200, obj["body"], self._obj_headers(obj))
+
+    def _HeadObject(self, bkt, key, query):
+        obj = self._obj(bkt, key)
+        if obj is None:
+            return self._send(404)
+        # HEAD carries the size of the body it would send
+        self.send_response(200)
+        for hkey, val in self._obj_headers(obj).items():
+            self.send_header(hkey, val)
+        self.send_header("Content-Length", str(len(obj["body"])))
+        self.end_headers()
+
+    def _DeleteObject(self, bkt, key, query):
+        with self.mock.lock:
+            (self.mock.buckets.get(bkt) or {}).pop(key, None)
+        self._send(204)
+
+    def _DeleteObjects(self, bkt, key, query):
+        root = ElementTree.fromstring(self._payload())
+        keys = [x.text for x in root.iter() if x.tag.split("}")[-1] == "Key"]
+        with self.mock.lock:
+            objs = self.mock.buckets.get(bkt) or {}
+            for okey in keys:
+                objs.pop(okey, None)
+        inner = "".join("<Deleted><Key>%s</Key></Deleted>" % escape(x) for x in keys)
+        self._xml(200, "DeleteResult", inner)
+
+
+def _iso(ts):
+    return datetime.datetime.utcfromtimestamp(ts).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _http_date(ts):
+    return datetime.datetime.utcfromtimestamp(ts).strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+
+def _decode_aws_chunked(body):
+    out, pos = [], 0
+    while pos < len(body):
+        eol = body.index(b"\r\n", pos)
+        size = int(body[pos:eol].split(b";")[0], 16)
+        if size == 0:
+            break
+        out.append(body[eol + 2 : eol + 2 + size])
+        pos = eol + 2 + size + 2
+    return b"".join(out)
+
+
+class MockCos(_Server):
+    """In-memory S3 compatible object store, path style buckets only
+
+    Args:
+        port (int): 0 picks a free port
+        latency (float): seconds added to every answer
+        buckets (list): bucket names created at start
+    """
+
+    handler = _CosHandler
+
+    def __init__(self, port=0, latency=0.0, buckets=()):
+        _Server.__init__(self, port, latency)
+        self.lock = threading.Lock()
+        self.buckets = dict([(x, {}) for x in buckets])
+
+    @staticmethod
+    def operation(verb, bkt, key, query):
+        """S3 operation name of a request, also the name of its handler"""
+        if bkt == "":
+            return "ListBuckets"
+        if key is None:
+            if "versioning" in query:
+                return "GetBucketVersioning" if verb == "GET" else "PutBucketVersioning"
+            if "versions" in query:
+                return "ListObjectVersions"
+            if "delete" in query:
+                return "DeleteObjects"
+            return {
+                "GET": "ListObjects",
+                "PUT": "CreateBucket",
+                "HEAD": "HeadBucket",
+                "DELETE": "DeleteBucket",
+            }.get(verb, "Unknown")
+        if "acl" in query:
+            return "GetObjectAcl" if verb == "GET" else "PutObjectAcl"
+        return {
+            "GET": "GetObject",
+            "PUT": "PutObject",
+            "HEAD": "HeadObject",
+            "DELETE": "DeleteObject",
+        }.get(verb, "Unknown")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cos-port", type=int, default=9000)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per API call"
+    )
+    parser.add_argument(
+        "--cos-latency", type=float, default=0.0, help="seconds per COS call"
+    )
+    parser.add_argument(
+        "--sites", type=int, default=DEFAULT_SIZES["vcs"], help="VCS and CCS sites each"
+    )
+    parser.add_argument(
+        "--data-path", help="write a credential for the mock into this TWCC_DATA_PATH"
+    )
+    args = parser.parse_args()
+
+    gateway = MockGateway(
+        args.port, args.latency, {"vcs": args.sites, "ccs": args.sites}
+    )
+    cos = MockCos(args.cos_port, args.cos_latency)
+    if args.data_path:
+        write_data_path(args.data_path, gateway)
+    with gateway, cos:
+        print("export TWCC_API_HOST=%s" % gateway.url)
+        print("export TWCC_COS_ENDPOINT=%s" % cos.url)
+        if args.data_path:
+            print("export TWCC_DATA_PATH=%s" % os.path.abspath(args.data_path))
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+def write_data_path(data_path, gateway):
+    """Makes `data_path` a TWCC_DATA_PATH logged in to `gateway`"""
+    import yaml
+    from twccli.version import __version__
+
+    # twccli only creates the log dir together with TWCC_DATA_PATH itself
+    if not os.path.isdir(os.path.join(data_path, "log")):
+        os.makedirs(os.path.join(data_path, "log"))
+    with open(os.path.join(data_path, "credential"), "w") as fn:
+        yaml.safe_dump(gateway.credential(), fn, allow_unicode=True)
+    # twccli compares its version with this feed at start, keep it offline
+    with open(os.path.join(data_path, "releases.xml"), "w") as fn:
+        fn.write(
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            "<item><title>%s</title></item></channel></rss>" % __version__
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -48,11 +48,14 @@ setup(
     py_modules=["twccli"],
     packages=find_packages(),
     install_requires=reqs,
+    extras_require={"async": ["httpx"]},
+    # contextvars and time.time_ns() of the tracing spans
+    python_requires=">=3.7",
     license="Apache License 2.0",
     url="https://github.com/TW-NCHC/TWCC-CLI",
     entry_points="""
         [console_scripts]
-        twccli=twccli.twccli:cli
+        twccli=twccli.daemon:main
     """,
     package_data={
         "twccli": ["yaml/*yaml", "commands/*py"],
@@ -64,10 +67,10 @@ setup(
         "Intended Audience :: System Administrators",
         "License :: OSI Approved :: Apache Software License",
         "Programming Language :: Python",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
     ],
     zip_safe=True,
 )
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import click
+import re
+import sys
+from twccli.twcc.services.generic import GenericService
+from twccli.twcc.services.stack import Stack
+from twccli.twcc.services.compute_util import getConfirm
+from twccli.twcc.util import jpp, table_layout
+from twccli.twccli import logger
+
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+
+
+def _show(title, rows, is_table):
+    for row in rows:
+        row["changes"] = ", ".join(row["changes"])
+    if is_table:
+        cols = ["key", "type", "name", "id", "action", "changes"]
+        if any([len(x.get("message", "")) > 0 for x in rows]):
+            cols.append("message")
+        table_layout(title, rows, cols, isPrint=True, captionInOrder=True)
+    else:
+        jpp(rows)
+
+
+@click.command(
+    context_settings=CONTEXT_SETTINGS,
+    help="Create or delete the VCS resources described in a manifest.",
+)
+@click.option(
+    "-f",
+    "--file",
+    "file_name",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="The manifest, a YAML file with `resources`.",
+)
+@click.option(
+    "-plan",
+    "--plan",
+    "is_plan",
+    is_flag=True,
+    default=False,
+    help="Only show what would be done.",
+)
+@click.option(
+    "-destroy",
+    "--destroy",
+    "is_destroy",
+    is_flag=True,
+    default=False,
+    help="Delete the resources of the manifest.",
+)
+@click.option(
+    "-force",
+    "--force",
+    "force",
+    is_flag=True,
+    default=False,
+    help="Delete without asking, `-f` is the manifest here.",
+)
+@click.option(
+    "-table / -json",
+    "--table-view / --json-view",
+    "is_table",
+    is_flag=True,
+    default=True,
+    show_default=True,
+    help="Show information in Table view or JSON view.",
+)
+def cli(file_name, is_plan, is_destroy, force, is_table):
+    try:
+        ga = GenericService()
+        func_call = "_".join(
+            [i for i in sys.argv[1:] if re.findall(r"\d", i) == [] and not i == "-sv"]
+        ).replace("-", "")
+        ga._send_ga(func_call)
+    except Exception as e:
+        logger.warning(e)
+
+    stack = Stack.load(file_name)
+    if is_plan:
+        _show("Plan", stack.plan(is_destroy=is_destroy), is_table)
+    elif is_destroy:
+        rows = [x for x in stack.plan(is_destroy=True) if x["action"] == "delete"]
+        if len(rows) == 0:
+            print("No resources to delete.")
+        elif getConfirm("resources", ", ".join([x["key"] for x in rows]), force):
+            _show("Destroy", stack.destroy(), is_table)
+        else:
+            print("No delete operations.")
+    else:
+        _show("Apply", stack.apply(), is_table)
+
+
+def main():
+    cli()
+
+
+if __name__ == "__main__":
+    main()
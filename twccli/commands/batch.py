@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import click
+import sys
+from twccli.twcc import batch
+from twccli.twcc.util import (
+    OUTPUT_FORMATS,
+    jpp,
+    isNone,
+    stream_layout,
+    table_layout,
+)
+
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+
+
+def _replay(rows):
+    """Output of every line as it would be printed, then yields the row"""
+    for row in rows:
+        click.echo(
+            click.style(
+                "[{}] twccli {}".format(row["line"], row["command"]), bold=True
+            ),
+            err=True,
+        )
+        sys.stdout.write(row["stdout"])
+        sys.stdout.flush()
+        sys.stderr.write(row["stderr"])
+        yield row
+
+
+@click.command(
+    context_settings=CONTEXT_SETTINGS,
+    help="Run many twccli commands, one per line, in one process.",
+)
+@click.option(
+    "-f",
+    "--file",
+    "commands",
+    type=click.File("r"),
+    default="-",
+    show_default=True,
+    help="The commands, `-` reads them from stdin.",
+)
+@click.option(
+    "-p",
+    "--parallel",
+    "concurrency",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Lines running at once, a `---` line waits for the ones above.",
+)
+@click.option(
+    "-x",
+    "--stop-on-error",
+    "is_stop",
+    is_flag=True,
+    default=False,
+    help="Skip the lines after a failed one.",
+)
+@click.option(
+    "-table / -json",
+    "--table-view / --json-view",
+    "is_table",
+    is_flag=True,
+    default=True,
+    show_default=True,
+    help="Show the output of each line and a summary table, or JSON results.",
+)
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream the result of each line in ndjson, csv or tsv.",
+)
+def cli(commands, concurrency, is_stop, is_table, out_fmt):
+    rows = batch.run(
+        batch.parse(commands.readlines()), concurrency=concurrency, is_stop=is_stop
+    )
+    failed = []
+
+    def track(rows):
+        for row in rows:
+            if not row["exit"] == 0:
+                failed.append(row["line"])
+            yield row
+
+    if not isNone(out_fmt):
+        stream_layout(track(rows), [], out_fmt)
+    elif is_table:
+        rows = list(_replay(track(rows)))
+        if len(rows) > 0:
+            cols = ["line", "command", "exit", "seconds"]
+            table_layout("Batch", rows, cols, isPrint=True, captionInOrder=True)
+    else:
+        jpp(list(track(rows)))
+    if len(failed) > 0:
+        sys.exit(1)
+
+
+def main():
+    cli()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import click
+from twccli import daemon
+from twccli.twcc.util import jpp
+
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+
+
+def _status():
+    try:
+        return daemon.request({"op": "status"})
+    except (IOError, OSError, EOFError, ValueError):
+        return None
+
+
+@click.command(help="Start the daemon, commands use it with TWCC_DAEMON=on.")
+def start():
+    ans = _status()
+    if ans is None:
+        ans = daemon.start()
+    if ans is None:
+        raise click.ClickException("The daemon did not start, see log/daemon.log.")
+    jpp(ans)
+
+
+@click.command(help="Stop the daemon.")
+def stop():
+    try:
+        jpp(daemon.request({"op": "stop"}))
+    except (IOError, OSError, EOFError, ValueError):
+        print("No daemon is running.")
+
+
+@click.command(help="Show the pid, uptime and commands served of the daemon.")
+def status():
+    ans = _status()
+    if ans is None:
+        print("No daemon is running.")
+    else:
+        jpp(ans)
+
+
+@click.group(
+    context_settings=CONTEXT_SETTINGS,
+    help="Keep a warm TWCC-CLI in the background to run commands faster.",
+)
+def cli():
+    pass
+
+
+cli.add_command(start)
+cli.add_command(stop)
+cli.add_command(status)
+
+
+def main():
+    cli()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,26 @@ import json
 import re
 import sys
 import datetime
+import time
 import jmespath
 from twccli.twcc.session import Session2
-from twccli.twcc.util import jpp, table_layout, sizeof_fmt
+from twccli.twcc.util import (
+    jpp,
+    table_layout,
+    sizeof_fmt,
+    isNone,
+    stream_layout,
+    OUTPUT_FORMATS,
+)
+from twccli.twcc.usage import UsageStore, samples_of, parse_duration
 from twccli.twcc.services.base import acls, Users, image_commit, Keypairs, projects
-from twccli.twcc.services.generic import GenericService, GpuService, CpuService
+from twccli.twcc.services.generic import GenericService, getQuotas, joinUserQuota
+from twccli.twcc.services.fanout import (
+    project_options,
+    project_codes,
+    fan_out,
+    echo_errors,
+)
 
 # Create groups for command
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
@@ -71,6 +86,94 @@ def proj(ctx, is_all, is_table):
     proj.getProjects(is_all, is_table)
 
 
+VCS_QUOTA = {
+    "CPU": "cpu",
+    "GPU": "gpu",
+    "Floating IP": "floating_ip",
+    "Memory": "memory",
+}
+CCS_QUOTA = {"CPU": "cpu", "GPU": "gpu", "Memory": "memory"}
+
+
+def set_unlimited(x):
+    return "unlimited" if x == -1 else x
+
+
+def usage_of(projq, res_list):
+    """{"CPU": "usage / quota", ...} of one quota entry"""
+    quota = {}
+    for ele in res_list.items():
+        quota[ele[0]] = "%s / %s" % (
+            projq[ele[1]]["usage"],
+            set_unlimited(projq[ele[1]]["quota"]),
+        )
+    return quota
+
+
+def member_rows(quota):
+    """Table rows of joinUserQuota(), `-` where a member has no quota"""
+    data = []
+    for username in quota.keys():
+        row = {}
+        row["username"] = username
+        for res_type in ("VCS", "CCS"):
+            for res in ("cpu", "gpu"):
+                col = "%s-%s" % (res_type, res.upper())
+                if res_type in quota[username]:
+                    res_quota = quota[username][res_type][res]
+                    row[col] = "%s / %s" % (
+                        res_quota["usage"],
+                        set_unlimited(res_quota["quota"]),
+                    )
+                else:
+                    row[col] = "-"
+        data.append(row)
+    return data
+
+
+def vcs_usage(row):
+    return int(row["VCS-CPU"].split(" /")[0]) if not row["VCS-CPU"] == "-" else -1
+
+
+def quota_projects(proj_codes, is_all, is_table, samples=None):
+    """Quota of many projects, one row per project or per member
+
+    samples (list): gets the samples to record, from fresh answers
+    """
+
+    def fetch():
+        quotas = getQuotas(isAll=is_all, ttl=None if isNone(samples) else 0)
+        if not isNone(samples):
+            samples.extend(samples_of(quotas, Session2._getDefaultProject(), is_all))
+        if is_all:
+            return sorted(
+                member_rows(joinUserQuota(quotas)), key=vcs_usage, reverse=True
+            )
+        row = {}
+        for res_type, projq, res_list in (
+            ("VCS", quotas["VCS"][0], VCS_QUOTA),
+            ("CCS", quotas["CCS"][0], CCS_QUOTA),
+        ):
+            for key, val in usage_of(projq, res_list).items():
+                row["%s-%s" % (res_type, key)] = val
+        return [row]
+
+    ans, errors = fan_out(proj_codes, fetch)
+    echo_errors(errors, proj_codes)
+    if is_all:
+        title = "Member Quota"
+        col_cap = ["project", "username", "VCS-CPU", "VCS-GPU", "CCS-CPU", "CCS-GPU"]
+    else:
+        title = "Project Quota"
+        col_cap = ["project"]
+        col_cap += ["VCS-%s" % x for x in VCS_QUOTA]
+        col_cap += ["CCS-%s" % x for x in CCS_QUOTA]
+    if is_table:
+        table_layout(title, ans, isPrint=True, caption_row=col_cap, captionInOrder=True)
+    else:
+        jpp(ans)
+
+
 @click.option(
     "-all",
     "--show-all",
@@ -88,45 +191,36 @@ def proj(ctx, is_all, is_table):
     show_default=True,
     help="Show information in Table view or JSON view.",
 )
+@click.option(
+    "-rec",
+    "--record",
+    "is_record",
+    is_flag=True,
+    default=False,
+    help="Also keep the usage for `twccli info usage`, ie: every minute from cron.",
+)
+@project_options
 @click.command(help="Get your quota Information.")
 @click.pass_context
-def quota(ctx, is_all, is_table):
+def quota(ctx, is_all, is_table, is_record, proj_codes, is_all_projects):
     """Command line for info hfs"""
-    set_unlimited = lambda x: "unlimited" if x == -1 else x
-
-    quota = {}
+    proj_codes = project_codes(proj_codes, is_all_projects)
+    samples = [] if is_record else None
+    if not isNone(proj_codes):
+        quota_projects(proj_codes, is_all, is_table, samples)
+        return record_usage(samples)
 
-    quota_ccs = GpuService().getQuota(isAll=is_all)
-    quota_vcs = CpuService().getQuota(isAll=is_all)
+    quotas = getQuotas(isAll=is_all, ttl=0 if is_record else None)
+    if is_record:
+        samples += samples_of(quotas, Session2._getDefaultProject(), is_all)
+    quota_ccs = quotas["CCS"]
+    quota_vcs = quotas["VCS"]
 
     if is_all:
-        for x in quota_ccs:
-            username = x["user"]["username"]
-            quota[username] = {"CCS": x}
-
-        for x in quota_vcs:
-            username = x["user"]["username"]
-            quota[username]["VCS"] = x
+        quota = joinUserQuota(quotas)
 
         if is_table:
-            data = []
-            for username in quota.keys():
-                row = {}
-                row["username"] = username
-                for res_type in quota[username].keys():
-                    row["%s-CPU" % (res_type)] = "%s / %s" % (
-                        quota[username][res_type]["cpu"]["usage"],
-                        set_unlimited(quota[username][res_type]["cpu"]["quota"]),
-                    )
-                    row["%s-GPU" % (res_type)] = "%s / %s" % (
-                        quota[username][res_type]["gpu"]["usage"],
-                        set_unlimited(quota[username][res_type]["gpu"]["quota"]),
-                    )
-                data.append(row)
-
-            data = sorted(
-                data, key=lambda x: int(x["VCS-CPU"].split(" /")[0]), reverse=True
-            )
+            data = sorted(member_rows(quota), key=vcs_usage, reverse=True)
             col_cap = ["username", "VCS-CPU", "VCS-GPU", "CCS-CPU", "CCS-GPU"]
             table_layout(
                 "Member Quota",
@@ -142,41 +236,131 @@ def quota(ctx, is_all, is_table):
         projq_ccs = quota_ccs[0]
         proj_name = projq_vcs["project"]["name"]
 
-        vcs_list = {
-            "CPU": "cpu",
-            "GPU": "gpu",
-            "Floating IP": "floating_ip",
-            "Memory": "memory",
-        }
-        quota = {}
-        for ele in vcs_list.items():
-            quota[ele[0]] = "%s / %s" % (
-                projq_vcs[ele[1]]["usage"],
-                set_unlimited(projq_vcs[ele[1]]["quota"]),
-            )
-
         if is_table:
-            table_layout("[VCS QuotaPlan] for %s" % (proj_name), quota, isPrint=True)
-
-        ccs_list = {"CPU": "cpu", "GPU": "gpu", "Memory": "memory"}
-        quota = {}
-        for ele in ccs_list.items():
-            quota[ele[0]] = "%s / %s" % (
-                projq_ccs[ele[1]]["usage"],
-                set_unlimited(projq_ccs[ele[1]]["quota"]),
+            table_layout(
+                "[VCS QuotaPlan] for %s" % (proj_name),
+                usage_of(projq_vcs, VCS_QUOTA),
+                isPrint=True,
             )
-
-        if is_table:
-            table_layout("[CCS QuotaPlan] for %s" % (proj_name), quota, isPrint=True)
-
-        if not is_table:
+            table_layout(
+                "[CCS QuotaPlan] for %s" % (proj_name),
+                usage_of(projq_ccs, CCS_QUOTA),
+                isPrint=True,
+            )
+        else:
             quota = {"VCS": quota_vcs, "CCS": quota_ccs}
             jpp(quota)
+    record_usage(samples)
+
+
+def record_usage(samples):
+    if isNone(samples):
+        return
+    store = UsageStore()
+    click.echo(
+        "Recorded {} samples in {}.".format(store.record(samples), store.path),
+        err=True,
+    )
+
+
+@click.option(
+    "-since",
+    "--since",
+    "since",
+    default="24h",
+    show_default=True,
+    help="How far back, ie: 30m, 24h, 7d",
+)
+@click.option(
+    "-win",
+    "--window",
+    "window",
+    default=None,
+    help="Group the samples in windows, ie: 1h. One window by default.",
+)
+@click.option(
+    "-projs",
+    "--projects",
+    "proj_codes",
+    default=None,
+    type=str,
+    help="Only these projects, ie: GOV108009,ENT107001",
+)
+@click.option(
+    "-u",
+    "--user",
+    "user",
+    default=None,
+    type=str,
+    help="Only this member, `-u ''` for the project totals.",
+)
+@click.option(
+    "-res",
+    "--resource",
+    "resource",
+    default=None,
+    type=str,
+    help="Only this resource, ie: VCS.gpu",
+)
+@click.option(
+    "-table / -json",
+    "--table-view / --json-view",
+    "is_table",
+    is_flag=True,
+    default=True,
+    show_default=True,
+    help="Show information in Table view or JSON view.",
+)
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
+@click.command(help="Peak and average usage kept by `twccli info quota --record`.")
+@click.pass_context
+def usage(ctx, since, window, proj_codes, user, resource, is_table, out_fmt):
+    until = int(time.time())
+    ans = UsageStore().query(
+        until - parse_duration(since),
+        until,
+        window=None if isNone(window) else parse_duration(window),
+        projects=(
+            None
+            if isNone(proj_codes)
+            else [x.strip() for x in proj_codes.split(",") if len(x.strip()) > 0]
+        ),
+        user=user,
+        resource=resource,
+    )
+    cols = [
+        "start",
+        "project",
+        "user",
+        "resource",
+        "samples",
+        "avg",
+        "peak",
+        "quota",
+        "avg_pct",
+        "peak_pct",
+    ]
+    if not isNone(out_fmt):
+        stream_layout(ans, cols, out_fmt)
+    elif len(ans) == 0:
+        click.echo("No samples, record them with `twccli info quota --record`.")
+    elif is_table:
+        table_layout("Usage", ans, cols, isPrint=True, captionInOrder=True)
+    else:
+        jpp(ans)
 
 
 cli.add_command(hfs)
 cli.add_command(proj)
 cli.add_command(quota)
+cli.add_command(usage)
 
 
 def main():
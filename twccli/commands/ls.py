@@ -6,6 +6,7 @@ import json
 import re
 import sys
 import datetime
+import itertools
 import jmespath
 from twccli.twcc.session import Session2
 from twccli.twcc.util import (
@@ -17,6 +18,9 @@ from twccli.twcc.util import (
     mk_names,
     mkCcsHostName,
     protection_desc,
+    stream_layout,
+    stream_table_layout,
+    OUTPUT_FORMATS,
 )
 from twccli.twcc.services.compute import (
     GpuSite,
@@ -43,6 +47,13 @@ from twccli.twcc.services.s3_tools import S3
 from twccli.twcc.services.network import Networks
 from twccli.twcc.services.base import acls, users, image_commit, Keypairs
 from twccli.twcc.services.generic import GenericService
+from twccli.twcc.services.fanout import (
+    project_options,
+    project_codes,
+    fan_out,
+    echo_errors,
+)
+from twccli.twcc.watch import Watcher, FrameRender, LogRender, StreamRender
 from twccli.twccli import pass_environment, logger
 from click.core import Group
 from twccli.twcc.util import _debug
@@ -100,7 +111,40 @@ def refactor_ip_detail(ans, vnet_id2name):
         each_ans["user"] = user
 
 
-def list_fixed_ips(site_ids_or_names, column, filter_type, is_table, is_all):
+def list_projects(title, proj_codes, fetch, cols, is_table, out_fmt=None):
+    """Rows of fetch() in many projects, with a `project` column"""
+    ans, errors = fan_out(proj_codes, fetch)
+    echo_errors(errors, proj_codes)
+    cols = ["project"] + [x for x in cols if not x == "project"]
+    if not isNone(out_fmt):
+        stream_layout(ans, cols, out_fmt)
+    elif len(ans) > 0:
+        if is_table:
+            table_layout(title, ans, cols, isPrint=True, captionInOrder=True)
+        else:
+            jpp(ans)
+
+
+def chk_watch(ids_or_names, res_property=None, proj_codes=None, is_other=False):
+    if (
+        len(ids_or_names) > 0
+        or not isNone(res_property)
+        or not isNone(proj_codes)
+        or is_other
+    ):
+        raise ValueError(
+            "--watch only lists the resources of one project, without ids or names."
+        )
+
+
+def chk_projects(proj_codes, ids_or_names, res_property=None):
+    if not isNone(proj_codes) and (len(ids_or_names) > 0 or not isNone(res_property)):
+        raise ValueError("--projects only lists the resources, without ids or names.")
+
+
+def list_fixed_ips(
+    site_ids_or_names, column, filter_type, is_table, is_all, out_fmt=None
+):
     eip = Fixedip()
     ans = []
     vnet_id2name = {}
@@ -125,13 +169,38 @@ def list_fixed_ips(site_ids_or_names, column, filter_type, is_table, is_all):
         ans = eip.list(filter=filter_type, isAll=is_all)
     refactor_ip_detail(ans, vnet_id2name)
     if len(ans) > 0:
-        if is_table:
+        if not isNone(out_fmt):
+            stream_layout(ans, cols, out_fmt)
+        elif is_table:
             table_layout("IP Results", ans, cols, isPrint=True, is_warp=False)
         else:
             jpp(ans)
 
 
-def list_ssls(site_ids_or_names, column, is_table):
+def list_fixed_ips_projects(proj_codes, column, filter_type, is_all, is_table, out_fmt):
+    cols = [
+        "id",
+        "address",
+        "create_time",
+        "status",
+        "type",
+        "occupied_resource_type_id",
+        "user",
+    ]
+    if not column == "":
+        cols = ["id", "address"] + [
+            x for x in column.split(",") if not x in ("id", "address")
+        ]
+
+    def fetch():
+        ans = Fixedip().list(filter=filter_type, isAll=is_all)
+        refactor_ip_detail(ans, {})
+        return ans
+
+    list_projects("IP Results", proj_codes, fetch, cols, is_table, out_fmt)
+
+
+def list_ssls(site_ids_or_names, column, is_table, out_fmt=None):
     ssl = Secrets()
     ans = []
 
@@ -152,13 +221,15 @@ def list_ssls(site_ids_or_names, column, is_table):
     else:
         ans = ssl.list()
     if len(ans) > 0:
-        if is_table:
+        if not isNone(out_fmt):
+            stream_layout(ans, cols, out_fmt)
+        elif is_table:
             table_layout("SSL Results", ans, cols, isPrint=True, is_warp=False)
         else:
             jpp(ans)
 
 
-def list_ssls(site_ids_or_names, column, is_table):
+def list_ssls(site_ids_or_names, column, is_table, out_fmt=None):
     ssl = Secrets()
     ans = []
 
@@ -179,13 +250,15 @@ def list_ssls(site_ids_or_names, column, is_table):
     else:
         ans = ssl.list()
     if len(ans) > 0:
-        if is_table:
+        if not isNone(out_fmt):
+            stream_layout(ans, cols, out_fmt)
+        elif is_table:
             table_layout("SSL Results", ans, cols, isPrint=True, is_warp=False)
         else:
             jpp(ans)
 
 
-def list_load_balances(site_ids_or_names, column, is_all, is_table):
+def list_load_balances(site_ids_or_names, column, is_all, is_table, out_fmt=None):
     vlb = LoadBalancers()
     ans = []
     if len(site_ids_or_names) > 0:
@@ -259,7 +332,9 @@ def list_load_balances(site_ids_or_names, column, is_all, is_table):
                 for this_ans_listeners in this_ans["listeners"]
             ]
     if len(ans) > 0:
-        if is_table:
+        if not isNone(out_fmt):
+            stream_layout(ans, cols, out_fmt)
+        elif is_table:
             table_layout(
                 "Load Balancers Result", ans, cols, isPrint=True, is_warp=False
             )
@@ -267,7 +342,7 @@ def list_load_balances(site_ids_or_names, column, is_all, is_table):
             jpp(ans)
 
 
-def list_volume(site_ids_or_names, snapshot, is_all, is_table):  # NOSONAR
+def list_volume(site_ids_or_names, snapshot, is_all, is_table, out_fmt=None):  # NOSONAR
     vol = Volumes()
     ans = []
     if len(site_ids_or_names) > 0:
@@ -310,12 +385,40 @@ def list_volume(site_ids_or_names, snapshot, is_all, is_table):  # NOSONAR
                 "status",
                 "mountpoint",
             ]
-        if is_table:
+        if not isNone(out_fmt):
+            stream_layout(ans, cols, out_fmt)
+        elif is_table:
             table_layout(title, ans, cols, isPrint=True, is_warp=False)
         else:
             jpp(ans)
 
 
+def list_volume_projects(proj_codes, snapshot, is_all, is_table, out_fmt=None):
+    def fetch():
+        ans = Volumes().list(isAll=is_all, snapshot=snapshot)
+        ans = [x for x in ans if x["is_bootable"] == False]
+        for the_vol in ans:
+            if "mountpoint" in the_vol and len(the_vol["mountpoint"]) == 1:
+                the_vol["mountpoint"] = the_vol["mountpoint"][0]
+        return ans
+
+    if snapshot:
+        title = "VDS Snapshot Result"
+        cols = ["id", "name", "desc", "create_time", "status"]
+    else:
+        title = "VDS Result"
+        cols = [
+            "id",
+            "name",
+            "size",
+            "create_time",
+            "volume_type",
+            "status",
+            "mountpoint",
+        ]
+    list_projects(title, proj_codes, fetch, cols, is_table, out_fmt)
+
+
 def list_vcs_sol(is_table):
     sols = VcsSolutions()
 
@@ -330,7 +433,7 @@ def list_vcs_sol(is_table):
         jpp(ans)
 
 
-def list_snapshot(site_ids_or_names, is_all, is_table, desc):
+def list_snapshot(site_ids_or_names, is_all, is_table, desc, out_fmt=None):
     ans = []
     if not len(site_ids_or_names) == 0:
         for i, sid in enumerate(site_ids_or_names):
@@ -348,7 +451,9 @@ def list_snapshot(site_ids_or_names, is_all, is_table, desc):
         ans = img.list(isAll=is_all)
         cols = ["id", "name", "status", "create_time"]
     if len(ans) > 0:
-        if is_table:
+        if not isNone(out_fmt):
+            stream_layout(ans, cols, out_fmt)
+        elif is_table:
             table_layout("Snapshot Result", ans, cols, isPrint=True, is_warp=False)
         else:
             jpp(ans)
@@ -508,7 +613,22 @@ def get_img_from_json(json_str):
     )
 
 
-def list_ccs(site_ids_or_names, is_table, is_all=False):
+def get_ccs_with_detail(ccs_site, site_id):
+    ans = ccs_site.queryById(site_id)
+    ans_info = ccs_site.getDetail(site_id)
+
+    ans["flavor"] = get_flv_from_json(ans_info)
+    ans["image"] = get_img_from_json(ans_info)
+    return ans
+
+
+def set_ccs_owner(site):
+    site["owner"] = site["user"]["username"]
+    site["Protected"] = protection_desc(site)
+    return site
+
+
+def list_ccs(site_ids_or_names, is_table, is_all=False, out_fmt=None):
     """List container by site ids in table/json format or list all containers
 
     :param site_ids_or_names: list of site id
@@ -517,6 +637,8 @@ def list_ccs(site_ids_or_names, is_table, is_all=False):
     :type is_table: bool
     :param is_all: List all the containers in the project. (Tenant Administrators only)
     :type is_all: bool
+    :param out_fmt: Stream rows in one of OUTPUT_FORMATS instead.
+    :type out_fmt: string
     """
     col_name = ["id", "name", "create_time", "status"]
     a = GpuSite()
@@ -525,26 +647,20 @@ def list_ccs(site_ids_or_names, is_table, is_all=False):
         my_GpuSite = a.list(is_all=is_all)
     else:
         col_name = ["id", "name", "create_time", "status", "flavor", "image"]
-        my_GpuSite = []
-        for ele in site_ids_or_names:
-            # site_id = int(ele)
-            ans = a.queryById(ele)
-            ans_info = a.getDetail(ele)
+        my_GpuSite = (get_ccs_with_detail(a, ele) for ele in site_ids_or_names)
 
-            ans["flavor"] = get_flv_from_json(ans_info)
-            ans["image"] = get_img_from_json(ans_info)
+    my_GpuSite = (i for i in my_GpuSite if "id" in i)
+    if is_all:
+        my_GpuSite = (set_ccs_owner(i) for i in my_GpuSite)
+        col_name.append("owner")
+        col_name.append("Protected")
 
-            my_GpuSite.append(ans)
+    if not isNone(out_fmt):
+        stream_layout(my_GpuSite, col_name, out_fmt)
+        return
 
-    my_GpuSite = [i for i in my_GpuSite if "id" in i]
+    my_GpuSite = list(my_GpuSite)
     if len(my_GpuSite) > 0:
-        if is_all:
-            for idx in range(len(my_GpuSite)):
-                my_GpuSite[idx]["owner"] = my_GpuSite[idx]["user"]["username"]
-                my_GpuSite[idx]["Protected"] = protection_desc(my_GpuSite[idx])
-            col_name.append("owner")
-            col_name.append("Protected")
-
         if is_table:
             table_layout(
                 "CCS Info.",
@@ -557,7 +673,80 @@ def list_ccs(site_ids_or_names, is_table, is_all=False):
             jpp(my_GpuSite)
 
 
-def list_buckets(is_table, versioning):
+def ccs_listing(is_all=False):
+    """(columns, fetch) of the containers of the project"""
+    col_name = ["id", "name", "create_time", "status"]
+    if is_all:
+        col_name += ["owner", "Protected"]
+
+    def fetch():
+        ans = [x for x in GpuSite().list(is_all=is_all) if "id" in x]
+        return [set_ccs_owner(x) for x in ans] if is_all else ans
+
+    return col_name, fetch
+
+
+def vcs_listing(column="", is_all=False):
+    """(columns, fetch) of the instances of the project"""
+    if column == "":
+        cols = ["id", "name", "public_ip", "create_time", "status", "Protected"]
+    else:
+        cols = column.split(",")
+        if not "id" in cols:
+            cols.append("id")
+        if not "name" in cols:
+            cols.append("name")
+
+    def fetch():
+        ans = list_vcs([], False, column=column, is_all=is_all, is_print=False)
+        ans = [] if isNone(ans) else ans
+        for each_vcs in ans:
+            each_vcs["Protected"] = protection_desc(each_vcs)
+        return ans
+
+    return cols, fetch
+
+
+def list_ccs_projects(proj_codes, is_table, is_all=False, out_fmt=None):
+    """list_ccs() in many projects, with a `project` column"""
+    col_name, fetch = ccs_listing(is_all)
+    list_projects("CCS Info.", proj_codes, fetch, col_name, is_table, out_fmt)
+
+
+def list_vcs_projects(proj_codes, column, is_all, is_table, out_fmt=None):
+    """list_vcs() in many projects, with a `project` column"""
+    cols, fetch = vcs_listing(column, is_all)
+    list_projects("VCS VMs", proj_codes, fetch, cols, is_table, out_fmt)
+
+
+def watch_listing(title, listing, interval, is_table, out_fmt=None):
+    """Re-lists until Ctrl-C, see twcc/watch.py"""
+    cols, fetch = listing
+    if not isNone(out_fmt) and not out_fmt == "ndjson":
+        raise ValueError("--watch streams its events in ndjson only.")
+    if not is_table or not isNone(out_fmt):
+        render = StreamRender()
+    elif sys.stdout.isatty():
+        render = FrameRender(title)
+    else:
+        render = LogRender(title)
+    Watcher(fetch, cols, interval=interval).run(render)
+
+
+def watch_option(func):
+    return click.option(
+        "-watch",
+        "--watch",
+        "interval",
+        type=click.FloatRange(min=0.5),
+        is_flag=False,
+        flag_value=2.0,
+        default=None,
+        help="List again every INTERVAL (2) seconds until Ctrl-C, showing what changed.",
+    )(func)
+
+
+def list_buckets(is_table, versioning, out_fmt=None):
     """List buckets in table/json format
 
     :param is_table: Show information in Table view or JSON view.
@@ -565,7 +754,9 @@ def list_buckets(is_table, versioning):
     """
     s3 = S3()
     buckets = s3.list_bucket(show_versioning=versioning)
-    if is_table:
+    if not isNone(out_fmt):
+        stream_layout(buckets, [], out_fmt)
+    elif is_table:
         table_layout("COS buckets {}", buckets, is_warp=False, isPrint=True)
     else:
         jpp(buckets)
@@ -577,7 +768,21 @@ def show_dict(obj):
         print(obj[obj_key])
 
 
-def list_files(ids_or_names, okey_regex=None, is_public=True, is_table=True):
+def iter_files(s3, bucket_name, okey_regex=None, is_public=False):
+    """Yield objects of a bucket as soon as each listing page arrives"""
+    for mfile in s3.iter_object(bucket_name):
+        if not isNone(okey_regex) and not re.search(okey_regex, mfile["Key"]):
+            continue  # 會不會中招呀!?
+        if is_public:
+            mfile["is_public"] = s3.get_object_info(bucket_name, mfile["Key"])[
+                "is_public_read"
+            ]
+        yield mfile
+
+
+def list_files(
+    ids_or_names, okey_regex=None, is_public=True, is_table=True, out_fmt=None
+):
     """List file in specific folder in buckets table/json format
 
     :param ids_or_names: list of site id
@@ -586,29 +791,12 @@ def list_files(ids_or_names, okey_regex=None, is_public=True, is_table=True):
     :type name: string
     :param is_table: Show information in Table view or JSON view.
     :type is_table: bool
+    :param out_fmt: Stream rows in one of OUTPUT_FORMATS instead.
+    :type out_fmt: string
     """
-    import re
-
     s3 = S3()
 
     for bucket_name in ids_or_names:
-        files = s3.list_object(bucket_name)
-
-        if not isNone(okey_regex):
-            files = [
-                mfile for mfile in files if re.search(okey_regex, mfile["Key"])
-            ]  # 會不會中招呀!?
-
-        if is_public:
-            more_details = []
-            for mfile in files:
-                mdata = mfile
-                mdata["is_public"] = s3.get_object_info(bucket_name, mfile["Key"])[
-                    "is_public_read"
-                ]
-                more_details.append(mdata)
-            files = more_details
-
         col_caption = (
             ["LastModified", "Key", "Size", "is_public"]
             if is_public
@@ -620,21 +808,31 @@ def list_files(ids_or_names, okey_regex=None, is_public=True, is_table=True):
             is_versioning = True
             col_caption.append("Versioning")
 
-        if is_table and not isNone(files):
+        files = iter_files(s3, bucket_name, okey_regex=okey_regex, is_public=is_public)
+        if not isNone(out_fmt):
+            stream_layout(files, col_caption, out_fmt)
+            continue
+
+        if is_table:
+            first = next(files, None)
+            if isNone(first):
+                jpp(None)
+                continue
             bkt_state = (
                 "%s (Versioing: On)" % (bucket_name) if is_versioning else bucket_name
             )
-            table_layout(
+            # rows are printed while the next pages are still being fetched
+            stream_table_layout(
                 "COS objects {}".format(bkt_state),
-                files,
+                itertools.chain([first], files),
+                caption_row=col_caption,
+                captionInOrder=True,
                 is_warp=False,
                 max_len=30,
-                isPrint=True,
-                captionInOrder=True,
-                caption_row=col_caption,
             )
         else:
-            jpp(files)
+            files = list(files)
+            jpp(files if len(files) > 0 else None)
 
 
 def list_secg_vcs(ids_or_names, is_table=True):
@@ -796,13 +994,36 @@ def cli():
     show_default=True,
     help="Show information in Table view or JSON view.",
 )
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
+@project_options
+@watch_option
 @click.argument("site_ids_or_names", nargs=-1)
 @pass_environment
 @click.pass_context
 # @click.pass_context ctx,
 # @logger.catch
 # @exception(logger)
-def vcs(ctx, env, res_property, site_ids_or_names, name, column, is_table, is_all):
+def vcs(
+    ctx,
+    env,
+    res_property,
+    site_ids_or_names,
+    name,
+    column,
+    is_table,
+    is_all,
+    out_fmt,
+    proj_codes,
+    is_all_projects,
+    interval,
+):
     """Command line for List VCS
     Function list :
     1. list port
@@ -825,12 +1046,27 @@ def vcs(ctx, env, res_property, site_ids_or_names, name, column, is_table, is_al
     :type is_all: bool
     """
     site_ids_or_names = mk_names(name, site_ids_or_names)
+    proj_codes = project_codes(proj_codes, is_all_projects)
+    chk_projects(proj_codes, site_ids_or_names, res_property)
+    if not isNone(interval):
+        chk_watch(site_ids_or_names, res_property, proj_codes)
+        return watch_listing(
+            "VCS VMs", vcs_listing(column, is_all), interval, is_table, out_fmt
+        )
+    if not isNone(proj_codes):
+        return list_vcs_projects(proj_codes, column, is_all, is_table, out_fmt)
     if isNone(res_property):
-        list_vcs(site_ids_or_names, is_table, column=column, is_all=is_all)
+        list_vcs(
+            site_ids_or_names,
+            is_table,
+            column=column,
+            is_all=is_all,
+            out_fmt=out_fmt,
+        )
 
     if res_property == "Snapshot":
         desc_str = "twccli_{}".format(datetime.datetime.now().strftime("_%m%d%H%M"))
-        list_snapshot(site_ids_or_names, is_all, is_table, desc_str)
+        list_snapshot(site_ids_or_names, is_all, is_table, desc_str, out_fmt=out_fmt)
 
     if res_property == "image":
         list_vcs_img(site_ids_or_names, is_table)
@@ -858,7 +1094,9 @@ def vcs(ctx, env, res_property, site_ids_or_names, name, column, is_table, is_al
         else:
             ans = net.list()
             cols = ["id", "name", "cidr", "create_time", "status"]
-        if is_table:
+        if not isNone(out_fmt):
+            stream_layout(ans, cols, out_fmt)
+        elif is_table:
             table_layout("VCS Networks", ans, cols, isPrint=True)
         else:
             jpp(ans)
@@ -867,7 +1105,13 @@ def vcs(ctx, env, res_property, site_ids_or_names, name, column, is_table, is_al
         list_secg_vcs(site_ids_or_names, is_table)
 
     if res_property == "Keypair":
-        ctx.invoke(key, ids_or_names=site_ids_or_names, name=name, is_table=is_table)
+        ctx.invoke(
+            key,
+            ids_or_names=site_ids_or_names,
+            name=name,
+            is_table=is_table,
+            out_fmt=out_fmt,
+        )
 
 
 # end vcs ==================================================
@@ -909,9 +1153,17 @@ def vcs(ctx, env, res_property, site_ids_or_names, name, column, is_table, is_al
     default=None,
     help="Get versioning is enabled or not.",
 )
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @pass_environment
-def cos(env, name, okey, is_public, is_table, versioning, ids_or_names):
+def cos(env, name, okey, is_public, is_table, versioning, out_fmt, ids_or_names):
     """Command line for List COS
     Functions:
     1. list bucket
@@ -920,10 +1172,14 @@ def cos(env, name, okey, is_public, is_table, versioning, ids_or_names):
 
     ids_or_names = mk_names(name, ids_or_names)
     if len(ids_or_names) == 0:
-        list_buckets(is_table, versioning)
+        list_buckets(is_table, versioning, out_fmt=out_fmt)
     else:
         list_files(
-            ids_or_names, okey_regex=okey, is_public=is_public, is_table=is_table
+            ids_or_names,
+            okey_regex=okey,
+            is_public=is_public,
+            is_table=is_table,
+            out_fmt=out_fmt,
         )
 
 
@@ -1002,6 +1258,16 @@ def cos(env, name, okey, is_public, is_table, versioning, ids_or_names):
     show_default=True,
     help="Show information in Table view or JSON view.",
 )
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
+@project_options
+@watch_option
 @click.argument("site_ids_or_names", nargs=-1)
 @pass_environment
 # @click.pass_context ctx,
@@ -1015,6 +1281,10 @@ def ccs(
     is_all,
     show_ports,
     get_info,
+    out_fmt,
+    proj_codes,
+    is_all_projects,
+    interval,
 ):
     """Command line for List Container
     Functions:
@@ -1025,6 +1295,20 @@ def ccs(
     """
 
     site_ids_or_names = mk_names(name, site_ids_or_names)
+    proj_codes = project_codes(proj_codes, is_all_projects)
+    chk_projects(proj_codes, site_ids_or_names, res_property)
+    if not isNone(interval):
+        chk_watch(
+            site_ids_or_names,
+            res_property,
+            proj_codes,
+            product_type or show_ports or not isNone(get_info),
+        )
+        return watch_listing(
+            "CCS Info.", ccs_listing(is_all), interval, is_table, out_fmt
+        )
+    if not isNone(proj_codes):
+        return list_ccs_projects(proj_codes, is_all, is_table, out_fmt)
     if res_property in ["flavor", "image", "commit", "solution", "log"]:
         list_ccs_with_properties(
             res_property, site_ids_or_names, product_type, is_table
@@ -1055,7 +1339,7 @@ def ccs(
                 )
 
         else:
-            list_ccs(site_ids_or_names, is_table, is_all)
+            list_ccs(site_ids_or_names, is_table, is_all, out_fmt=out_fmt)
 
 
 @click.command(help="List your keypairs in VCS.")
@@ -1076,10 +1360,18 @@ def ccs(
     show_default=True,
     help="Show information in Table view or JSON view.",
 )
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @pass_environment
 # @click.pass_context ctx,
-def key(env, name, is_table, ids_or_names):
+def key(env, name, is_table, ids_or_names, out_fmt=None):
     """Command line for List Key"""
     ids_or_names = mk_names(name, ids_or_names)
 
@@ -1093,7 +1385,9 @@ def key(env, name, is_table, ids_or_names):
         cols = ["name", "fingerprint"]
         ans = keyring.list()
 
-    if is_table:
+    if not isNone(out_fmt):
+        stream_layout(ans, cols, out_fmt)
+    elif is_table:
         table_layout(" Existing Keypairs ", ans, cols, isPrint=True, is_warp=False)
     else:
         jpp(ans)
@@ -1120,17 +1414,40 @@ def key(env, name, is_table, ids_or_names):
     default=False,
     help="List volume snapshots.",
 )
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
+@project_options
 @click.argument("ids_or_names", nargs=-1)
 @click.command(help="List your VDS (Virtual Disk Service).")
 @click.pass_context
-def vds(ctx, name, ids_or_names, snapshot, is_all, is_table):
+def vds(
+    ctx,
+    name,
+    ids_or_names,
+    snapshot,
+    is_all,
+    is_table,
+    out_fmt,
+    proj_codes,
+    is_all_projects,
+):
     """Command line for list vds
 
     :param name: Enter name for your resources.
     :type name: string
     """
     ids_or_names = mk_names(name, ids_or_names)
-    list_volume(ids_or_names, snapshot, is_all, is_table)
+    proj_codes = project_codes(proj_codes, is_all_projects)
+    chk_projects(proj_codes, ids_or_names)
+    if not isNone(proj_codes):
+        return list_volume_projects(proj_codes, snapshot, is_all, is_table, out_fmt)
+    list_volume(ids_or_names, snapshot, is_all, is_table, out_fmt=out_fmt)
 
 
 @click.option(
@@ -1157,10 +1474,18 @@ def vds(ctx, name, ids_or_names, snapshot, is_all, is_table):
     show_default=True,
     help="Show information in Table view or JSON view.",
 )
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @click.command(help="List your Virtual Network.")
 @click.pass_context
-def vnet(ctx, vnetid, ids_or_names, is_all, is_table):
+def vnet(ctx, vnetid, ids_or_names, is_all, is_table, out_fmt):
     """Command line for list virtual network
 
     :param vnetid: Enter name for your resources.
@@ -1183,7 +1508,9 @@ def vnet(ctx, vnetid, ids_or_names, is_all, is_table):
     else:
         ans = net.list()
         cols = ["id", "name", "cidr", "create_time", "status"]
-    if is_table:
+    if not isNone(out_fmt):
+        stream_layout(ans, cols, out_fmt)
+    elif is_table:
         table_layout("VCS Networks", ans, cols, isPrint=True)
     else:
         jpp(ans)
@@ -1214,10 +1541,18 @@ def vnet(ctx, vnetid, ids_or_names, is_all, is_table):
     show_default=True,
     help="Show information in Table view or JSON view.",
 )
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @click.command(help="List your Load Balancers.")
 @click.pass_context
-def vlb(ctx, vlb_id, ids_or_names, column, is_all, is_table):
+def vlb(ctx, vlb_id, ids_or_names, column, is_all, is_table, out_fmt):
     """Command line for list vds
 
     :param vlb_id: Enter id for your load balancer.
@@ -1227,7 +1562,7 @@ def vlb(ctx, vlb_id, ids_or_names, column, is_all, is_table):
 
     """
     ids_or_names = mk_names(vlb_id, ids_or_names)
-    list_load_balances(ids_or_names, column, is_all, is_table)
+    list_load_balances(ids_or_names, column, is_all, is_table, out_fmt=out_fmt)
 
 
 @click.option("-id", "--eip-id", "ip_id", type=int, help="Index of the eip.")
@@ -1262,10 +1597,30 @@ def vlb(ctx, vlb_id, ids_or_names, column, is_all, is_table):
     show_default=True,
     help="Show information in Table view or JSON view.",
 )
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
+@project_options
 @click.argument("ids_or_names", nargs=-1)
 @click.command(help="List your ips.")
 @click.pass_context
-def eip(ctx, ip_id, filter_type, ids_or_names, column, is_table, is_all):
+def eip(
+    ctx,
+    ip_id,
+    filter_type,
+    ids_or_names,
+    column,
+    is_table,
+    is_all,
+    out_fmt,
+    proj_codes,
+    is_all_projects,
+):
     """Command line for list eip
 
     :param ip_id: Enter id for your fixed ips.
@@ -1275,7 +1630,13 @@ def eip(ctx, ip_id, filter_type, ids_or_names, column, is_table, is_all):
 
     """
     ids_or_names = mk_names(ip_id, ids_or_names)
-    list_fixed_ips(ids_or_names, column, filter_type, is_table, is_all)
+    proj_codes = project_codes(proj_codes, is_all_projects)
+    chk_projects(proj_codes, ids_or_names)
+    if not isNone(proj_codes):
+        return list_fixed_ips_projects(
+            proj_codes, column, filter_type, is_all, is_table, out_fmt
+        )
+    list_fixed_ips(ids_or_names, column, filter_type, is_table, is_all, out_fmt=out_fmt)
 
 
 @click.option("-id", "--ssl-id", "ssl_id", type=int, help="Index of the ssl.")
@@ -1295,17 +1656,25 @@ def eip(ctx, ip_id, filter_type, ids_or_names, column, is_table, is_all):
     show_default=True,
     help="Show information in Table view or JSON view.",
 )
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @click.command(help="List your ssls.")
 @click.pass_context
-def ssl(ctx, ssl_id, ids_or_names, column, is_table):
+def ssl(ctx, ssl_id, ids_or_names, column, is_table, out_fmt):
     """Command line for create SSL
 
     :param name: Enter name for your resources.
     :type name: string
     """
     ids_or_names = mk_names(ssl_id, ids_or_names)
-    list_ssls(ids_or_names, column, is_table)
+    list_ssls(ids_or_names, column, is_table, out_fmt=out_fmt)
 
 
 @click.option(
@@ -1342,13 +1711,21 @@ def vcsi(ctx, is_table):
     type=bool,
     help="List all the images in the project.",
 )
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @click.command(help="List your system (bootable) images.")
 @click.pass_context
-def vcsi(ctx, vcsi_id, ids_or_names, is_table, is_all):
+def vcsi(ctx, vcsi_id, ids_or_names, is_table, is_all, out_fmt):
     """Command line for checking bootable images"""
     ids_or_names = mk_names(vcsi_id, ids_or_names)
-    list_vcsi_img(ids_or_names, is_table, is_all)
+    list_vcsi_img(ids_or_names, is_table, is_all, out_fmt=out_fmt)
 
 
 @click.option(
@@ -1406,13 +1783,21 @@ def vcsi(ctx, is_table):
     type=bool,
     help="List all the images in the project.",
 )
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @click.command(help="List your system (bootable) images.")
 @click.pass_context
-def vcsi(ctx, vcsi_id, ids_or_names, is_table, is_all):
+def vcsi(ctx, vcsi_id, ids_or_names, is_table, is_all, out_fmt):
     """Command line for checking bootable images"""
     ids_or_names = mk_names(vcsi_id, ids_or_names)
-    list_vcsi_img(ids_or_names, is_table, is_all)
+    list_vcsi_img(ids_or_names, is_table, is_all, out_fmt=out_fmt)
 
 
 @click.option(
@@ -1442,10 +1827,18 @@ def vcsi(ctx, vcsi_id, ids_or_names, is_table, is_all):
     default=None,
     help="Tyep of the security resource.",
 )  # ccs, vlb, detail, proj
+@click.option(
+    "-out",
+    "--output",
+    "out_fmt",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default=None,
+    help="Stream rows in ndjson, csv or tsv instead of Table/JSON view.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @click.command(help="List your security groups.")
 @click.pass_context
-def secg(ctx, secg_id, ids_or_names, secg_type, is_table, is_all):
+def secg(ctx, secg_id, ids_or_names, secg_type, is_table, is_all, out_fmt):
     """_summary_
 
     Args:
@@ -1456,7 +1849,7 @@ def secg(ctx, secg_id, ids_or_names, secg_type, is_table, is_all):
         is_all (bool): _description_
     """
     ids_or_names = mk_names(secg_id, ids_or_names)
-    list_secg(ids_or_names, secg_type, is_table, is_all)
+    list_secg(ids_or_names, secg_type, is_table, is_all, out_fmt=out_fmt)
 
 
 # end object ==================================================
@@ -28,6 +28,7 @@ from twccli.twcc.util import (
     isNone,
     jpp,
     mk_names,
+    mk_batch_names,
     isFile,
     name_validator,
     window_password_validater,
@@ -39,7 +40,9 @@ from twccli.twcc.services.network import Networks
 from twccli.twcc.services.compute_util import (
     doSiteStable,
     create_vcs,
+    create_vcs_batch,
     create_ccs,
+    create_ccs_batch,
     list_vcs,
     create_secg,
     create_secg_rule,
@@ -556,6 +559,15 @@ default_vcs_name = "twcc-vcs_"
     flag_value=True,
     help="Wait until your instance to be provisioned.",
 )
+@click.option(
+    "-count",
+    "--count",
+    "count",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of instances, `-n` is a name template then. ie: sweep-{i:02d}",
+)
 @click.argument("ids_or_names", nargs=-1)
 @pass_environment
 @click.pass_context
@@ -584,6 +596,7 @@ def vcs(
     secg,
     is_apikey,
     is_table,
+    count,
 ):  # NOSONAR
     if snapshot:
         sids = mk_names(site_id, ids_or_names)
@@ -636,9 +649,11 @@ def vcs(
             if not isNone(password):
                 if window_password_validater(password):
                     name = name + "win"
+            if count > 1:
+                # leave room for the `-N` suffix
+                name = name[: 15 - len(str(count))]
 
-        ans = create_vcs(
-            name,
+        vcs_args = dict(
             sol=sol.lower(),
             img_name=img_name,
             network=network,
@@ -655,6 +670,15 @@ def vcs(
             eip=eip,
             secg=secg,
         )
+        if count > 1:
+            ans = create_vcs_batch(mk_batch_names(name, count), wait=wait, **vcs_args)
+            if is_table:
+                cols = ["name", "id", "status", "public_ip", "private_ip", "message"]
+                table_layout("VCS Sites", ans, cols, isPrint=True, captionInOrder=True)
+            else:
+                jpp(ans)
+            return
+        ans = create_vcs(name, **vcs_args)
         ans["solution"] = sol
         ans["flavor"] = flavor
 
@@ -841,6 +865,15 @@ def key(env, name, public_key):
     flag_value=True,
     help="Wait until your container to be provisioned.",
 )
+@click.option(
+    "-count",
+    "--count",
+    "count",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of containers, `-n` is a name template then. ie: sweep-{i:02d}",
+)
 @pass_environment
 def ccs(
     env,
@@ -858,6 +891,7 @@ def ccs(
     dup_tag,
     is_apikey,
     is_table,
+    count,
 ):
 
     if req_dup:
@@ -866,6 +900,23 @@ def ccs(
         if isNone(dup_tag):
             dup_tag = "twccli_{}".format(datetime.now().strftime("_%m%d%H%M"))
         create_commit(site_id, dup_tag)
+    elif count > 1:
+        ans = create_ccs_batch(
+            mk_batch_names(name, count),
+            gpu,
+            flavor,
+            sol,
+            img_name,
+            cmd,
+            mk_env_dict(),
+            is_apikey,
+            wait=wait,
+        )
+        if is_table:
+            cols = ["name", "id", "status", "ssh", "message"]
+            table_layout("CCS Sites", ans, cols, isPrint=True, captionInOrder=True)
+        else:
+            jpp(ans)
     else:
         ans = create_ccs(
             name, gpu, flavor, sol, img_name, cmd, mk_env_dict(), is_apikey
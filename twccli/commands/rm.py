@@ -29,6 +29,7 @@ from twccli.twcc.services.compute import (
     SecurityGroups,
 )
 from twccli.twcc.services.compute_util import del_vcs, getConfirm
+from twccli.twcc.services.bulk import BulkDelete
 from twccli.twcc.services.generic import GenericService
 from twccli.twcc.services.network import Networks
 from twccli.twcc.util import (
@@ -79,21 +80,22 @@ def del_object(okey, bucket_name, isForce=False):
         S3().del_object(bucket_name=bucket_name, file_name=okey)
 
 
-def del_ccs(ids_or_names, isForce=False):
+def del_ccs(ids_or_names, isForce=False, wait=False):
     """Delete ccs by id or name
 
     :param ids_or_names: name for deleting object.
     :type ids_or_names: string
     :param force: Force to delete any resources at your own cost.
     :type force: bool
+    :param wait: wait until every container is gone
+    :type wait: bool
     """
-    if getConfirm("Delete CCS", ", ".join(ids_or_names), isForce):
-        ccs = GpuSite()
-        for con_id in ids_or_names:
-            if ccs.delete(con_id):
-                print("Successfully remove {}".format(con_id))
-    else:
-        print("No delete operations.")
+    ccs = GpuSite()
+    return BulkDelete(
+        "Delete CCS",
+        ccs.delete,
+        list_ids=lambda: [x["id"] for x in ccs.list(is_all=True)],
+    ).run(ids_or_names, isForce, wait=wait)
 
 
 def del_keypair(ids_or_names, isForce=False):
@@ -198,25 +200,29 @@ def del_secg_from_vcs(ids_or_names, site_id=None, isForce=False, isAll=False):
                     secg.deleteRule(rule["id"])
 
 
-def del_ip(ids_or_names, isForce=False):
+def _created_by(res_id, ans):
+    return "- id: {}, created by: {}, created time: {}".format(
+        res_id, ans["user"]["display_name"], ans["create_time"]
+    )
+
+
+def del_ip(ids_or_names, isForce=False, wait=False):
     """Delete ip by ip id
 
     :param ids_or_names: name for deleting object.
     :type ids_or_names: string
     :param force: Force to delete any resources at your own cost.
     :type force: bool
+    :param wait: wait until every ip is gone
+    :type wait: bool
     """
     eip = Fixedip()
-    for ip_id in ids_or_names:
-        ans = eip.list(ip_id)
-        txt = "You about to delete ip \n- id: {}\n- created by: {}\n- created time: {}".format(
-            ip_id, ans["user"]["display_name"], ans["create_time"]
-        )
-        if getConfirm("IP", ip_id, isForce, txt):
-            eip.deleteById(ip_id)
-            print("Successfully remove {}".format(ip_id))
-        else:
-            print("No delete operations.")
+    return BulkDelete(
+        "IP",
+        eip.deleteById,
+        check=lambda ip_id: _created_by(ip_id, eip.list(ip_id)),
+        list_ids=lambda: [x["id"] for x in eip.list(isAll=True)],
+    ).run(ids_or_names, isForce, wait=wait)
 
 
 def del_ssl(ids_or_names, isforce=False):
@@ -228,16 +234,11 @@ def del_ssl(ids_or_names, isforce=False):
     :type force: bool
     """
     ssl = Secrets()
-    for ssl_id in ids_or_names:
-        ans = ssl.list(ssl_id)
-        txt = "You about to delete SSL \n- id: {}\n- created by: {}\n- created time: {}".format(
-            ssl_id, ans["user"]["display_name"], ans["create_time"]
-        )
-        if getConfirm("SSL", ssl_id, isforce, txt):
-            ssl.deleteById(ssl_id)
-            print("Successfully remove {}".format(ssl_id))
-        else:
-            print("No delete operations.")
+    return BulkDelete(
+        "SSL",
+        ssl.deleteById,
+        check=lambda ssl_id: _created_by(ssl_id, ssl.list(ssl_id)),
+    ).run(ids_or_names, isforce)
 
 
 def del_ssl(ids_or_names, isforce=False):
@@ -249,16 +250,11 @@ def del_ssl(ids_or_names, isforce=False):
     :type force: bool
     """
     ssl = Secrets()
-    for ssl_id in ids_or_names:
-        ans = ssl.list(ssl_id)
-        txt = "You about to delete SSL \n- id: {}\n- created by: {}\n- created time: {}".format(
-            ssl_id, ans["user"]["display_name"], ans["create_time"]
-        )
-        if getConfirm("SSL", ssl_id, isforce, txt):
-            ssl.deleteById(ssl_id)
-            print("Successfully remove {}".format(ssl_id))
-        else:
-            print("No delete operations.")
+    return BulkDelete(
+        "SSL",
+        ssl.deleteById,
+        check=lambda ssl_id: _created_by(ssl_id, ssl.list(ssl_id)),
+    ).run(ids_or_names, isforce)
 
 
 def del_ssl(ids_or_names, isforce=False):
@@ -270,16 +266,11 @@ def del_ssl(ids_or_names, isforce=False):
     :type force: bool
     """
     ssl = Secrets()
-    for ssl_id in ids_or_names:
-        ans = ssl.list(ssl_id)
-        txt = "You about to delete SSL \n- id: {}\n- created by: {}\n- created time: {}".format(
-            ssl_id, ans["user"]["display_name"], ans["create_time"]
-        )
-        if getConfirm("SSL", ssl_id, isforce, txt):
-            ssl.deleteById(ssl_id)
-            print("Successfully remove {}".format(ssl_id))
-        else:
-            print("No delete operations.")
+    return BulkDelete(
+        "SSL",
+        ssl.deleteById,
+        check=lambda ssl_id: _created_by(ssl_id, ssl.list(ssl_id)),
+    ).run(ids_or_names, isforce)
 
 
 def del_ssl(ids_or_names, isforce=False):
@@ -291,16 +282,11 @@ def del_ssl(ids_or_names, isforce=False):
     :type force: bool
     """
     ssl = Secrets()
-    for ssl_id in ids_or_names:
-        ans = ssl.list(ssl_id)
-        txt = "You about to delete SSL \n- id: {}\n- created by: {}\n- created time: {}".format(
-            ssl_id, ans["user"]["display_name"], ans["create_time"]
-        )
-        if getConfirm("SSL", ssl_id, isforce, txt):
-            ssl.deleteById(ssl_id)
-            print("Successfully remove {}".format(ssl_id))
-        else:
-            print("No delete operations.")
+    return BulkDelete(
+        "SSL",
+        ssl.deleteById,
+        check=lambda ssl_id: _created_by(ssl_id, ssl.list(ssl_id)),
+    ).run(ids_or_names, isforce)
 
 
 def del_ssl(ids_or_names, isforce=False):
@@ -312,16 +298,11 @@ def del_ssl(ids_or_names, isforce=False):
     :type force: bool
     """
     ssl = Secrets()
-    for ssl_id in ids_or_names:
-        ans = ssl.list(ssl_id)
-        txt = "You about to delete SSL \n- id: {}\n- created by: {}\n- created time: {}".format(
-            ssl_id, ans["user"]["display_name"], ans["create_time"]
-        )
-        if getConfirm("SSL", ssl_id, isforce, txt):
-            ssl.deleteById(ssl_id)
-            print("Successfully remove {}".format(ssl_id))
-        else:
-            print("No delete operations.")
+    return BulkDelete(
+        "SSL",
+        ssl.deleteById,
+        check=lambda ssl_id: _created_by(ssl_id, ssl.list(ssl_id)),
+    ).run(ids_or_names, isforce)
 
 
 def del_ssl(ids_or_names, isforce=False):
@@ -333,38 +314,32 @@ def del_ssl(ids_or_names, isforce=False):
     :type force: bool
     """
     ssl = Secrets()
-    for ssl_id in ids_or_names:
-        ans = ssl.list(ssl_id)
-        txt = "You about to delete SSL \n- id: {}\n- created by: {}\n- created time: {}".format(
-            ssl_id, ans["user"]["display_name"], ans["create_time"]
-        )
-        if getConfirm("SSL", ssl_id, isforce, txt):
-            ssl.deleteById(ssl_id)
-            print("Successfully remove {}".format(ssl_id))
-        else:
-            print("No delete operations.")
+    return BulkDelete(
+        "SSL",
+        ssl.deleteById,
+        check=lambda ssl_id: _created_by(ssl_id, ssl.list(ssl_id)),
+    ).run(ids_or_names, isforce)
 
 
-def del_secg(ids_or_names, isforce=False):
-    """Delete ssl by ip id
+def del_secg(ids_or_names, isforce=False, wait=False):
+    """Delete security groups by id
 
     :param ids_or_names: name for deleting object.
     :type ids_or_names: string
     :param force: Force to delete any resources at your own cost.
     :type force: bool
+    :param wait: wait until every security group is gone
+    :type wait: bool
     """
-
-    for secg_id in ids_or_names:
-        secg = SecurityGroups()  # need in the for loop！
-        ans = secg.list(ids=[secg_id], secg_type="detail")[0]
-        txt = "You about to delete security group \n- id: {}\n- created by: {}\n- created time: {}".format(
-            secg_id, ans["user"]["display_name"], ans["create_time"]
-        )
-        if getConfirm("Security Group", secg_id, isforce, txt):
-            secg.deleteById(secg_id)
-            print("Successfully remove {}".format(secg_id))
-        else:
-            print("No delete operations.")
+    secg = SecurityGroups()
+    return BulkDelete(
+        "Security Group",
+        secg.deleteById,
+        check=lambda secg_id: _created_by(
+            secg_id, secg.list(ids=[secg_id], secg_type="detail")[0]
+        ),
+        list_ids=lambda: [x["id"] for x in secg.list(secg_type="project", isall=True)],
+    ).run(ids_or_names, isforce, wait=wait)
 
 
 def del_secg_rule(ids_or_names, isforce=False):
@@ -395,19 +370,14 @@ def del_load_balancer(ids_or_names, isForce=False):
 
     """
     vlb = LoadBalancers()
-    for vlb_id in ids_or_names:
-        ans = vlb.list(vlb_id)
-        txt = "You about to delete load balancer \n- id: {}\n- created by: {}\n- created time: {}".format(
-            vlb_id, ans["user"]["display_name"], ans["create_time"]
-        )
-        if getConfirm("Load Balancer", vlb_id, isForce, txt):
-            vlb.deleteById(vlb_id)
-            print("Successfully remove {}".format(vlb_id))
-        else:
-            print("No delete operations.")
+    return BulkDelete(
+        "Load Balancer",
+        vlb.deleteById,
+        check=lambda vlb_id: _created_by(vlb_id, vlb.list(vlb_id)),
+    ).run(ids_or_names, isForce)
 
 
-def del_volume(ids_or_names, isForce=False, snapshot=None):
+def del_volume(ids_or_names, isForce=False, snapshot=None, wait=False):
     """Delete volume by volume id
 
     :param ids_or_names: name for deleting object.
@@ -418,18 +388,19 @@ def del_volume(ids_or_names, isForce=False, snapshot=None):
     :type site_id: int
     :param isAll: Operates as tenant admin
     :type isAll: bool
+    :param wait: wait until every volume is gone
+    :type wait: bool
     """
     if snapshot:
         title = "Delete Volume Snapshot"
     else:
         title = "Delete Volumes"
-    if getConfirm(title, ", ".join(ids_or_names), isForce):
-        vol = Volumes()
-        for vol_id in ids_or_names:
-            ans = vol.deleteById(vol_id, snapshot)
-            print("Successfully remove {}".format(vol_id))
-    else:
-        print("No delete operations.")
+    vol = Volumes()
+    return BulkDelete(
+        title,
+        lambda vol_id: vol.deleteById(vol_id, snapshot),
+        list_ids=lambda: [x["id"] for x in vol.list(isAll=True, snapshot=snapshot)],
+    ).run(ids_or_names, isForce, wait=wait)
 
 
 # Create groups for command
@@ -533,9 +504,18 @@ def key(ctx, env, name, ids_or_names, force):
     flag_value="SecurityGroup",
     help="Delete existing security group(s).",
 )
+@click.option(
+    "-wait",
+    "--wait",
+    "wait",
+    is_flag=True,
+    default=False,
+    flag_value=True,
+    help="Wait until the resources are gone.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @pass_environment
-def vcs(env, res_property, name, force, is_all, site_id, ids_or_names):
+def vcs(env, res_property, name, force, is_all, site_id, ids_or_names, wait):
     """Command line for VCS removing
     Function :
     1. Keypair
@@ -553,6 +533,8 @@ def vcs(env, res_property, name, force, is_all, site_id, ids_or_names):
     :type force: bool
     :param is_all: Operates as tenant admin.
     :type is_all: bool
+    :param wait: Wait until the instances are gone.
+    :type wait: bool
     """
     if res_property == "SecurityGroup":
         del_secg_from_vcs(mk_names(name, ids_or_names), site_id, force, is_all)
@@ -561,7 +543,7 @@ def vcs(env, res_property, name, force, is_all, site_id, ids_or_names):
     if isNone(res_property):
         ids_or_names = mk_names(site_id, ids_or_names)
         if len(ids_or_names) > 0:
-            del_vcs(ids_or_names, force)
+            del_vcs(ids_or_names, force, wait=wait)
         else:
             print("resource id is required.")
 
@@ -657,9 +639,18 @@ def cos(env, name, force, okey, is_recursive):
     help="Force delete the container.",
 )
 @click.option("-s", "--site-id", "site_id", help="ID of the container.")
+@click.option(
+    "-wait",
+    "--wait",
+    "wait",
+    is_flag=True,
+    default=False,
+    flag_value=True,
+    help="Wait until the resources are gone.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @pass_environment
-def ccs(env, site_id, force, ids_or_names):
+def ccs(env, site_id, force, ids_or_names, wait):
     ids_or_names = mk_names(site_id, ids_or_names)
     if len(ids_or_names) == 0:
         raise ValueError("Resource id is required.")
@@ -671,7 +662,7 @@ def ccs(env, site_id, force, ids_or_names):
                 result = False
 
         if result:
-            del_ccs(ids_or_names, force)
+            del_ccs(ids_or_names, force, wait=wait)
         else:
             print("site id must be integer")
 
@@ -723,17 +714,26 @@ def vnet(env, ids_or_names, vnetid, force):
     default=False,
     help="Delete volume snapshots.",
 )
+@click.option(
+    "-wait",
+    "--wait",
+    "wait",
+    is_flag=True,
+    default=False,
+    flag_value=True,
+    help="Wait until the resources are gone.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @click.command(help="Delete your VDS (Virtual Disk Service).")
 @click.pass_context
-def vds(ctx, name, ids_or_names, snapshot, force):
+def vds(ctx, name, ids_or_names, snapshot, force, wait):
     """Command line for delete vds
 
     :param name: Enter name for your resources.
     :type name: string
     """
     ids_or_names = mk_names(name, ids_or_names)
-    del_volume(ids_or_names, force, snapshot=snapshot)
+    del_volume(ids_or_names, force, snapshot=snapshot, wait=wait)
 
 
 @click.option("-id", "--vlb-id", "vlb_id", help="Index of the volume.")
@@ -769,17 +769,26 @@ def vlb(ctx, vlb_id, ids_or_names, force):
     default=False,
     help="Force delete the container.",
 )
+@click.option(
+    "-wait",
+    "--wait",
+    "wait",
+    is_flag=True,
+    default=False,
+    flag_value=True,
+    help="Wait until the resources are gone.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @click.command(help="Delete your IPs.")
 @click.pass_context
-def eip(ctx, ip_id, ids_or_names, force):
+def eip(ctx, ip_id, ids_or_names, force, wait):
     """Command line for delete eip
 
     :param ip_id: Enter id for your eip.
     :type ip_id: string
     """
     ids_or_names = mk_names(ip_id, ids_or_names)
-    del_ip(ids_or_names, force)
+    del_ip(ids_or_names, force, wait=wait)
 
 
 @click.option("-id", "--ssl-id", "ssl_id", help="Index of the ssls.")
@@ -1101,13 +1110,22 @@ def me(ctx, is_dry, is_force):
     default=False,
     help="Force delete the container.",
 )
+@click.option(
+    "-wait",
+    "--wait",
+    "wait",
+    is_flag=True,
+    default=False,
+    flag_value=True,
+    help="Wait until the resources are gone.",
+)
 @click.argument("ids_or_names", nargs=-1)
 @click.command(help="Delete your security groups.")
 @click.pass_context
-def secg(ctx, secg_id, ids_or_names, force):
+def secg(ctx, secg_id, ids_or_names, force, wait):
 
     ids_or_names = mk_names(secg_id, ids_or_names)
-    del_secg(ids_or_names, force)
+    del_secg(ids_or_names, force, wait=wait)
 
 
 @click.option("-id", "--rule-id", "rule_id", help="Index of the security group rule.")
@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+"""Keeps a warm twccli in the background, ie: `TWCC_DAEMON=on twccli ls vcs`
+
+`main()` is the `twccli` entry point. With TWCC_DAEMON=on it forwards the
+command to a daemon on `TWCC_DATA_PATH/daemon/twccli.sock`, starting one
+when none answers, else it runs the command in this process as before. The
+daemon has the modules, the parsed credential file and the keep-alive
+connections of its HTTP session already, it runs the commands one at a
+time and exits after TWCC_DAEMON_IDLE (900) seconds without any. The rate
+limiter, circuit breakers and caches are built again for every command,
+from the TWCC_* environment of its client.
+
+The output, prompts and exit code are the ones of running it here. Runs
+with --profile, tracing, metrics or -sv are not forwarded.
+
+One json object per line on the socket:
+
+    client: {"argv", "cwd", "env", "tty"}, {"line"} answering a read
+    daemon: {"out"}, {"err"}, {"read"}, then {"exit"}
+
+Only stdlib is imported here, the daemon imports the rest.
+"""
+from __future__ import print_function
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import traceback
+
+LOCAL_FLAGS = set(
+    [
+        "--profile",
+        "--profile-json",
+        "--trace-file",
+        "--metrics-file",
+        "-sv",
+        "--show_and_verbose",
+    ]
+)
+LOCAL_ENV = ("TWCC_TRACE_FILE", "TWCC_METRICS_FILE")
+# environment of the client the commands see
+FORWARD_ENV = ("COLUMNS", "LINES", "TERM", "NO_COLOR")
+
+
+def data_path():
+    if "TWCC_DATA_PATH" in os.environ and os.path.isdir(os.environ["TWCC_DATA_PATH"]):
+        return os.environ["TWCC_DATA_PATH"]
+    homepath = os.environ["HOME"] if "HOME" in os.environ else os.environ["HOMEPATH"]
+    return os.path.join(homepath, ".twcc_data")
+
+
+def socket_path():
+    return os.path.join(data_path(), "daemon", "twccli.sock")
+
+
+def is_enabled():
+    return os.environ.get("TWCC_DAEMON", "off").lower() in ("on", "1", "true")
+
+
+def _send(wfile, msg):
+    wfile.write((json.dumps(msg) + "\n").encode("utf8"))
+    wfile.flush()
+
+
+def _recv(rfile):
+    line = rfile.readline()
+    if len(line) == 0:
+        raise EOFError("the connection is closed")
+    return json.loads(line.decode("utf8"))
+
+
+def _connect(path, timeout=None):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except (IOError, OSError):
+        sock.close()
+        raise
+    return sock
+
+
+def request(msg, path=None, timeout=5):
+    """One message and its answer, ie: {"op": "status"}"""
+    sock = _connect(socket_path() if path is None else path, timeout)
+    try:
+        rfile, wfile = sock.makefile("rb"), sock.makefile("wb")
+        _send(wfile, msg)
+        return _recv(rfile)
+    finally:
+        sock.close()
+
+
+def forward(argv, sock, stdin=None, stdout=None, stderr=None, env=None):
+    """Runs argv in the daemon connected on sock, returns its exit code"""
+    stdin = sys.stdin if stdin is None else stdin
+    stdout = sys.stdout if stdout is None else stdout
+    stderr = sys.stderr if stderr is None else stderr
+    env = os.environ if env is None else env
+    try:
+        rfile, wfile = sock.makefile("rb"), sock.makefile("wb")
+        _send(
+            wfile,
+            {
+                "argv": list(argv),
+                "cwd": os.getcwd(),
+                "env": dict(
+                    [
+                        (k, v)
+                        for k, v in env.items()
+                        if k.startswith("TWCC_")
+                        or k.startswith("_TWCC_")
+                        or k in FORWARD_ENV
+                    ]
+                ),
+                "tty": [_isatty(stdout), _isatty(stderr)],
+            },
+        )
+        while True:
+            try:
+                msg = _recv(rfile)
+            except EOFError:
+                stderr.write("twccli daemon closed the connection.\n")
+                return 1
+            if "out" in msg:
+                stdout.write(msg["out"])
+                stdout.flush()
+            elif "err" in msg:
+                stderr.write(msg["err"])
+                stderr.flush()
+            elif "read" in msg:
+                _send(wfile, {"line": stdin.readline()})
+            elif "exit" in msg:
+                return msg["exit"]
+    finally:
+        sock.close()
+
+
+def _isatty(stream):
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+def start(wait=5.0):
+    """Starts a daemon in the background, returns once it answers"""
+    path = socket_path()
+    log_dir = os.path.join(data_path(), "log")
+    if not os.path.isdir(log_dir):
+        os.makedirs(log_dir)
+    with open(os.path.join(log_dir, "daemon.log"), "ab") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "twccli.daemon", "serve"],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            close_fds=True,
+            start_new_session=True,
+        )
+    start_time = time.time()
+    while time.time() - start_time < wait:
+        try:
+            return request({"op": "status"}, path)
+        except (IOError, OSError, EOFError, ValueError):
+            time.sleep(0.05)
+    return None
+
+
+def _connect_or_start():
+    """A connection to the daemon, starts one when none answers"""
+    for is_started in (False, True):
+        try:
+            return _connect(socket_path())
+        except (IOError, OSError):
+            # ie: not started yet or gone idle
+            if is_started or start() is None:
+                return None
+
+
+def is_local(argv):
+    """Commands run by the client itself, ie: their output files are its own"""
+    if len(argv) > 0 and argv[0] == "daemon":
+        return True
+    if any([x == f or x.startswith(f + "=") for x in argv for f in LOCAL_FLAGS]):
+        return True
+    return any([os.environ.get(x) for x in LOCAL_ENV])
+
+
+def main():
+    argv = sys.argv[1:]
+    if is_enabled() and not is_local(argv):
+        sock = _connect_or_start()
+        if not sock is None:
+            sys.exit(forward(argv, sock))
+    from twccli.twccli import cli
+
+    cli()
+
+
+class _Stream(io.TextIOBase):
+    """sys.stdout or sys.stderr of a forwarded command"""
+
+    def __init__(self, wfile, key, is_tty, rfile=None):
+        self.wfile = wfile
+        self.key = key
+        self.is_tty = is_tty
+        self.rfile = rfile
+
+    @property
+    def encoding(self):
+        return "utf-8"
+
+    def isatty(self):
+        return self.is_tty
+
+    def writable(self):
+        return self.key in ("out", "err")
+
+    def readable(self):
+        return self.key == "in"
+
+    def write(self, text):
+        # click takes streams accepting bytes for binary ones
+        if not isinstance(text, str):
+            raise TypeError("write() argument must be str")
+        if len(text) > 0:
+            _send(self.wfile, {self.key: text})
+        return len(text)
+
+    def readline(self, size=-1):
+        _send(self.wfile, {"read": 1})
+        return _recv(self.rfile).get("line", "")
+
+
+def run_argv(argv):
+    """Runs argv like the `twccli` entry point, returns the exit code"""
+    from twccli.twccli import cli
+
+    try:
+        cli.main(args=argv, prog_name="twccli")
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def _reset_shared():
+    """Drops what was built from the TWCC_* settings of the last client
+
+    The HTTP session and the parsed files are kept, they do not depend on
+    them.
+    """
+    from twccli.twcc import breaker, cache, ratelimit
+
+    # answers of the previous command are not reused either
+    cache._single_flight = None
+    cache._http_cache = None
+    ratelimit._limiter = None
+    with breaker._breakers_lock:
+        breaker._breakers.clear()
+
+
+def _execute(argv):
+    _reset_shared()
+    return run_argv(argv)
+
+
+class Daemon(object):
+    def __init__(self, path=None, idle=None, execute=None):
+        """
+        Args:
+            path (str): the socket, socket_path() by default
+            idle (float): seconds without commands before exiting, TWCC_DAEMON_IDLE
+            execute (function): execute(argv), returns the exit code
+        """
+        self.path = socket_path() if path is None else path
+        self.idle = float(
+            os.environ.get("TWCC_DAEMON_IDLE", 900) if idle is None else idle
+        )
+        self.execute = _execute if execute is None else execute
+        self.served = 0
+        self.start_time = time.time()
+        self.is_stopped = False
+
+    def listen(self):
+        sock_dir = os.path.dirname(self.path)
+        if not os.path.isdir(sock_dir):
+            os.makedirs(sock_dir)
+        os.chmod(sock_dir, 0o700)
+        try:
+            # a busy daemon accepts but answers later
+            _connect(self.path, timeout=1).close()
+        except (IOError, OSError):
+            # a stale socket of a gone daemon
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        else:
+            raise RuntimeError("a daemon is running on %s already" % self.path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        os.chmod(self.path, 0o600)
+        server.listen(16)
+        server.settimeout(min(1.0, self.idle))
+        return server
+
+    def serve(self, server=None):
+        server = self.listen() if server is None else server
+        last_time = time.time()
+        try:
+            while not self.is_stopped and time.time() - last_time < self.idle:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                try:
+                    conn.settimeout(None)
+                    self.handle(conn)
+                except (IOError, OSError, EOFError, ValueError):
+                    # the client is gone
+                    pass
+                except Exception:
+                    traceback.print_exc()
+                finally:
+                    conn.close()
+                last_time = time.time()
+        finally:
+            server.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def status(self):
+        return {
+            "pid": os.getpid(),
+            "served": self.served,
+            "uptime": time.time() - self.start_time,
+        }
+
+    def handle(self, conn):
+        rfile, wfile = conn.makefile("rb"), conn.makefile("wb")
+        msg = _recv(rfile)
+        if msg.get("op") == "status":
+            return _send(wfile, self.status())
+        if msg.get("op") == "stop":
+            self.is_stopped = True
+            return _send(wfile, self.status())
+
+        saved = (sys.stdin, sys.stdout, sys.stderr, dict(os.environ), os.getcwd())
+        tty = msg.get("tty", [False, False])
+        sys.stdin = _Stream(wfile, "in", False, rfile)
+        sys.stdout = _Stream(wfile, "out", tty[0])
+        sys.stderr = _Stream(wfile, "err", tty[1])
+        for key in list(os.environ):
+            if key.startswith("TWCC_") or key.startswith("_TWCC_"):
+                del os.environ[key]
+        os.environ.update(msg.get("env", {}))
+        try:
+            os.chdir(msg.get("cwd", saved[4]))
+            code = self.execute(msg["argv"])
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = saved[:3]
+            os.environ.clear()
+            os.environ.update(saved[3])
+            os.chdir(saved[4])
+        self.served += 1
+        _send(wfile, {"exit": code})
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["serve"]:
+        Daemon().serve()
+    else:
+        main()
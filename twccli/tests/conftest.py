@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import pytest
+import yaml
+
+
+@pytest.fixture
+def credential(tmp_path, monkeypatch):
+    """A credential file with the projects GOV1 (default), ENT2 and ENT3"""
+    monkeypatch.setenv("TWCC_DATA_PATH", str(tmp_path))
+    monkeypatch.delenv("_TWCC_PROJECT_CODE_", raising=False)
+    conf = {
+        "_default": {
+            "twcc_username": "u",
+            "twcc_api_key": "k",
+            "twcc_proj_code": "GOV1",
+            "twcc_s3_access_key": "a",
+            "twcc_s3_secret_key": "s",
+        },
+        "_meta": {},
+        "projects": dict(
+            [
+                (x, {"CNTR": i, "VCS": i + 100})
+                for i, x in enumerate(["GOV1", "ENT2", "ENT3"])
+            ]
+        ),
+    }
+    with open(str(tmp_path / "credential"), "w") as fn:
+        yaml.safe_dump(conf, fn)
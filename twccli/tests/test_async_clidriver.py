@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+pytest.importorskip("httpx")
+
+from ..twcc.async_clidriver import ApiRequest, AsyncServiceOperation
+
+
+def test_async_requests(monkeypatch):
+    monkeypatch.setenv("_TWCC_API_KEY_", "key")
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            seen.append((self.path, self.headers.get("x-API-KEY")))
+            body = json.dumps({"id": self.path.split("?")[0].strip("/").split("/")[-1]})
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    async def main():
+        async with AsyncServiceOperation(concurrency=4) as twcc:
+            twcc._sop.host_url = "http://127.0.0.1:%d" % server.server_port
+            reqs = [
+                ApiRequest(
+                    "sites", site="openstack-taichung-default-2", url_dict={"sites": x}
+                )
+                for x in range(20)
+            ]
+            ans = await twcc.gather(reqs)
+            return reqs, ans
+
+    try:
+        reqs, ans = asyncio.run(main())
+    finally:
+        server.shutdown()
+
+    assert [x["id"] for x in ans] == [str(x) for x in range(20)]
+    # requests are left as they were built
+    assert reqs[3].url_dict == {"sites": 3}
+    assert all([key == "key" for (_, key) in seen])
+    assert "/api/v3/openstack-taichung-default-2/sites/3/" in [x for (x, _) in seen]
+
+
+def test_async_invalid_func(monkeypatch):
+    monkeypatch.setenv("_TWCC_API_KEY_", "key")
+    twcc = AsyncServiceOperation()
+    with pytest.raises(ValueError):
+        twcc.mkUrl(ApiRequest("no-such-func"))
+
+
+def test_async_breaker_once_per_call(monkeypatch):
+    import httpx
+    from ..twcc import async_clidriver
+
+    monkeypatch.setenv("_TWCC_API_KEY_", "key")
+    outcomes = []
+
+    class FakeBreaker(object):
+        def before(self):
+            pass
+
+        def recordResponse(self, r=None, err=None):
+            outcomes.append(type(err).__name__ if r is None else r.status_code)
+
+    async def no_sleep(sec):
+        pass
+
+    monkeypatch.setattr(async_clidriver, "circuit_breaker", lambda *args: FakeBreaker())
+    monkeypatch.setattr(async_clidriver, "shared_rate_limiter", lambda: None)
+    monkeypatch.setattr(async_clidriver.asyncio, "sleep", no_sleep)
+    statuses = [503, 503, 200]
+
+    async def send(req, t_url, t_headers):
+        return httpx.Response(
+            statuses.pop(0), json={}, request=httpx.Request("GET", t_url)
+        )
+
+    async def main():
+        async with AsyncServiceOperation() as twcc:
+            monkeypatch.setattr(twcc, "_send", send)
+            req = ApiRequest(
+                "sites", site="openstack-taichung-default-2", url_dict={"sites": 1}
+            )
+            return await twcc.request(req)
+
+    assert asyncio.run(main()) == {}
+    assert outcomes == [200]
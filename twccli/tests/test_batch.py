@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import sys
+import threading
+import time
+import click
+from ..twcc import batch
+
+
+def test_parse():
+    lines = [
+        "# secgs first\n",
+        "twccli mk secg -n websg\n",
+        "---\n",
+        "\n",
+        "mk secg_rule -n 'web sg' -port 80  # http\n",
+        "ls vcs\n",
+    ]
+    assert batch.parse(lines) == [
+        [(2, ["mk", "secg", "-n", "websg"])],
+        [(5, ["mk", "secg_rule", "-n", "web sg", "-port", "80"]), (6, ["ls", "vcs"])],
+    ]
+
+
+def test_run():
+    on_wire, peak, lock = [0], [0], threading.Lock()
+
+    def run_argv(argv):
+        with lock:
+            on_wire[0] += 1
+            peak[0] = max(peak[0], on_wire[0])
+        time.sleep(0.05)
+        click.echo("out %s" % argv[0])
+        print("err %s" % argv[0], file=sys.stderr)
+        with lock:
+            on_wire[0] -= 1
+        if argv[0] == "bad":
+            return 2
+        return 1 if click.confirm("sure?", default=None) else 0
+
+    segments = batch.parse(["a", "b", "c", "---", "bad", "d"])
+    ans = list(batch.run(segments, concurrency=3, run_argv=run_argv))
+    assert [x["line"] for x in ans] == [1, 2, 3, 5, 6]
+    assert [x["stdout"] for x in ans[:2]] == [
+        "out a\nsure? [y/n]: ",
+        "out b\nsure? [y/n]: ",
+    ]
+    assert ans[0]["stderr"].startswith("err a\nTraceback")
+    # lines cannot prompt, stdin is empty
+    assert ans[0]["exit"] == 1 and ans[3]["exit"] == 2
+    assert peak[0] == 3
+
+    ans = list(batch.run(segments, is_stop=True, run_argv=run_argv))
+    assert [x["exit"] for x in ans] == [1, None, None, None, None]
+    assert ans[2]["command"] == "c" and ans[2]["stdout"] == ""
+
+    ans = list(batch.run([[(1, ["batch", "-f", "x"])]], run_argv=run_argv))
+    assert ans[0]["exit"] == 2 and "cannot run" in ans[0]["stderr"]
+
+
+def test_run_cache_mode(monkeypatch):
+    from ..twcc.cache import cache_mode, using_cache_mode
+
+    monkeypatch.delenv("TWCC_CLI_CACHE", raising=False)
+    started = threading.Barrier(2, timeout=5)
+
+    def run_argv(argv):
+        if argv[0] == "refresh":
+            # ie: `twccli --refresh-cache ...`, while the other line runs
+            with using_cache_mode("refresh"):
+                started.wait()
+                click.echo(cache_mode())
+                started.wait()
+            return 0
+        started.wait()
+        started.wait()
+        click.echo(cache_mode())
+        return 0
+
+    segments = batch.parse(["refresh", "plain"])
+    ans = list(batch.run(segments, concurrency=2, run_argv=run_argv))
+    assert [x["stdout"] for x in ans] == ["refresh\n", "on\n"]
+
+    # `twccli --no-cache batch` applies to every line
+    started = threading.Barrier(1, timeout=5)
+    with using_cache_mode("off"):
+        ans = list(batch.run(segments, concurrency=2, run_argv=run_argv))
+    assert [x["stdout"] for x in ans] == ["refresh\n", "off\n"]
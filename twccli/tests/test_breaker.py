@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import time
+import pytest
+import requests
+from ..twcc import breaker
+from ..twcc.breaker import CircuitBreaker, CircuitOpenError
+
+
+class FakeResponse(object):
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def test_circuit_breaker(tmp_path, monkeypatch):
+    monkeypatch.setenv("TWCC_DATA_PATH", str(tmp_path))
+    host, platform = "https://api.twcc.ai", "k8s-D-twcc"
+    cb = CircuitBreaker(host, platform, max_failures=3, cooldown=60)
+
+    cb.recordResponse(FakeResponse(503))
+    cb.recordResponse(err=requests.Timeout())
+    cb.recordResponse(FakeResponse(200))
+    assert cb.failures == 0
+    cb.before()
+
+    for _ in range(3):
+        cb.recordResponse(FakeResponse(502))
+    assert cb.state() == "open"
+    with pytest.raises(CircuitOpenError, match="k8s-D-twcc"):
+        cb.before()
+
+    # the next run fails fast too, other platforms are not affected
+    assert CircuitBreaker(host, platform, cooldown=60).state() == "open"
+    assert CircuitBreaker(host, "goc", cooldown=60).state() == "closed"
+
+    # after the cooldown a single probe is let through
+    cb.opened = time.time() - 61
+    monkeypatch.setattr(cb, "_load", lambda: (cb.failures, cb.opened))
+    assert cb.state() == "half-open"
+    cb.before()
+    with pytest.raises(CircuitOpenError):
+        cb.before()
+    cb.recordResponse(FakeResponse(200))
+    assert cb.state() == "closed"
+    assert CircuitBreaker(host, platform, cooldown=60).state() == "closed"
+
+
+def test_circuit_breaker_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("TWCC_DATA_PATH", str(tmp_path))
+    monkeypatch.setenv("TWCC_BREAKER_FAILURES", "0")
+    cb = CircuitBreaker("https://api.twcc.ai", "goc")
+    for _ in range(10):
+        cb.recordResponse(FakeResponse(500))
+    cb.before()
+
+
+def test_circuit_breaker_per_host(tmp_path, monkeypatch):
+    monkeypatch.setenv("TWCC_DATA_PATH", str(tmp_path))
+    monkeypatch.setattr(breaker, "_breakers", {})
+    one = breaker.circuit_breaker("https://h/api/v3/sites/?project=1", "goc")
+    assert one is breaker.circuit_breaker("https://h/api/v3/sites/1/", "goc")
+    assert one.host == "https://h"
+    assert not one is breaker.circuit_breaker("https://h/api/v3/sites/", "k8s-D-twcc")
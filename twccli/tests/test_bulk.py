@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from ..twcc.services.bulk import BulkCreate, BulkDelete, BulkSkip
+
+
+def test_bulk_delete(monkeypatch):
+    on_wire, peak, deleted = [0], [0], []
+    lock = threading.Lock()
+
+    def check(res_id):
+        if res_id == "3":
+            raise BulkSkip("protected")
+        if res_id == "4":
+            raise ValueError("not found")
+        return "- %s" % res_id
+
+    def delete(res_id):
+        with lock:
+            on_wire[0] += 1
+            peak[0] = max(peak[0], on_wire[0])
+        time.sleep(0.05)
+        with lock:
+            on_wire[0] -= 1
+            deleted.append(res_id)
+
+    ids = [str(x) for x in range(1, 11)]
+    bulk = BulkDelete("VCS", delete, check=check, concurrency=4)
+    ans = bulk.run(ids, is_force=True)
+
+    assert [x["id"] for x in ans] == ids
+    assert [x["status"] for x in ans[:4]] == ["Deleted", "Deleted", "Skipped", "Failed"]
+    assert ans[3]["message"] == "not found"
+    assert sorted(deleted) == sorted(set(ids) - set(["3", "4"]))
+    assert 1 < peak[0] <= 4
+
+
+def test_bulk_wait_gone():
+    polls = []
+    left = [["1", "2", "9"], ["2", "9"], ["9"]]
+
+    def list_ids():
+        polls.append(1)
+        return left[min(len(polls), len(left)) - 1]
+
+    bulk = BulkDelete("CCS", lambda x: None, list_ids=list_ids)
+    assert bulk.waitGone(["1", "2"], interval=0) == []
+    assert len(polls) == 3
+
+    polls[:] = []
+    assert bulk.waitGone(["1", "9"], timeout=0.05, interval=0.01) == ["9"]
+
+
+def test_bulk_create(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda x: None)
+    sites, polls = {}, []
+
+    def create(name):
+        if name == "bad":
+            raise ValueError("quota")
+        sites[name] = {"id": len(sites) + 1, "name": name, "status": "Initializing"}
+        return dict(sites[name])
+
+    def list_sites():
+        polls.append(1)
+        if len(polls) == 2:
+            for site in sites.values():
+                site["status"] = "Error" if site["name"] == "b" else "Ready"
+        return list(sites.values())
+
+    bulk = BulkCreate(
+        "CCS", create, list_sites=list_sites, conn_info=lambda x: {"ssh": x["name"]}
+    )
+    ans = bulk.run(["a", "bad", "b"])
+    assert [x["status"] for x in ans] == ["Initializing", "Failed", "Initializing"]
+    assert ans[1]["message"] == "quota" and polls == []
+
+    sites.clear()
+    ans = bulk.run(["a", "b"], wait=True)
+    assert [x["status"] for x in ans] == ["Ready", "Error"]
+    assert ans[0]["ssh"] == "a" and not "ssh" in ans[1]
+    assert len(polls) == 2
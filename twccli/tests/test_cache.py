@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from ..twcc import cache
+from ..twcc.cache import MetaCache, SingleFlight, refreshed_cache, platform_root
+
+
+def mk_loader(calls):
+    def loader():
+        calls.append(1)
+        return {"calls": len(calls)}
+
+    return loader
+
+
+def test_meta_cache_fetch(tmp_path, monkeypatch):
+    monkeypatch.setenv("TWCC_DATA_PATH", str(tmp_path))
+    monkeypatch.delenv("TWCC_CLI_CACHE", raising=False)
+    calls = []
+    loader = mk_loader(calls)
+    mcache = MetaCache(ttl=60, stale_ttl=60)
+    key = MetaCache.mkKey("host", "sites", {"project": 1})
+
+    assert key == MetaCache.mkKey("host", "sites", {"project": 1})
+    assert not key == MetaCache.mkKey("host", "sites", {"project": 2})
+
+    assert mcache.fetch(key, loader) == {"calls": 1}
+    assert mcache.fetch(key, loader) == {"calls": 1}
+    assert MetaCache(ttl=60).get(key)[0] == {"calls": 1}
+
+    monkeypatch.setenv("TWCC_CLI_CACHE", "off")
+    assert mcache.fetch(key, loader) == {"calls": 2}
+    assert mcache.get(key)[0] == {"calls": 1}
+
+    monkeypatch.setenv("TWCC_CLI_CACHE", "refresh")
+    assert mcache.fetch(key, loader) == {"calls": 3}
+    assert mcache.get(key)[0] == {"calls": 3}
+
+    monkeypatch.setenv("TWCC_CLI_CACHE", "on")
+    with refreshed_cache():
+        assert mcache.fetch(key, loader) == {"calls": 4}
+        # other threads keep their mode
+        modes = []
+        thread = threading.Thread(target=lambda: modes.append(cache.cache_mode()))
+        thread.start()
+        thread.join()
+        assert modes == ["on"]
+    assert mcache.fetch(key, loader) == {"calls": 4}
+
+
+def test_meta_cache_stale_while_revalidate(tmp_path, monkeypatch):
+    monkeypatch.setenv("TWCC_DATA_PATH", str(tmp_path))
+    monkeypatch.delenv("TWCC_CLI_CACHE", raising=False)
+    calls = []
+    loader = mk_loader(calls)
+    key = MetaCache.mkKey("stale")
+    MetaCache().set(key, {"calls": 0})
+
+    # stale entry is served, a new one is fetched in background
+    assert MetaCache(ttl=-1, stale_ttl=60).fetch(key, loader) == {"calls": 0}
+    for _ in range(100):
+        if not key in cache._refreshing:
+            break
+        time.sleep(0.01)
+    assert MetaCache().get(key)[0] == {"calls": 1}
+
+    # too old to be served
+    assert MetaCache(ttl=-2, stale_ttl=0).fetch(key, loader) == {"calls": 2}
+
+
+def test_http_cache_conditional_get(tmp_path, monkeypatch):
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from ..twcc.clidriver import ServiceOperation
+
+    monkeypatch.setenv("TWCC_DATA_PATH", str(tmp_path))
+    monkeypatch.setenv("TWCC_HTTP_CACHE", "on")
+    # the repeated GET must reach the server, not the in-process memo
+    monkeypatch.setenv("TWCC_SINGLEFLIGHT", "off")
+    monkeypatch.setattr(cache, "_http_cache", None)
+    sent = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            sent.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = b'[{"id": 1}]'
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        t_api = "http://127.0.0.1:%d/api/v3/flavors/" % server.server_port
+        sop = ServiceOperation.__new__(ServiceOperation)
+        sop._debug = False
+        headers = {"x-API-KEY": "key"}
+
+        for _ in range(2):
+            r, _ = sop._api_act(t_api, headers, {"project": 1})
+            assert r.status_code == 200
+            assert r.json() == [{"id": 1}]
+        assert sent == [None, '"v1"']
+        assert cache.shared_http_cache().ratio() == "1/2 hits (50%)"
+
+        # other api keys do not share entries
+        sop._api_act(t_api, {"x-API-KEY": "other"}, {"project": 1})
+        assert sent[-1] is None
+    finally:
+        server.shutdown()
+
+
+def test_http_cache_evict(tmp_path, monkeypatch):
+    import os
+    from ..twcc.cache import HttpCache, _atomic_json_dump
+
+    monkeypatch.setenv("TWCC_DATA_PATH", str(tmp_path))
+    hcache = HttpCache(max_size=250)
+    for idx in range(3):
+        path = hcache._path("k%d" % idx)
+        _atomic_json_dump(path, {"body": "x" * 100})
+        os.utime(path, (idx, idx))
+    hcache.evict()
+    assert sorted(os.listdir(hcache.cache_dir)) == ["k1.json", "k2.json"]
+
+
+class FakeResponse(object):
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+
+def test_single_flight():
+    assert platform_root("https://h/api/v3/k8s-D-twcc/sites/12/container/") == (
+        "https://h/api/k8s-D-twcc/"
+    )
+    assert platform_root("https://h/api/v2/k8s-D-twcc/sites/?project=1") == (
+        "https://h/api/k8s-D-twcc/"
+    )
+
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    def send():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return (FakeResponse(), len(calls))
+
+    sflight = SingleFlight(ttl=60)
+    url = "https://h/api/v3/k8s-D-twcc/sites/12/"
+    ans = []
+    workers = [
+        threading.Thread(target=lambda: ans.append(sflight.do("k", url, send)))
+        for _ in range(4)
+    ]
+    workers[0].start()
+    started.wait(5)
+    for th in workers[1:]:
+        th.start()
+    release.set()
+    for th in workers:
+        th.join()
+    assert len(calls) == 1
+    assert set([x[1] for x in ans]) == set([1])
+
+    # a mutating call of the platform drops the memo, ie: an IP associated
+    sflight.invalidate("https://h/api/v3/other/sites/")
+    assert sflight.do("k", url, send)[1] == 1
+    sflight.invalidate("https://h/api/v2/k8s-D-twcc/servers/7/action/")
+    assert sflight.do("k", url, send)[1] == 2
+    assert sflight.do("k", url, send)[1] == 2
+    with sflight.fresh():
+        assert sflight.do("k", url, send)[1] == 3
+
+    # errors are not kept
+    assert sflight.do("e", url, lambda: (FakeResponse(500), "a"))[1] == "a"
+    assert sflight.do("e", url, lambda: (FakeResponse(200), "b"))[1] == "b"
+
+    # expired memos are dropped when another one is kept
+    sflight.ttl = 0
+    sflight.do("x", url, lambda: (FakeResponse(), "x"))
+    assert list(sflight._entries) == ["x"]
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from ..twcc.clidriver import RetryPolicy, ServiceOperation
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, headers={}):
+        self.status_code = status_code
+        self.headers = headers
+
+
+def test_retry_policy_next_wait():
+    retry = RetryPolicy(max_retries=2, backoff=1, max_backoff=3, max_time=10)
+
+    assert retry.nextWait("get", 0, 0, FakeResponse(200)) is None
+    assert retry.nextWait("get", 0, 0, FakeResponse(404)) is None
+    assert 0 <= retry.nextWait("get", 0, 0, FakeResponse(503)) <= 1
+    assert 0 <= retry.nextWait("delete", 1, 0, err=IOError()) <= 2
+    assert retry.nextWait("get", 2, 0, FakeResponse(503)) is None
+
+    # POST is retried only when the caller says so
+    assert retry.nextWait("post", 0, 0, FakeResponse(503)) is None
+    retry.idempotent = True
+    assert not retry.nextWait("post", 0, 0, FakeResponse(503)) is None
+
+    assert retry.nextWait("get", 0, 0, FakeResponse(429, {"Retry-After": "7"})) == 7
+    assert retry.nextWait("get", 0, 5, FakeResponse(429, {"Retry-After": "7"})) is None
+
+
+def test_api_act_retry():
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def _answer(self):
+            calls.append(self.command)
+            if len(calls) % 2 == 1:
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = b"{}"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._answer()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._answer()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        t_api = "http://127.0.0.1:%d/api/v3/sites/" % server.server_port
+        sop = ServiceOperation.__new__(ServiceOperation)
+        sop._debug = False
+
+        r, _ = sop._api_act(t_api, {}, None, retry=RetryPolicy(max_retries=1))
+        assert r.status_code == 200
+        assert calls == ["GET", "GET"]
+
+        r, _ = sop._api_act(t_api, {}, None, {}, "post", retry=RetryPolicy())
+        assert r.status_code == 503
+        assert calls == ["GET", "GET", "POST"]
+
+        retry = RetryPolicy(idempotent=True)
+        r, _ = sop._api_act(t_api, {}, None, {}, "post", retry=retry)
+        assert r.status_code == 200
+    finally:
+        server.shutdown()
+
+
+def test_url_and_header_do_not_mutate(monkeypatch):
+    monkeypatch.setenv("_TWCC_API_KEY_", "key")
+    sop = ServiceOperation()
+    url_dict = {"sites": 3, "action": ""}
+
+    t_url = sop.mkAPIUrl(
+        "openstack-taichung-default-2", func="sites", url_dict=url_dict
+    )
+    assert "/sites/3/action/" in t_url
+    assert url_dict == {"sites": 3, "action": ""}
+
+    one = sop.mkHeader(site_sn="goc", api_key="key", header_extra={"x-one": "1"})
+    two = sop.mkHeader(site_sn="goc", api_key="key")
+    assert one["x-one"] == "1"
+    assert not "x-one" in two
+    assert sop.header_extra == {}
+
+
+def test_breaker_once_per_call(monkeypatch):
+    import pytest
+    import requests
+    from ..twcc import clidriver
+
+    outcomes = []
+
+    class FakeBreaker(object):
+        def before(self):
+            pass
+
+        def recordResponse(self, r=None, err=None):
+            outcomes.append(type(err).__name__ if r is None else r.status_code)
+
+    monkeypatch.setattr(clidriver, "circuit_breaker", lambda *args: FakeBreaker())
+    monkeypatch.setattr(clidriver, "shared_rate_limiter", lambda: None)
+    monkeypatch.setattr(clidriver.time, "sleep", lambda sec: None)
+    sop = ServiceOperation.__new__(ServiceOperation)
+    sop._debug = False
+
+    answers = [FakeResponse(503), FakeResponse(503), FakeResponse(200)]
+    monkeypatch.setattr(sop, "_send", lambda *args: answers.pop(0))
+    r, retries = sop._send_with_retry("http://h/api/v3/sites/", {}, None)
+    assert (r.status_code, retries) == (200, 2)
+    assert outcomes == [200]
+
+    def timeout(*args):
+        raise requests.Timeout("read timed out")
+
+    monkeypatch.setattr(sop, "_send", timeout)
+    with pytest.raises(requests.Timeout):
+        sop._send_with_retry(
+            "http://h/api/v3/sites/", {}, None, retry=RetryPolicy(max_retries=3)
+        )
+    assert outcomes == [200, "Timeout"]
+
+
+def test_connections_are_kept_alive():
+    peers = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            peers.append(self.client_address)
+            body = b"{}"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    # the kept connection holds its handler, the server must not wait for it
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        t_api = "http://127.0.0.1:%d/api/v3/sites/" % server.server_port
+        sop = ServiceOperation.__new__(ServiceOperation)
+        for _ in range(3):
+            assert sop._send(t_api, {}, None).status_code == 200
+        # one TCP connection for the three calls
+        assert len(peers) == 3 and len(set(peers)) == 1
+    finally:
+        server.shutdown()
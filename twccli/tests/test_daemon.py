@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import sys
+import threading
+import click
+from .. import daemon
+
+
+def _execute(argv):
+    click.echo(click.style("hi %s" % os.environ.get("TWCC_X"), fg="red"))
+    if argv == ["ask"]:
+        print("name? %s" % input().strip())
+    print("oops", file=sys.stderr)
+    return 3 if argv == ["boom"] else 0
+
+
+def test_daemon(tmp_path, monkeypatch):
+    path = str(tmp_path / "daemon" / "twccli.sock")
+    server = daemon.Daemon(path, idle=30, execute=_execute)
+    sock = server.listen()
+    worker = threading.Thread(target=server.serve, args=(sock,), daemon=True)
+    worker.start()
+
+    def run(argv, stdin="", tty=False):
+        out, err = io.StringIO(), io.StringIO()
+        out.isatty = lambda: tty
+        code = daemon.forward(
+            argv,
+            daemon._connect(path),
+            stdin=io.StringIO(stdin),
+            stdout=out,
+            stderr=err,
+            env={"TWCC_X": "x", "OTHER": "y"},
+        )
+        return code, out.getvalue(), err.getvalue()
+
+    monkeypatch.setenv("TWCC_X", "daemon")
+    assert run(["ls"]) == (0, "hi x\n", "oops\n")
+    # colors stay when the client is on a terminal
+    assert run(["ls"], tty=True)[1] == "\x1b[31mhi x\x1b[0m\n"
+    assert run(["ask"], stdin="bob\n")[1] == "hi x\nname? bob\n"
+    assert run(["boom"])[0] == 3
+    # the daemon's own environment is back
+    assert os.environ["TWCC_X"] == "daemon"
+
+    assert daemon.request({"op": "status"}, path)["served"] == 4
+    daemon.request({"op": "stop"}, path)
+    worker.join(5)
+    assert not worker.is_alive() and not os.path.exists(path)
+
+
+def test_daemon_idle(tmp_path):
+    path = str(tmp_path / "twccli.sock")
+    server = daemon.Daemon(path, idle=0.2, execute=_execute)
+    server.serve()
+    assert not os.path.exists(path)
+
+
+def test_execute_resets_shared(tmp_path, monkeypatch):
+    from ..twcc import cache, ratelimit
+
+    monkeypatch.setenv("TWCC_DATA_PATH", str(tmp_path))
+    monkeypatch.setattr(daemon, "run_argv", lambda argv: 0)
+    monkeypatch.setenv("TWCC_SINGLEFLIGHT_TTL", "1")
+    first = cache.shared_single_flight()
+    monkeypatch.setenv("TWCC_SINGLEFLIGHT_TTL", "7")
+    assert daemon._execute(["ls"]) == 0
+    # the next command sees the settings of its own client
+    assert not cache.shared_single_flight() is first
+    assert cache.shared_single_flight().ttl == 7
+    assert ratelimit._limiter is None
+
+
+def test_is_local(monkeypatch):
+    monkeypatch.delenv("TWCC_TRACE_FILE", raising=False)
+    monkeypatch.delenv("TWCC_METRICS_FILE", raising=False)
+    assert not daemon.is_local(["ls", "vcs"])
+    assert daemon.is_local(["daemon", "status"])
+    assert daemon.is_local(["--profile", "ls", "vcs"])
+    assert daemon.is_local(["--trace-file=t.jsonl", "ls", "vcs"])
+    assert daemon.is_local(["--profile-json=out.json", "ls", "vcs"])
+    monkeypatch.setenv("TWCC_METRICS_FILE", "m.prom")
+    assert daemon.is_local(["ls", "vcs"])
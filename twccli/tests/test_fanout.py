@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import threading
+import pytest
+from ..twcc.session import Session2
+from ..twcc.services.fanout import project_codes, fan_out
+
+
+def test_project_codes(credential):
+    assert project_codes(None, False) is None
+    assert project_codes(None, True) == ["ENT2", "ENT3", "GOV1"]
+    assert project_codes("GOV1, ENT3,GOV1", False) == ["GOV1", "ENT3"]
+    with pytest.raises(ValueError):
+        project_codes("NOPE", False)
+
+
+def test_fan_out(credential):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fetch():
+        sess = Session2()
+        if sess.twcc_proj_code == "ENT2":
+            raise ValueError("forbidden")
+        # both of the others are listed at once
+        barrier.wait()
+        return [{"id": sess.twcc_proj_id["VCS"]}]
+
+    rows, errors = fan_out(["GOV1", "ENT2", "ENT3"], fetch, concurrency=3)
+    assert rows == [{"id": 100, "project": "GOV1"}, {"id": 102, "project": "ENT3"}]
+    assert [(x[0], "%s" % x[1]) for x in errors] == [("ENT2", "forbidden")]
+    # the default project is back outside of the fan out
+    assert Session2().twcc_proj_code == "GOV1"
+
+
+def test_fan_out_cache_mode(credential, monkeypatch):
+    from ..twcc.cache import cache_mode, using_cache_mode
+
+    monkeypatch.delenv("TWCC_CLI_CACHE", raising=False)
+    with using_cache_mode("off"):
+        rows, _ = fan_out(
+            ["GOV1", "ENT2"], lambda: [{"mode": cache_mode()}], concurrency=2
+        )
+    assert [x["mode"] for x in rows] == ["off", "off"]
+    assert cache_mode() == "on"
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from ..twcc.session import Session2
+from ..twcc.services import inventory
+from ..twcc.services.inventory import Inventory
+
+
+def test_inventory(credential, monkeypatch):
+    sites = {
+        "GOV1": [
+            {"id": 1, "name": "web-01", "status": "Ready", "public_ip": "1.1.1.1"},
+            {"id": 2, "name": "web-02", "status": "Ready", "public_ip": ""},
+        ],
+        "ENT2": [{"id": 3, "name": "db", "status": "Starting", "public_ip": ""}],
+    }
+    enriched = []
+
+    class VcsSite(object):
+        def list(self):
+            return [dict(x) for x in sites[Session2._getDefaultProject()]]
+
+        def queryById(self, site_id):
+            return {"servers": [{"id": site_id * 10}]}
+
+    class VcsServer(object):
+        def getInfoByServerId(self, server_id):
+            enriched.append((Session2._getDefaultProject(), server_id))
+            return {
+                "private_nets": [
+                    {"name": "default-net", "ip": "10.0.0.%d" % server_id}
+                ],
+                "flavor": {"name": "v.super"},
+                "security_groups": [{"name": "default"}],
+            }
+
+    monkeypatch.setattr(inventory, "VcsSite", VcsSite)
+    monkeypatch.setattr(inventory, "VcsServer", VcsServer)
+    monkeypatch.setenv("TWCC_INVENTORY_GROUPS", "frontend=^web")
+    inv = Inventory(projects="GOV1,ENT2", ttl=300)
+    ans = inv.list()
+    assert sorted(enriched) == [("ENT2", 30), ("GOV1", 10), ("GOV1", 20)]
+    assert ans["twccli"]["hosts"] == ["db", "web-01", "web-02"]
+    assert ans["name_web"]["hosts"] == ["web-01", "web-02"]
+    assert ans["frontend"]["hosts"] == ["web-01", "web-02"]
+    assert ans["net_default_net"]["hosts"] == ["db", "web-01", "web-02"]
+    assert ans["project_ENT2"]["hosts"] == ["db"]
+    hostvars = ans["_meta"]["hostvars"]
+    assert hostvars["web-01"]["ansible_host"] == "1.1.1.1"
+    assert hostvars["web-02"]["ansible_host"] == "10.0.0.20"
+    assert hostvars["db"]["twcc_flavor"] == "v.super"
+    assert hostvars["db"]["twcc_security_groups"] == ["default"]
+
+    # within the ttl, and --host, nothing is asked
+    del enriched[:]
+    assert inv.list() == ans
+    assert inv.host("db") == hostvars["db"]
+    assert inv.host("nope") == {}
+    assert enriched == []
+
+    # past it, only the changed and new sites are asked for their server
+    sites["ENT2"][0]["status"] = "Ready"
+    sites["GOV1"].append({"id": 4, "name": "web-01", "status": "Ready"})
+    inv.ttl = -1
+    ans = inv.list()
+    assert sorted(enriched) == [("ENT2", 30), ("GOV1", 40)]
+    assert ans["name_web"]["hosts"] == ["web-01-1", "web-01-4", "web-02"]
+    assert ans["_meta"]["hostvars"]["db"]["twcc_status"] == "Ready"
+
+    # servers asked too long ago, and all of them with --refresh
+    del enriched[:]
+    inv.vars_ttl = -1
+    inv.list()
+    assert len(enriched) == 4
+    del enriched[:]
+    inv.ttl, inv.vars_ttl = 300, 3600
+    inv.list(is_refresh=True)
+    assert len(enriched) == 4
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from ..twcc import metrics, profiler
+
+
+def test_metrics_textfile(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "_profile", profiler.Profiler())
+
+    profiler.recordCall("get", "http://h/api/v3/vcs/sites/1/", 0.2, 0, 10)
+    profiler.recordCall("get", "http://h/api/v3/vcs/sites/2/", 0.4, 0, 10, 500)
+    profiler.recordCall("put", "/cos/PutObject", 0.1, 1024, 0, 200)
+    profiler.recordWait("doSiteStable", 15.0)
+    profiler.recordExit(SystemExit(2))
+
+    prom_fn = str(tmp_path / "twccli.prom")
+    metrics.write_textfile(prom_fn, profiler.current().summary(), 'ls "vcs"')
+    with open(prom_fn) as fn:
+        lines = fn.read().splitlines()
+
+    lbl = 'command="ls \\"vcs\\"",endpoint="/api/v3/vcs/sites/:id/",verb="GET"'
+    assert "twccli_http_requests_total{%s} 2" % lbl in lines
+    assert (
+        "twccli_http_request_duration_seconds{%s} 0.4"
+        % lbl.replace('verb="GET"', 'quantile="1",verb="GET"')
+        in lines
+    )
+    assert "twccli_http_request_duration_seconds_count{%s} 2" % lbl in lines
+    assert 'twccli_http_errors_total{command="ls \\"vcs\\"",status="500"} 1' in lines
+    assert (
+        'twccli_cos_bytes_total{command="ls \\"vcs\\"",direction="out"} 1024' in lines
+    )
+    assert (
+        'twccli_wait_duration_seconds_sum{command="ls \\"vcs\\"",waiter="doSiteStable"} 15.0'
+        in lines
+    )
+    assert 'twccli_command_exit_status{command="ls \\"vcs\\""} 2' in lines
+
+    # every sample follows the TYPE line of its family
+    families = [x.split(" ")[2] for x in lines if x.startswith("# TYPE")]
+    assert len(families) == len(set(families))
+    cur = None
+    for line in lines:
+        if line.startswith("# TYPE"):
+            cur = line.split(" ")[2]
+        elif not line.startswith("#"):
+            assert line.startswith(cur)
+
+
+def test_exit_code_of():
+    assert profiler.exit_code_of(None) == 0
+    assert profiler.exit_code_of(SystemExit()) == 0
+    assert profiler.exit_code_of(SystemExit("bye")) == 1
+    assert profiler.exit_code_of(ValueError()) == 1
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from ..twcc import profiler
+
+
+def test_profiler_summary(monkeypatch):
+    monkeypatch.setattr(profiler, "_profile", profiler.Profiler())
+
+    assert profiler.endpoint_of("https://host/api/v3/vcs/sites/123/?project=1") == (
+        "/api/v3/vcs/sites/:id/"
+    )
+    for idx in range(1, 21):
+        profiler.recordCall(
+            "get", "http://h/api/v3/vcs/sites/%d/" % idx, idx / 100.0, 0, 10
+        )
+    profiler.recordCall("post", "http://h/api/v3/vcs/sites/", 0.5, 30, 5, 400)
+
+    @profiler.timed("table")
+    def render(depth):
+        return render(depth - 1) if depth > 0 else "done"
+
+    assert render(3) == "done"
+
+    ans = profiler.current().summary()
+    assert ans["http"]["calls"] == 21
+    assert ans["http"]["bytes_in"] == 205
+    assert ans["http"]["bytes_out"] == 30
+    gets = [x for x in ans["http"]["endpoints"] if x["verb"] == "GET"][0]
+    assert gets["endpoint"] == "/api/v3/vcs/sites/:id/"
+    assert (gets["p50"], gets["p95"], gets["max"]) == (0.1, 0.19, 0.2)
+    posts = [x for x in ans["http"]["endpoints"] if x["verb"] == "POST"][0]
+    assert posts["errors"] == 1
+    # nested calls are counted once
+    assert ans["sections"]["table"]["calls"] == 1
+
+
+def test_profiler_disabled(monkeypatch):
+    monkeypatch.setattr(profiler, "_profile", None)
+    profiler.recordCall("get", "http://h/", 0.1)
+
+    @profiler.timed("yaml")
+    def load():
+        return 1
+
+    assert load() == 1
+    assert profiler.current() is None
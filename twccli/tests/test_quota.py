@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import threading
+from ..twcc.session import Session2, in_project
+from ..twcc.services import generic
+from ..twcc.services.generic import getQuotas, joinUserQuota
+
+
+def test_get_quotas(credential, monkeypatch):
+    barrier = threading.Barrier(2, timeout=5)
+    calls = []
+
+    class FakeService(object):
+        def getQuota(self, isAll=False):
+            # VCS and CCS are asked at once
+            barrier.wait()
+            calls.append((self.res_type, Session2._getDefaultProject()))
+            return [
+                {"user": {"username": x}, "cpu": {"usage": 1, "quota": -1}}
+                for x in self.users
+            ]
+
+    class CpuService(FakeService):
+        res_type, users = "VCS", ["amy", "bob"]
+
+    class GpuService(FakeService):
+        res_type, users = "CCS", ["bob", "cat"]
+
+    monkeypatch.setattr(generic, "CpuService", CpuService)
+    monkeypatch.setattr(generic, "GpuService", GpuService)
+    with in_project("ENT2"):
+        quotas = getQuotas(isAll=True)
+        # kept for TWCC_QUOTA_TTL
+        assert getQuotas(isAll=True) == quotas
+    assert sorted(calls) == [("CCS", "ENT2"), ("VCS", "ENT2")]
+
+    joined = joinUserQuota(quotas)
+    assert sorted(joined) == ["amy", "bob", "cat"]
+    assert sorted(joined["amy"]) == ["VCS"]
+    assert sorted(joined["bob"]) == ["CCS", "VCS"]
+    assert sorted(joined["cat"]) == ["CCS"]
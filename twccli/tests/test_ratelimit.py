@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import pytest
+from ..twcc.ratelimit import RateLimiter, TokenBucket, parse_rules
+
+
+def test_parse_rules():
+    assert parse_rules("POST */sites/=0.5/2, */images/*=4") == [
+        ("POST", "*/sites/", 0.5, 2.0),
+        ("*", "*/images/*", 4.0, 4.0),
+    ]
+    with pytest.raises(ValueError):
+        parse_rules("*/sites/")
+    with pytest.raises(ValueError):
+        parse_rules("*/sites/=0")
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=10.0, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    # later callers queue up behind each other
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_rate_limiter(tmp_path, monkeypatch, shared):
+    monkeypatch.setenv("TWCC_DATA_PATH", str(tmp_path))
+    url = "https://h/api/v3/k8s-D-twcc/sites/%d/"
+
+    limiter = RateLimiter(rate="100/100", rules="POST */sites/*=1/1", shared=shared)
+    assert limiter.isEnabled()
+    assert len(limiter.bucketsOf("post", url % 1)) == 2
+    assert len(limiter.bucketsOf("get", url % 1)) == 1
+
+    assert limiter.reserve("post", url % 1) == 0
+    assert limiter.reserve("post", url % 2) == pytest.approx(1, abs=0.05)
+    assert limiter.reserve("get", url % 3) == 0
+
+    limiter.drain("get", url % 3)
+    assert limiter.reserve("get", url % 3) > 0
+
+    if shared:
+        # another process with the same config sees the same budgets
+        other = RateLimiter(rate="100/100", rules="POST */sites/*=1/1", shared=True)
+        assert other.reserve("post", url % 4) == pytest.approx(2, abs=0.05)
+
+    assert not RateLimiter(rate=None, rules="", shared=False).isEnabled()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import pytest
+from ..twcc.services import stack
+from ..twcc.services.stack import Stack, refs_of, resolve, run_dag
+
+
+def test_refs():
+    spec = {"network": "${net}", "members": ["${web.private_ip}:80"], "size": 1}
+    assert refs_of(spec) == set(["net", "web"])
+    lookup = lambda key, attr: "%s.%s" % (key, attr) if attr else 7
+    assert resolve(spec, lookup) == {
+        "network": 7,
+        "members": ["web.private_ip:80"],
+        "size": 1,
+    }
+
+
+def test_run_dag():
+    deps = {"net": set(), "sg": set(), "vcs": set(["net", "sg"]), "ip": set(["vcs"])}
+    started, lock, on_wire, peak = [], threading.Lock(), [0], [0]
+
+    def func(key):
+        with lock:
+            started.append(key)
+            on_wire[0] += 1
+            peak[0] = max(peak[0], on_wire[0])
+        time.sleep(0.05)
+        with lock:
+            on_wire[0] -= 1
+        if key == "vcs":
+            raise ValueError("quota")
+
+    done = run_dag(deps, func)
+    assert sorted(started[:2]) == ["net", "sg"] and started[2:] == ["vcs"]
+    assert peak[0] == 2
+    assert "%s" % done["vcs"][1] == "quota"
+    assert "%s" % done["ip"][1] == "skipped, vcs failed"
+
+
+class FakeKind(stack._Kind):
+    site_type = "fake"
+    live, waited, deleted = [], [], []
+
+    def list(self):
+        return [dict(x) for x in FakeKind.live]
+
+    def create(self, spec):
+        site = {"id": len(FakeKind.live) + 1, "name": spec["name"], "ip": "10.0.0.9"}
+        FakeKind.live.append(site)
+        return {"id": site["id"], "name": site["name"]}
+
+    def wait(self, res_id):
+        FakeKind.waited.append(res_id)
+
+    def get(self, res_id):
+        return [x for x in FakeKind.live if x["id"] == res_id][0]
+
+    def changes(self, spec, live):
+        return ["desc"] if spec.get("desc") == "new" else []
+
+    def delete(self, live):
+        FakeKind.deleted.append(live["name"])
+        FakeKind.live.remove([x for x in FakeKind.live if x["id"] == live["id"]][0])
+
+
+def test_stack(monkeypatch):
+    FakeKind.live[:] = [{"id": 100, "name": "old"}]
+    doc = {
+        "resources": {
+            "net": {"type": "fake", "name": "old", "desc": "new"},
+            "web": {"type": "fake", "name": "web", "network": "${net}"},
+            "ip": {"type": "fake", "name": "ip", "server": "${web.ip}"},
+            "alone": {"type": "fake", "name": "alone"},
+        }
+    }
+    kinds = {"fake": FakeKind}
+    with pytest.raises(ValueError, match="unknown"):
+        Stack({"resources": {"a": {"type": "fake", "x": "${b}"}}}, kinds=kinds)
+    with pytest.raises(ValueError, match="each other"):
+        Stack(
+            {
+                "resources": {
+                    "a": {"type": "fake", "depends_on": ["b"]},
+                    "b": {"type": "fake", "depends_on": ["a"]},
+                }
+            },
+            kinds=kinds,
+        )
+
+    plan = Stack(doc, kinds=kinds).plan()
+    assert [(x["key"], x["action"]) for x in plan] == [
+        ("alone", "create"),
+        ("net", "update"),
+        ("web", "create"),
+        ("ip", "create"),
+    ]
+
+    ans = Stack(doc, kinds=kinds).apply()
+    assert [x["message"] for x in ans] == ["", "", "", ""]
+    # only web has a dependent which needs its fields
+    assert FakeKind.waited == [[x for x in ans if x["key"] == "web"][0]["id"]]
+    assert [x["action"] for x in Stack(doc, kinds=kinds).plan()] == [
+        "keep",
+        "update",
+        "keep",
+        "keep",
+    ]
+
+    monkeypatch.setattr(time, "sleep", lambda x: None)
+    ans = Stack(doc, kinds=kinds).destroy()
+    assert [x["key"] for x in ans] == ["ip", "web", "net", "alone"]
+    assert FakeKind.deleted.index("ip") < FakeKind.deleted.index("web")
+    assert FakeKind.deleted.index("web") < FakeKind.deleted.index("old")
+    assert FakeKind.live == []
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import json
+import pytest
+from ..twcc import tracing
+
+
+def test_tracing_spans(tmp_path, monkeypatch):
+    trace_fn = str(tmp_path / "trace.jsonl")
+    monkeypatch.setattr(tracing, "_from_env", True)
+    tracing.enable(trace_fn)
+    try:
+        root = tracing.start_span("twccli ls", {"twccli.args": "ls vcs"}, is_root=True)
+        with tracing.span("VcsSite GET", {"twcc.func": "sites"}):
+            sp = tracing.start_http("get", "http://h/api/v3/sites/")
+            tracing.end_http(sp, 500, retries=2)
+        with pytest.raises(ValueError):
+            with tracing.span("doSiteStable"):
+                raise ValueError("boom")
+        tracing.end_root()
+    finally:
+        tracing.disable()
+
+    spans = dict()
+    with open(trace_fn) as fn:
+        for line in fn:
+            res = json.loads(line)["resourceSpans"][0]
+            sp = res["scopeSpans"][0]["spans"][0]
+            spans[sp["name"]] = sp
+    assert list(spans.keys()) == [
+        "HTTP GET",
+        "VcsSite GET",
+        "doSiteStable",
+        "twccli ls",
+    ]
+    assert len(set(sp["traceId"] for sp in spans.values())) == 1
+    assert "parentSpanId" not in spans["twccli ls"]
+    assert spans["VcsSite GET"]["parentSpanId"] == root.span_id
+    assert spans["HTTP GET"]["parentSpanId"] == spans["VcsSite GET"]["spanId"]
+    assert spans["HTTP GET"]["kind"] == tracing.SPAN_KIND_CLIENT
+    attrs = dict((x["key"], x["value"]) for x in spans["HTTP GET"]["attributes"])
+    assert attrs["http.status_code"] == {"intValue": "500"}
+    assert attrs["http.retries"] == {"intValue": "2"}
+    assert spans["HTTP GET"]["status"] == {"code": 2, "message": "HTTP 500"}
+    assert spans["doSiteStable"]["status"]["message"] == "ValueError: boom"
+    assert spans["twccli ls"]["status"] == {"code": tracing.STATUS_OK}
+    assert tracing.current() is None
+
+
+def test_tracing_disabled(monkeypatch):
+    monkeypatch.setattr(tracing, "_from_env", True)
+    tracing.disable()
+
+    @tracing.traced("render")
+    def render():
+        return "done"
+
+    assert render() == "done"
+    assert tracing.start_span("cmd") is tracing.NOOP_SPAN
+    with tracing.span("req") as sp:
+        sp.setAttribute("k", 1)
+    assert tracing.current() is None
+
+
+def test_tracing_using_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_from_env", True)
+    tracing.disable()
+    with tracing.using_file(str(tmp_path / "trace.jsonl")):
+        tracing.start_span("twccli ls", is_root=True)
+        tracing.end_root()
+    assert not tracing.isEnabled()
+    assert (tmp_path / "trace.jsonl").exists()
+
+
+def test_redact_args():
+    argv = ["mk", "vcs", "-pwd", "s3cret", "--apikey=abc", "-n", "web"]
+    assert tracing.redact_args(argv) == [
+        "mk",
+        "vcs",
+        "-pwd",
+        "***",
+        "--apikey=***",
+        "-n",
+        "web",
+    ]
+    assert tracing.redact_args(["config", "init", "--apikey", "abc"])[-1] == "***"
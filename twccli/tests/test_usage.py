@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import pytest
+from ..twcc.usage import UsageStore, samples_of, parse_duration
+
+
+def quotas(cpu, user="amy"):
+    entry = lambda res_quota: {
+        "user": {"username": user},
+        "project": {"name": "GOV1"},
+        "cpu": {"usage": cpu, "quota": res_quota},
+        "gpu": {"usage": 1, "quota": -1},
+    }
+    return {"VCS": [entry(8)], "CCS": [entry(4)]}
+
+
+def test_parse_duration():
+    assert parse_duration("90") == 90
+    assert parse_duration("30m") == 1800
+    assert parse_duration("7d") == 7 * 86400
+    for val in ("0", "0h", "-1d", "soon"):
+        with pytest.raises(ValueError):
+            parse_duration(val)
+
+
+def test_record_query(tmp_path):
+    store = UsageStore(str(tmp_path / "usage.sqlite3"))
+    assert samples_of(quotas(2), "GOV1")[0] == ("GOV1", "", "VCS.cpu", 2.0, 8.0)
+    for ts, cpu in ((3600, 2), (3660, 4), (7200, 8)):
+        store.record(samples_of(quotas(cpu), "GOV1", is_all=True), ts=ts, retention=0)
+
+    rows = store.query(3600, 7200, window=3600, resource="VCS.cpu")
+    assert [
+        (x["samples"], x["avg"], x["peak"], x["avg_pct"], x["peak_pct"]) for x in rows
+    ] == [
+        (2, 3.0, 4.0, 37.5, 50.0),
+        (1, 8.0, 8.0, 100.0, 100.0),
+    ]
+    assert [x["user"] for x in rows] == ["amy", "amy"]
+    # unlimited
+    rows = store.query(3600, 7200, resource="CCS.gpu")
+    assert len(rows) == 1 and rows[0]["quota"] == "unlimited"
+    assert rows[0]["peak_pct"] is None
+    assert store.query(3600, 7200, projects=["ENT2"]) == []
+
+    # old samples are dropped while recording
+    store.record(samples_of(quotas(1), "GOV1"), ts=86400 + 7000, retention=1)
+    assert [x["samples"] for x in store.query(0, 86400 * 2, user="amy")] == [1, 1, 1, 1]
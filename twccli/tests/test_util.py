@@ -1,6 +1,17 @@
 # -*- coding: utf-8 -*-
 from click.testing import CliRunner
-from ..twcc.util import name_validator, resource_id_validater, window_password_validater
+import pytest
+from ..twcc.util import (
+    mk_batch_names,
+    name_validator,
+    resource_id_validater,
+    window_password_validater,
+    _table_layout_arrange_table_info,
+    _table_layout_data_cell_format,
+    stream_layout,
+    stream_table_layout,
+    table_layout,
+)
 
 
 def test_name_validator():
@@ -20,6 +31,16 @@ def test_name_validator():
         assert name_validator(val_name) == rules[val_name]
 
 
+def test_mk_batch_names():
+    assert mk_batch_names("sweep", 1) == ["sweep"]
+    assert mk_batch_names("sweep", 3) == ["sweep-1", "sweep-2", "sweep-3"]
+    assert mk_batch_names("sweep-{i:02d}", 2) == ["sweep-01", "sweep-02"]
+    with pytest.raises(ValueError):
+        mk_batch_names("sweep-{}", 2)
+    with pytest.raises(ValueError):
+        mk_batch_names("sweep-{i!s:.0}", 2)
+
+
 def test_res_name_validator():
 
     rules = {
@@ -44,3 +65,98 @@ def test_win_password_validater():
         # print("checking", val_pwd, "test:", window_password_validater(
         #     val_pwd), "expect:", rules[val_pwd])
         assert window_password_validater(val_pwd) == rules[val_pwd]
+
+
+def test_table_layout_arrange_table_info():
+    rows = [
+        {"id": 1, "user": {"username": "u1"}, "members_IP,status": ["(a)"]},
+        {"id": 2, "status": "error"},
+    ]
+    cols = ["id", "user.username", "members_IP,status", "status"]
+    table_info = _table_layout_arrange_table_info(rows, cols)
+
+    assert table_info[0] == cols
+    assert table_info[1] == ["1", "u1", ["(a)"], ""]
+    assert table_info[2][:3] == ["2", "", ""]
+    assert "error" in table_info[2][3]
+
+
+def test_table_layout_data_cell_format():
+    assert _table_layout_data_cell_format(['{"a": 1}', "b"]) == (
+        '[1] {\n  "a": 1\n}\n[2] b\n'
+    )
+    assert _table_layout_data_cell_format([1, "1"]) == "[1] 1\n[2] 1\n"
+
+
+def test_stream_layout():
+    import io
+    import json
+
+    rows = [
+        {"id": 1, "name": "a\tb", "user": {"username": "u1"}},
+        {"id": 2, "name": "c,d", "user": None},
+    ]
+    cols = ["id", "name", "user.username"]
+
+    out = io.StringIO()
+    assert stream_layout(iter(rows), cols, "ndjson", out=out) == 2
+    lines = [json.loads(x) for x in out.getvalue().splitlines()]
+    assert lines[0] == {"id": 1, "name": "a\tb", "user.username": "u1"}
+    assert lines[1]["user.username"] is None
+
+    out = io.StringIO()
+    stream_layout(rows, cols, "csv", out=out)
+    assert out.getvalue().splitlines() == [
+        "id,name,user.username",
+        "1,a\tb,u1",
+        '2,"c,d",',
+    ]
+
+    out = io.StringIO()
+    stream_layout(rows, cols, "tsv", out=out)
+    assert out.getvalue().splitlines()[1] == "1\ta b\tu1"
+
+    assert stream_layout([], cols, "csv", out=io.StringIO()) == 0
+
+
+def test_stream_table_layout():
+    import io
+
+    rows = [{"id": idx, "name": "n%d" % idx} for idx in range(3)]
+
+    out = io.StringIO()
+    assert stream_table_layout("t", rows, ["id", "name"], out=out) == 3
+    assert out.getvalue() == table_layout("t", rows, ["id", "name"]) + "\n"
+
+    rows.append({"id": 3, "name": "abcdefghij中文字"})
+    out = io.StringIO()
+    cnt = stream_table_layout(
+        "t", iter(rows), ["id", "name"], sample_rows=2, max_width=6, out=out
+    )
+    lines = out.getvalue().splitlines()
+    assert cnt == 4
+    assert lines[0] == "+ t -+------+"
+    assert lines[1] == "| id | name |"
+    assert lines[-2] == "| 3  | a... |"
+    assert len(set([len(line) for line in lines])) == 1
+
+    out = io.StringIO()
+    stream_table_layout(
+        "t", rows[::-1], ["id", "name"], sample_rows=1, max_width=6, out=out
+    )
+    assert "| 3  | abc... |" in out.getvalue()
+
+    out = io.StringIO()
+    rows = [{"id": 4, "name": "中文字中文字"}]
+    stream_table_layout("t", rows, ["id", "name"], col_widths={"name": 9}, out=out)
+    assert "| 4  | 中文字... |" in out.getvalue()
+
+    # ls cos keeps long keys on one line
+    out = io.StringIO()
+    rows = [{"Key": "a/very/long/object/key/name.txt"}]
+    stream_table_layout("t", rows, ["Key"], is_warp=False, out=out)
+    assert "| a/very/long/object/key/name.txt |" in out.getvalue()
+
+    out = io.StringIO()
+    stream_table_layout("中文", [{"id": 1234567}], ["id"], col_widths=[8], out=out)
+    assert out.getvalue().splitlines()[0] == "+ 中文 ----+"
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+from ..twcc.watch import Watcher, FrameRender, StreamRender, diff_rows
+
+
+def test_diff_rows():
+    old = {1: {"id": 1, "name": "a", "status": "Waiting"}, 2: {"id": 2, "name": "b"}}
+    new = {1: {"id": 1, "name": "a", "status": "Ready"}, 3: {"id": 3, "name": "c"}}
+    events = diff_rows(old, new, ["id", "name", "status"])
+    assert [(x["event"], x["id"]) for x in events] == [
+        ("changed", 1),
+        ("added", 3),
+        ("removed", 2),
+    ]
+    assert events[0]["changes"] == {"status": {"old": "Waiting", "new": "Ready"}}
+
+
+def test_watcher():
+    polls = [
+        [{"id": 1, "name": "a", "status": "Waiting"}],
+        [{"id": 1, "name": "a", "status": "Ready"}],
+        [{"id": 1, "name": "a", "status": "Ready"}],
+        ValueError("gateway timeout"),
+        [{"id": 1, "name": "a", "status": "Ready"}],
+    ]
+
+    def fetch():
+        ans = polls.pop(0)
+        if isinstance(ans, Exception):
+            raise ans
+        return ans
+
+    waits, out = [], io.StringIO()
+    watcher = Watcher(fetch, ["id", "name", "status"], interval=2, max_interval=5)
+    watcher.run(StreamRender(out), max_polls=5, sleep=waits.append)
+    events = [json.loads(x) for x in out.getvalue().splitlines()]
+    assert [x["event"] for x in events] == ["added", "changed", "error"]
+    # busy, changed, quiet, failed, then quiet again
+    assert waits == [2, 2, 3, 5]
+
+
+def test_frame_render():
+    rows = [{"id": x, "name": "n%d" % x, "status": "Ready"} for x in range(3)]
+    polls = [rows, rows[:2] + [dict(rows[2], status="Error")]]
+    out = io.StringIO()
+    render = FrameRender("CCS", out=out, max_events=5)
+    watcher = Watcher(lambda: polls.pop(0), ["id", "name", "status"], interval=2)
+    watcher.run(render, max_polls=1)
+    first, first_lines = out.getvalue(), len(render.lines)
+    out.seek(0)
+    out.truncate()
+    watcher.run(render, max_polls=1)
+    second = out.getvalue()
+    assert first.count("\033[2K") == first_lines
+    # the changed row, the new event and the status line
+    assert second.count("\033[2K") == 3
+    assert "status: Ready -> Error" in second
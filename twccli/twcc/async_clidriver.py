@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""asyncio transport for TWCC API, the async sibling of ServiceOperation.
+
+Needs httpx, `pip install TWCC-CLI[async]`.
+
+    async def main():
+        async with AsyncServiceOperation() as twcc:
+            sites = AsyncVcsSite(twcc)
+            return await asyncio.gather(*[sites.queryById(x) for x in ids])
+"""
+
+import asyncio
+import json
+import time
+import requests
+from twccli.twcc import profiler, tracing
+from twccli.twcc.clidriver import ServiceOperation, RetryPolicy
+from twccli.twcc.ratelimit import shared_rate_limiter
+from twccli.twcc.breaker import circuit_breaker
+from twccli.twcc.session import Session2
+from twccli.twcc.util import isNone, timezone2local, get_environment_params
+from twccli.twccli import logger
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class ApiRequest(object):
+    """One API call, never modified after it is built
+
+    Args:
+        func (str): function name in TWCC_API.yaml, ie: sites
+        verb (str): get, post, put, patch or delete
+        site (str): platform, ie: openstack-taichung-default-2
+        url_dict (dict): same as GenericService.url_dic
+        params (dict): query string, same as GenericService.ext_get
+        data (dict): json body, same as GenericService.data_dic
+        headers (dict): extra headers, ie: x-extra-property-*
+        res_type (str): json or txt
+        idempotent (bool): allow retrying a POST/PATCH
+    """
+
+    __slots__ = (
+        "func",
+        "verb",
+        "site",
+        "url_dict",
+        "params",
+        "data",
+        "headers",
+        "res_type",
+        "idempotent",
+    )
+
+    def __init__(
+        self,
+        func,
+        verb="get",
+        site=None,
+        url_dict=None,
+        params=None,
+        data=None,
+        headers=None,
+        res_type="json",
+        idempotent=False,
+    ):
+        self.func = func
+        self.verb = verb
+        self.site = site
+        self.url_dict = url_dict
+        self.params = params
+        self.data = data
+        self.headers = headers
+        self.res_type = res_type
+        self.idempotent = idempotent
+
+    def __repr__(self):
+        return "ApiRequest(%s %s %s)" % (self.verb.upper(), self.func, self.url_dict)
+
+
+def _local_create_time(res):
+    for ele in res if type(res) == type([]) else [res]:
+        if type(ele) == type({}) and "create_time" in ele:
+            ele["create_time"] = timezone2local(ele["create_time"]).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+    return res
+
+
+class AsyncServiceOperation(object):
+    """Sends ApiRequest objects concurrently over one connection pool.
+
+    The function table, url and header building are the ones of
+    ServiceOperation, loaded once. At most `concurrency` requests are in
+    flight, default TWCC_API_CONCURRENCY or 32.
+    """
+
+    def __init__(self, api_key=None, concurrency=None, timeout=60):
+        if isNone(httpx):
+            raise ImportError(
+                "httpx is required for the asyncio client, "
+                "please `pip install TWCC-CLI[async]`."
+            )
+        self._sop = ServiceOperation(api_key=api_key)
+        self._api_key = Session2._getApiKey(api_key)
+        self._user_agent = Session2._getUserAgent()
+        self.concurrency = int(
+            get_environment_params("TWCC_API_CONCURRENCY", 32)
+            if isNone(concurrency)
+            else concurrency
+        )
+        self.timeout = timeout
+        self._client = None
+        self._sem = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.concurrency),
+            timeout=self.timeout,
+        )
+        self._sem = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    def mkUrl(self, req):
+        if not self._sop.isFunValid(req.func):
+            raise ValueError("Function for:'{0}' is not valid".format(req.func))
+        if not req.verb in set(self._sop.valid_http_verb[req.func]):
+            raise ValueError("http verb:'{0}' is not valid".format(req.verb))
+        return self._sop.mkAPIUrl(
+            req.site,
+            None,
+            req.func,
+            url_dict=req.url_dict,
+            is_v3=not req.verb == "post",
+        )
+
+    def mkHeader(self, req):
+        return self._sop.mkHeader(
+            site_sn=req.site,
+            api_key=self._api_key,
+            user_agent=self._user_agent,
+            header_extra=req.headers,
+        )
+
+    async def _send(self, req, t_url, t_headers):
+        content = None
+        if req.verb in ("post", "patch", "put"):
+            content = json.dumps(req.data)
+        params = req.params if req.verb in ("get", "delete") else None
+        return await self._client.request(
+            req.verb.upper(), t_url, params=params, headers=t_headers, content=content
+        )
+
+    async def request(self, req):
+        """Sends one ApiRequest, returns the decoded answer like _do_api()"""
+        if isNone(self._client):
+            raise RuntimeError("use `async with AsyncServiceOperation() as twcc`.")
+        t_url = self.mkUrl(req)
+        t_headers = self.mkHeader(req)
+        retry = RetryPolicy(idempotent=req.idempotent)
+        limiter = shared_rate_limiter()
+        breaker = circuit_breaker(t_url, req.site)
+
+        async with self._sem:
+            sp = tracing.start_http(req.verb, t_url)
+            start_time = time.time()
+            attempt = 0
+            try:
+                breaker.before()
+            except BaseException as e:
+                sp.end(e)
+                raise
+            while True:
+                r, err = None, None
+                if not isNone(limiter):
+                    limit_wait = limiter.reserve(req.verb, t_url)
+                    if limit_wait > 0:
+                        await asyncio.sleep(limit_wait)
+                        profiler.recordWait("ratelimit", limit_wait)
+                try:
+                    r = await self._send(req, t_url, t_headers)
+                except httpx.TransportError as e:
+                    err = e
+                if not isNone(limiter) and not isNone(r) and r.status_code == 429:
+                    limiter.drain(req.verb, t_url)
+                wait = retry.nextWait(
+                    req.verb, attempt, time.time() - start_time, r, err
+                )
+                if isNone(wait):
+                    break
+                await asyncio.sleep(wait)
+                attempt += 1
+            # one outcome per call, its retries are not failures of their own
+            breaker.recordResponse(r, err)
+
+        if not isNone(err):
+            sp.end(err)
+            raise requests.ConnectionError(str(err))
+        tracing.end_http(sp, r.status_code, attempt)
+        profiler.recordCall(
+            req.verb,
+            t_url,
+            time.time() - start_time,
+            len(r.request.content),
+            len(r.content),
+            r.status_code,
+        )
+        if self._sop._debug:
+            logger.info(
+                "--- URL: %s, Status: %s, Retries: %d, (%.3f sec) ---"
+                % (t_url, r.status_code, attempt, time.time() - start_time)
+            )
+        if r.status_code >= 400:
+            raise requests.HTTPError(
+                "HTTP Error {}: {} {}".format(r.status_code, r.reason_phrase, t_url)
+            )
+
+        if req.res_type == "txt":
+            return r.content
+        try:
+            res = r.json()
+        except ValueError:
+            return r.content
+        if type(res) == type({}) and "request is unauthorized" in str(
+            res.get("message", "")
+        ):
+            raise ValueError("API Key is not validated.")
+        return _local_create_time(res)
+
+    async def gather(self, reqs, return_exceptions=False):
+        """Sends every ApiRequest, answers are in the same order"""
+        return await asyncio.gather(
+            *[self.request(req) for req in reqs], return_exceptions=return_exceptions
+        )
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Many twccli commands in one process, ie: `twccli batch -f commands.txt`
+
+    # one command per line, `twccli` is optional
+    mk secg -n websg
+    ---
+    mk secg_rule -n websg -port 80
+    twccli mk secg_rule -n websg -port 443
+
+Every line is parsed by the usual click groups and run in this process, so
+the parsed credential file, the keep-alive connections of the HTTP session
+and the caches are shared. With a concurrency above 1 the lines between two
+`---` run at once, a `---` waits for all the lines above it. The cache mode
+of the batch, ie: `twccli --no-cache batch`, applies to every line, the
+`--no-cache` / `--refresh-cache` of a line only to that line.
+
+The output of a line is captured per thread, its stdin is empty: lines
+cannot prompt, use -f/--force where a command asks.
+"""
+from __future__ import print_function
+import io
+import shlex
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from twccli.twcc.cache import cache_mode, using_cache_mode
+from twccli.twcc.util import isNone
+
+BARRIER = "---"
+# these do not run inside a batch
+NOT_IN_BATCH = set(["batch", "daemon"])
+
+_local = threading.local()
+
+
+def parse(lines):
+    """Segments of (line number, argv), split at `---`
+
+    Returns:
+        list of lists, the commands of a segment may run at once
+    """
+    segments = [[]]
+    for idx, line in enumerate(lines):
+        if line.strip() == BARRIER:
+            if len(segments[-1]) > 0:
+                segments.append([])
+            continue
+        try:
+            argv = shlex.split(line, comments=True)
+        except ValueError as e:
+            raise ValueError("line {}: {}".format(idx + 1, e))
+        if len(argv) > 0 and argv[0] == "twccli":
+            argv = argv[1:]
+        if len(argv) > 0:
+            segments[-1].append((idx + 1, argv))
+    return [x for x in segments if len(x) > 0]
+
+
+class _Routed(io.TextIOBase):
+    """sys.stdout, sys.stderr or sys.stdin, a batch line gets its own"""
+
+    def __init__(self, stream, name):
+        self.stream = stream
+        self.name = name
+
+    def _target(self):
+        streams = getattr(_local, "streams", None)
+        return self.stream if isNone(streams) else streams[self.name]
+
+    @property
+    def encoding(self):
+        return getattr(self._target(), "encoding", None) or "utf-8"
+
+    def isatty(self):
+        return self._target().isatty()
+
+    def writable(self):
+        return self.name in ("stdout", "stderr")
+
+    def readable(self):
+        return self.name == "stdin"
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def readline(self, size=-1):
+        return self._target().readline(size)
+
+
+def run_line(lineno, argv, run_argv=None):
+    """Runs one line with its output captured
+
+    Returns:
+        {"line", "command", "exit", "seconds", "stdout", "stderr"}
+    """
+    if isNone(run_argv):
+        from twccli.daemon import run_argv
+    out, err = io.StringIO(), io.StringIO()
+    _local.streams = {"stdout": out, "stderr": err, "stdin": io.StringIO()}
+    start_time = time.time()
+    try:
+        if argv[0] in NOT_IN_BATCH:
+            print("`{}` cannot run in a batch.".format(argv[0]), file=sys.stderr)
+            code = 2
+        else:
+            code = run_argv(argv)
+    except Exception:
+        # one line does not stop the others
+        traceback.print_exc()
+        code = 1
+    finally:
+        _local.streams = None
+    return {
+        "line": lineno,
+        "command": " ".join([shlex.quote(x) for x in argv]),
+        "exit": code,
+        "seconds": round(time.time() - start_time, 3),
+        "stdout": out.getvalue(),
+        "stderr": err.getvalue(),
+    }
+
+
+def run(segments, concurrency=1, is_stop=False, run_argv=None):
+    """Yields the result of every line, in the order of the lines
+
+    Args:
+        segments (list): from parse()
+        concurrency (int): lines of a segment running at once
+        is_stop (bool): lines after a failed one are skipped, exit is None
+        run_argv (function): run_argv(argv) returns the exit code
+    """
+    failed = threading.Event()
+    mode = cache_mode()
+
+    def call(cmd):
+        if is_stop and failed.is_set():
+            return {
+                "line": cmd[0],
+                "command": " ".join([shlex.quote(x) for x in cmd[1]]),
+                "exit": None,
+                "seconds": 0,
+                "stdout": "",
+                "stderr": "",
+            }
+        with using_cache_mode(mode):
+            ans = run_line(cmd[0], cmd[1], run_argv)
+        if not ans["exit"] == 0:
+            failed.set()
+        return ans
+
+    saved = (sys.stdout, sys.stderr, sys.stdin)
+    sys.stdout = _Routed(saved[0], "stdout")
+    sys.stderr = _Routed(saved[1], "stderr")
+    sys.stdin = _Routed(saved[2], "stdin")
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for segment in segments:
+                for ans in [pool.submit(call, x) for x in segment]:
+                    yield ans.result()
+    finally:
+        sys.stdout, sys.stderr, sys.stdin = saved
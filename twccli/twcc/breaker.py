@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Circuit breakers per (API host, platform), ie: k8s-D-twcc.
+
+After TWCC_BREAKER_FAILURES (5) failed calls in a row, a connection
+error, a timeout or a 500/502/503/504, the breaker opens and calls to that
+platform fail at once with CircuitOpenError. After TWCC_BREAKER_COOLDOWN
+(30) seconds one call is let through as a probe, its success closes the
+breaker, its failure opens it for another cooldown.
+
+The state is kept under `TWCC_DATA_PATH/breaker`, so the next twccli run
+within the cooldown fails fast too. TWCC_BREAKER_FAILURES=0 turns it off.
+"""
+from __future__ import print_function
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+from urllib.parse import urlparse
+from twccli.twcc.util import isNone, get_environment_params
+from twccli.twcc.cache import _atomic_json_dump
+
+FAILURE_STATUS = set([500, 502, 503, 504])
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """The platform failed too often, the call was not sent"""
+
+
+class CircuitBreaker(object):
+    def __init__(self, host, platform, max_failures=None, cooldown=None):
+        self.host = host
+        self.platform = platform
+        self.max_failures = int(
+            get_environment_params("TWCC_BREAKER_FAILURES", 5)
+            if isNone(max_failures)
+            else max_failures
+        )
+        self.cooldown = float(
+            get_environment_params("TWCC_BREAKER_COOLDOWN", 30)
+            if isNone(cooldown)
+            else cooldown
+        )
+        name = hashlib.sha1(("%s %s" % (host, platform)).encode("utf8")).hexdigest()
+        self.path = os.path.join(
+            os.environ["TWCC_DATA_PATH"], "breaker", "%s.json" % name
+        )
+        self._lock = threading.Lock()
+        self.failures, self.opened = self._load()
+        self.is_probing = False
+
+    def isEnabled(self):
+        return self.max_failures > 0
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as fn:
+                state = json.load(fn)
+            # forget old failures, a breaker left open is probed meanwhile
+            if time.time() - state["ts"] < 4 * self.cooldown:
+                return int(state["failures"]), state["opened"]
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            pass
+        return 0, None
+
+    def _save(self):
+        state = {
+            "host": self.host,
+            "platform": self.platform,
+            "failures": self.failures,
+            "opened": self.opened,
+            "ts": time.time(),
+        }
+        try:
+            if self.failures == 0 and isNone(self.opened):
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+            else:
+                _atomic_json_dump(self.path, state)
+        except (IOError, OSError):
+            pass
+
+    def state(self):
+        if isNone(self.opened):
+            return "closed"
+        if self.is_probing or time.time() - self.opened < self.cooldown:
+            return "open"
+        return "half-open"
+
+    def before(self):
+        """Raises CircuitOpenError when the call must not be sent"""
+        if not self.isEnabled():
+            return
+        with self._lock:
+            if isNone(self.opened):
+                return
+            # another run may have closed it meanwhile
+            self.failures, self.opened = self._load()
+            st = self.state()
+            if st == "half-open":
+                # let this call probe, the others wait another cooldown
+                self.is_probing = True
+                self.opened = time.time()
+                self._save()
+                return
+            if st == "open":
+                raise CircuitOpenError(
+                    "%s on %s failed %d times in a row, calls are stopped for "
+                    "%.0f more seconds (TWCC_BREAKER_FAILURES=0 turns this off)."
+                    % (
+                        self.platform,
+                        self.host,
+                        self.failures,
+                        self.cooldown - (time.time() - self.opened),
+                    )
+                )
+
+    def record(self, is_ok):
+        if not self.isEnabled():
+            return
+        with self._lock:
+            self.is_probing = False
+            if is_ok:
+                if self.failures == 0 and isNone(self.opened):
+                    return
+                self.failures, self.opened = 0, None
+            else:
+                self.failures += 1
+                if self.failures >= self.max_failures:
+                    self.opened = time.time()
+            self._save()
+
+    def recordResponse(self, r=None, err=None):
+        self.record(isNone(err) and not r.status_code in FAILURE_STATUS)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(url, platform):
+    """One CircuitBreaker per (host of url, platform) and process"""
+    host = "{0.scheme}://{0.netloc}".format(urlparse(url))
+    key = (host, platform)
+    with _breakers_lock:
+        if not key in _breakers:
+            _breakers[key] = CircuitBreaker(host, platform)
+        return _breakers[key]
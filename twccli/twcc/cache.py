@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import base64
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+from twccli.twcc.util import isNone, get_environment_params
+from twccli.twccli import logger
+
+# on: serve fresh entries, refresh stale ones in background
+# off: always ask the API, do not touch the cache (--no-cache)
+# refresh: always ask the API and rewrite the cache (--refresh-cache)
+CACHE_MODES = ["on", "off", "refresh"]
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+_local = threading.local()
+
+
+def cache_mode():
+    mode = getattr(_local, "mode", None)
+    if isNone(mode):
+        mode = get_environment_params("TWCC_CLI_CACHE", "on").lower()
+    if not mode in CACHE_MODES:
+        raise ValueError(
+            "TWCC_CLI_CACHE: '{}' is not in {}.".format(mode, ", ".join(CACHE_MODES))
+        )
+    return mode
+
+
+def _atomic_json_dump(path, obj):
+    cache_dir = os.path.dirname(path)
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    # write aside then rename, readers never see half a file
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as fn:
+            json.dump(obj, fn)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextlib.contextmanager
+def using_cache_mode(mode):
+    """Cache mode of this thread inside this block, None for TWCC_CLI_CACHE
+
+    Other threads, ie: the other lines of a batch, keep their own mode.
+    """
+    saved = getattr(_local, "mode", None)
+    _local.mode = mode
+    try:
+        yield
+    finally:
+        _local.mode = saved
+
+
+def with_cache_mode(func):
+    """func for worker threads, it runs in the cache mode of this thread"""
+    mode = getattr(_local, "mode", None)
+
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        with using_cache_mode(mode):
+            return func(*args, **kwargs)
+
+    return call
+
+
+@contextlib.contextmanager
+def refreshed_cache():
+    """Re-fetch cached catalogs inside this block.
+
+    Used when a name given by the user is not in a cached catalog, it may
+    have been created after the entry was written.
+    """
+    mode = cache_mode()
+    with using_cache_mode("refresh" if mode == "on" else mode):
+        yield
+
+
+class MetaCache(object):
+    """Cache for catalogs which rarely change, ex: solutions, flavors.
+
+    Entries are json files under `TWCC_DATA_PATH/cache/<name>`, shared by
+    every twccli process. An entry is fresh for `ttl` seconds. After that it
+    is still served for `stale_ttl` seconds while a background thread
+    fetches a new copy.
+    """
+
+    def __init__(self, name="meta", ttl=None, stale_ttl=None):
+        self.ttl = (
+            int(get_environment_params("TWCC_CACHE_TTL", 3600)) if isNone(ttl) else ttl
+        )
+        self.stale_ttl = (
+            int(get_environment_params("TWCC_CACHE_STALE_TTL", 86400))
+            if isNone(stale_ttl)
+            else stale_ttl
+        )
+        self.cache_dir = os.path.join(os.environ["TWCC_DATA_PATH"], "cache", name)
+
+    @staticmethod
+    def mkKey(*parts):
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, "%s.json" % key)
+
+    def get(self, key):
+        """Returns (data, age in seconds), or None for a missing entry"""
+        try:
+            with open(self._path(key), "r") as fn:
+                entry = json.load(fn)
+            return entry["data"], time.time() - entry["ts"]
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key, data):
+        _atomic_json_dump(self._path(key), {"ts": time.time(), "data": data})
+
+    def delete(self, key):
+        if os.path.exists(self._path(key)):
+            os.remove(self._path(key))
+
+    def _load(self, key, loader):
+        data = loader()
+        try:
+            self.set(key, data)
+        except (IOError, OSError, TypeError) as e:
+            logger.warning("cache write failed for {}: {}".format(key, e))
+        return data
+
+    def _refresh(self, key, loader):
+        try:
+            self._load(key, loader)
+        except Exception as e:
+            logger.warning("cache refresh failed for {}: {}".format(key, e))
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    def fetch(self, key, loader):
+        """Returns cached data of `key`, calls `loader()` when needed
+
+        Args:
+            key (str): from MetaCache.mkKey
+            loader (function): no arguments, returns json serializable data
+
+        Returns:
+            data from cache or from loader
+        """
+        mode = cache_mode()
+        if mode == "off":
+            return loader()
+        if mode == "refresh":
+            return self._load(key, loader)
+
+        entry = self.get(key)
+        if isNone(entry) or entry[1] > self.ttl + self.stale_ttl:
+            return self._load(key, loader)
+
+        data, age = entry
+        if age > self.ttl:
+            with _refreshing_lock:
+                is_new = not key in _refreshing
+                _refreshing.add(key)
+            if is_new:
+                # twccli does not wait for it, the entry is written atomically
+                threading.Thread(
+                    target=self._refresh, args=(key, loader), daemon=True
+                ).start()
+        return data
+
+
+class HttpCache(object):
+    """Conditional GET cache, enabled by `TWCC_HTTP_CACHE=on`.
+
+    Bodies are kept with their ETag / Last-Modified validators under
+    `TWCC_DATA_PATH/cache/http`. The next GET of the same url sends
+    If-None-Match / If-Modified-Since and a 304 is answered from disk.
+    Entries are evicted least recently used first once the directory is
+    larger than `TWCC_HTTP_CACHE_SIZE` bytes (default 50MB).
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = (
+            int(get_environment_params("TWCC_HTTP_CACHE_SIZE", 50 * 1024 * 1024))
+            if isNone(max_size)
+            else max_size
+        )
+        self.cache_dir = os.path.join(os.environ["TWCC_DATA_PATH"], "cache", "http")
+        self.hits = 0
+        self.lookups = 0
+
+    @staticmethod
+    def isEnabled():
+        return (
+            get_environment_params("TWCC_HTTP_CACHE", "off").lower()
+            in (
+                "on",
+                "1",
+                "true",
+            )
+            and not cache_mode() == "off"
+        )
+
+    @staticmethod
+    def mkKey(t_api, t_headers, t_params):
+        # responses depend on who asks, the api key is part of the key
+        headers = dict(
+            [(k.lower(), v) for (k, v) in t_headers.items() if not k == "User-Agent"]
+        )
+        return MetaCache.mkKey(t_api, headers, t_params)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, "%s.json" % key)
+
+    def get(self, key):
+        if cache_mode() == "refresh":
+            return None
+        try:
+            with open(self._path(key), "r") as fn:
+                entry = json.load(fn)
+            # mtime tracks the last use for LRU eviction
+            os.utime(self._path(key), None)
+            return entry
+        except (IOError, OSError, ValueError):
+            return None
+
+    def validators(self, entry):
+        headers = {}
+        if "etag" in entry:
+            headers["If-None-Match"] = entry["etag"]
+        if "last_modified" in entry:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def set(self, key, r):
+        if not (
+            r.status_code == 200
+            and ("ETag" in r.headers or "Last-Modified" in r.headers)
+        ):
+            return
+        entry = {
+            "status": r.status_code,
+            "headers": dict(r.headers),
+            "encoding": r.encoding,
+            "body": base64.b64encode(r.content).decode("ascii"),
+        }
+        if "ETag" in r.headers:
+            entry["etag"] = r.headers["ETag"]
+        if "Last-Modified" in r.headers:
+            entry["last_modified"] = r.headers["Last-Modified"]
+        try:
+            _atomic_json_dump(self._path(key), entry)
+            self.evict()
+        except (IOError, OSError) as e:
+            logger.warning("http cache write failed for {}: {}".format(r.url, e))
+
+    def evict(self):
+        entries = []
+        for fn in os.listdir(self.cache_dir):
+            if not fn.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, fn))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, fn))
+        total = sum([x[1] for x in entries])
+        for _, size, fn in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, fn))
+            except OSError:
+                pass
+            total -= size
+
+    @staticmethod
+    def mkResponse(entry, r):
+        """Turn a 304 answer into the cached 200 response"""
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        res = requests.Response()
+        res.status_code = entry["status"]
+        res.reason = "OK"
+        res.headers = CaseInsensitiveDict(entry["headers"])
+        res.encoding = entry["encoding"]
+        res._content = base64.b64decode(entry["body"])
+        res.url = r.url
+        res.request = r.request
+        res.elapsed = r.elapsed
+        return res
+
+    def lookup(self, key):
+        self.lookups += 1
+        return self.get(key)
+
+    def hit(self):
+        self.hits += 1
+
+    def ratio(self):
+        return "%d/%d hits (%.0f%%)" % (
+            self.hits,
+            self.lookups,
+            100.0 * self.hits / self.lookups if self.lookups else 0,
+        )
+
+
+_http_cache = None
+
+
+def shared_http_cache():
+    """One HttpCache per process, so hit ratios cover the whole command"""
+    global _http_cache
+    if isNone(_http_cache):
+        _http_cache = HttpCache()
+    return _http_cache
+
+
+def platform_root(url):
+    """Host and platform of url, with the api version dropped
+
+    ie: https://h/api/v3/k8s-D-twcc/sites/12/container/ -> https://h/api/k8s-D-twcc/
+    GET and POST of the same resource may use /v2/ and /v3/, and a call on
+    one resource changes others of its platform, ie: associating an IP with
+    /servers/12/action changes the /sites/ listing.
+    """
+    parsed = urlparse(url)
+    parts = [x for x in re.sub(r"/v\d+/", "/", parsed.path).split("/") if x]
+    return "%s://%s/%s/" % (parsed.scheme, parsed.netloc, "/".join(parts[:2]))
+
+
+class SingleFlight(object):
+    """Per process memo of GET responses, `TWCC_SINGLEFLIGHT=off` disables it.
+
+    Callers asking for the same GET while it is on the wire wait for its
+    answer, and the answer is reused for `TWCC_SINGLEFLIGHT_TTL` (2)
+    seconds. Any POST, PUT, PATCH or DELETE drops the memos of its
+    platform, see platform_root(). Wait loops run inside `fresh()`.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = (
+            float(get_environment_params("TWCC_SINGLEFLIGHT_TTL", 2))
+            if isNone(ttl)
+            else ttl
+        )
+        self.hits = 0
+        self._entries = {}
+        self._inflight = {}
+        self._generation = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def isEnabled():
+        return not get_environment_params("TWCC_SINGLEFLIGHT", "on").lower() in (
+            "off",
+            "0",
+            "false",
+        )
+
+    @contextlib.contextmanager
+    def fresh(self):
+        """GETs inside this block always go to the API, ie: polling"""
+        old = getattr(self._local, "is_fresh", False)
+        self._local.is_fresh = True
+        try:
+            yield
+        finally:
+            self._local.is_fresh = old
+
+    def do(self, key, url, func):
+        """Returns func() of the same key once per ttl
+
+        Args:
+            key (str): from MetaCache.mkKey
+            url (str): for invalidation by mutating calls
+            func (function): no arguments, sends the GET
+        """
+        if getattr(self._local, "is_fresh", False):
+            return func()
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if not isNone(entry) and time.time() - entry[0] < self.ttl:
+                    self.hits += 1
+                    return entry[2]
+                event = self._inflight.get(key)
+                if isNone(event):
+                    event = self._inflight[key] = threading.Event()
+                    generation = self._generation
+                    break
+            # the same GET is on the wire, use its answer
+            event.wait()
+
+        res = None
+        try:
+            res = func()
+        finally:
+            with self._lock:
+                # a mutating call while on the wire makes the answer stale
+                if self._isReusable(res) and generation == self._generation:
+                    self._prune()
+                    self._entries[key] = (time.time(), platform_root(url), res)
+                del self._inflight[key]
+            event.set()
+        return res
+
+    @staticmethod
+    def _isReusable(res):
+        r = res[0] if isinstance(res, tuple) else res
+        return not isNone(r) and getattr(r, "status_code", None) == 200
+
+    def _prune(self):
+        # a daemon or a watch runs for hours, expired memos are dropped
+        now = time.time()
+        for key in [k for (k, v) in self._entries.items() if now - v[0] >= self.ttl]:
+            del self._entries[key]
+
+    def invalidate(self, url):
+        root = platform_root(url)
+        with self._lock:
+            self._generation += 1
+            for key in [k for (k, v) in self._entries.items() if v[1] == root]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+_single_flight = None
+
+
+def shared_single_flight():
+    """One SingleFlight per process"""
+    global _single_flight
+    if isNone(_single_flight):
+        _single_flight = SingleFlight()
+    return _single_flight
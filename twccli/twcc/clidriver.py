@@ -6,14 +6,134 @@ import json
 import yaml
 import datetime
 import logging
+import random
 from twccli.twccli import pass_environment, logger
 import os
 from .session import Session2
-from .util import parsePtn, isNone, isDebug, pp, twcc_error_echo, _debug, jpp
+from . import profiler
+from . import tracing
+from .cache import HttpCache, SingleFlight, shared_http_cache, shared_single_flight
+from .ratelimit import shared_rate_limiter
+from .breaker import circuit_breaker
+from .util import (
+    parsePtn,
+    isNone,
+    isDebug,
+    pp,
+    twcc_error_echo,
+    _debug,
+    jpp,
+    get_environment_params,
+)
+import threading
 import urllib3
 
 urllib3.disable_warnings()
 
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def shared_http_session():
+    """One requests.Session per process, its connections are kept alive
+
+    A daemon or a batch reuses them across commands. The pools keep
+    TWCC_HTTP_POOL_SIZE (32) connections per host, enough for the bulk and
+    fan-out threads.
+    """
+    global _http_session
+    with _http_session_lock:
+        if isNone(_http_session):
+            size = int(get_environment_params("TWCC_HTTP_POOL_SIZE", 32))
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=size, pool_maxsize=size
+            )
+            sess = requests.Session()
+            sess.mount("https://", adapter)
+            sess.mount("http://", adapter)
+            _http_session = sess
+    return _http_session
+
+
+class RetryPolicy(object):
+    """When and how long to wait before sending a failed request again.
+
+    GET, PUT and DELETE are retried on connection errors and on 429/5xx,
+    POST and PATCH only when the caller marks them `idempotent`. Waits grow
+    exponentially with full jitter, a `Retry-After` header wins, and no
+    retry starts after `max_time` seconds in total.
+
+    Defaults come from TWCC_API_RETRIES (3), TWCC_API_BACKOFF (0.5),
+    TWCC_API_BACKOFF_MAX (8) and TWCC_API_RETRY_TIME (60). Every attempt
+    gives up after TWCC_API_TIMEOUT (60) seconds without an answer.
+    """
+
+    RETRY_STATUS = set([429, 500, 502, 503, 504])
+    IDEMPOTENT_VERBS = set(["get", "put", "delete"])
+
+    def __init__(
+        self,
+        max_retries=None,
+        backoff=None,
+        max_backoff=None,
+        max_time=None,
+        idempotent=False,
+    ):
+        self.max_retries = int(
+            get_environment_params("TWCC_API_RETRIES", 3)
+            if isNone(max_retries)
+            else max_retries
+        )
+        self.backoff = float(
+            get_environment_params("TWCC_API_BACKOFF", 0.5)
+            if isNone(backoff)
+            else backoff
+        )
+        self.max_backoff = float(
+            get_environment_params("TWCC_API_BACKOFF_MAX", 8)
+            if isNone(max_backoff)
+            else max_backoff
+        )
+        self.max_time = float(
+            get_environment_params("TWCC_API_RETRY_TIME", 60)
+            if isNone(max_time)
+            else max_time
+        )
+        self.idempotent = idempotent
+
+    @staticmethod
+    def _retry_after(r):
+        if isNone(r) or not "Retry-After" in r.headers:
+            return None
+        val = r.headers["Retry-After"]
+        try:
+            return max(float(val), 0)
+        except ValueError:
+            pass
+        try:
+            from email.utils import parsedate_to_datetime
+
+            ts = parsedate_to_datetime(val)
+            return max((ts - datetime.datetime.now(ts.tzinfo)).total_seconds(), 0)
+        except (TypeError, ValueError):
+            return None
+
+    def nextWait(self, mtype, attempt, elapsed, r=None, err=None):
+        """Returns seconds to wait before the next attempt, None to stop"""
+        if attempt >= self.max_retries:
+            return None
+        if not (mtype in self.IDEMPOTENT_VERBS or self.idempotent):
+            return None
+        if isNone(err) and not r.status_code in self.RETRY_STATUS:
+            return None
+
+        wait = self._retry_after(r)
+        if isNone(wait):
+            wait = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        if elapsed + wait > self.max_time:
+            return None
+        return wait
+
 
 class ServiceOperation:
     def __init__(self, api_key=None):
@@ -116,49 +236,181 @@ class ServiceOperation:
                 method=mtype.upper(), headers=headers, data=t_data, uri=t_api
             )
 
-    def _api_act(
-        self, t_api, t_headers, t_params, t_data=None, mtype="get", show_curl=False
-    ):
-
-        if show_curl:
-            self._to_curl(t_api, t_headers, t_data, mtype)
-
-        start_time = time.time()
+    def _send(self, t_api, t_headers, t_params, t_data=None, mtype="get"):
         ssl_verify_mode = True
+        # a gateway which stops answering raises requests.Timeout, which is
+        # retried and counted by the circuit breaker
+        timeout = float(get_environment_params("TWCC_API_TIMEOUT", 60))
+        sess = shared_http_session()
 
         if mtype == "get":
-            r = requests.get(
-                t_api, params=t_params, headers=t_headers, verify=ssl_verify_mode
+            return sess.get(
+                t_api,
+                params=t_params,
+                headers=t_headers,
+                verify=ssl_verify_mode,
+                timeout=timeout,
             )
-
         elif mtype == "post":
-            r = requests.post(
+            return sess.post(
                 t_api,
                 headers=t_headers,
                 data=json.dumps(t_data),
                 verify=ssl_verify_mode,
+                timeout=timeout,
             )
         elif mtype == "delete":
-            r = requests.delete(
-                t_api, headers=t_headers, params=t_params, verify=ssl_verify_mode
+            return sess.delete(
+                t_api,
+                headers=t_headers,
+                params=t_params,
+                verify=ssl_verify_mode,
+                timeout=timeout,
             )
         elif mtype == "patch":
-            r = requests.patch(
+            return sess.patch(
                 t_api,
                 headers=t_headers,
                 data=json.dumps(t_data),
                 verify=ssl_verify_mode,
+                timeout=timeout,
             )
         elif mtype == "put":
-            r = requests.put(
+            return sess.put(
                 t_api,
                 headers=t_headers,
                 data=json.dumps(t_data),
                 verify=ssl_verify_mode,
+                timeout=timeout,
             )
         else:
             raise ValueError("http verb:'{0}' is not valid".format(mtype))
 
+    def _send_with_retry(
+        self, t_api, t_headers, t_params, t_data=None, mtype="get", retry=None
+    ):
+        retry = RetryPolicy() if isNone(retry) else retry
+        limiter = shared_rate_limiter()
+        breaker = circuit_breaker(t_api, t_headers.get("X-API-HOST"))
+        start_time = time.time()
+        attempt = 0
+        breaker.before()
+        while True:
+            err = None
+            if not isNone(limiter):
+                waited = limiter.acquire(mtype, t_api)
+                if self._debug and waited > 0:
+                    logger.info(
+                        "[rate limit]: %s %s, wait %.2f sec"
+                        % (mtype.upper(), t_api, waited)
+                    )
+            try:
+                r = self._send(t_api, t_headers, t_params, t_data, mtype)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                r, err = None, e
+            if not isNone(limiter) and not isNone(r) and r.status_code == 429:
+                # the gateway is ahead of our budget, slow down every caller
+                limiter.drain(mtype, t_api)
+
+            wait = retry.nextWait(mtype, attempt, time.time() - start_time, r, err)
+            if isNone(wait):
+                break
+            if self._debug:
+                logger.info(
+                    "[retry]: %s %s, %s, attempt %d, wait %.2f sec"
+                    % (
+                        mtype.upper(),
+                        t_api,
+                        err if isNone(r) else r.status_code,
+                        attempt + 1,
+                        wait,
+                    )
+                )
+            time.sleep(wait)
+            attempt += 1
+
+        # one outcome per call, its retries are not failures of their own
+        breaker.recordResponse(r, err)
+        if not isNone(err):
+            raise err
+        return r, attempt
+
+    def _api_act(
+        self,
+        t_api,
+        t_headers,
+        t_params,
+        t_data=None,
+        mtype="get",
+        show_curl=False,
+        retry=None,
+    ):
+        args = (t_api, t_headers, t_params, t_data, mtype, show_curl, retry)
+        if not SingleFlight.isEnabled():
+            return self._api_act_once(*args)
+
+        single_flight = shared_single_flight()
+        if mtype == "get":
+            key = HttpCache.mkKey(t_api, t_headers, t_params)
+            return single_flight.do(key, t_api, lambda: self._api_act_once(*args))
+        try:
+            return self._api_act_once(*args)
+        finally:
+            single_flight.invalidate(t_api)
+
+    def _api_act_once(
+        self,
+        t_api,
+        t_headers,
+        t_params,
+        t_data=None,
+        mtype="get",
+        show_curl=False,
+        retry=None,
+    ):
+
+        if show_curl:
+            self._to_curl(t_api, t_headers, t_data, mtype)
+
+        start_time = time.time()
+
+        http_cache, cache_entry = None, None
+        if mtype == "get" and HttpCache.isEnabled():
+            http_cache = shared_http_cache()
+            cache_key = HttpCache.mkKey(t_api, t_headers, t_params)
+            cache_entry = http_cache.lookup(cache_key)
+            if not isNone(cache_entry):
+                t_headers = dict(t_headers, **http_cache.validators(cache_entry))
+
+        sp = tracing.start_http(mtype, t_api)
+        try:
+            r, retries = self._send_with_retry(
+                t_api, t_headers, t_params, t_data, mtype, retry=retry
+            )
+        except BaseException as e:
+            sp.end(e)
+            raise
+        tracing.end_http(sp, r.status_code, retries)
+        if not isNone(profiler.current()):
+            body = r.request.body if not isNone(r.request) else None
+            profiler.recordCall(
+                mtype,
+                t_api,
+                time.time() - start_time,
+                len(body) if not isNone(body) else 0,
+                len(r.content),
+                r.status_code,
+            )
+
+        if not isNone(http_cache):
+            if r.status_code == 304 and not isNone(cache_entry):
+                http_cache.hit()
+                r = HttpCache.mkResponse(cache_entry, r)
+            else:
+                http_cache.set(cache_key, r)
+            if self._debug:
+                logger.info("[http cache]: %s" % http_cache.ratio())
+
         if self._debug:
             logger.info("[t_api]: %s" % t_api)
             logger.info("[t_headers]: %s" % t_headers)
@@ -166,8 +418,8 @@ class ServiceOperation:
             logger.info("[t_data]: %s" % json.dumps(t_data))
             logger.info("[r.url]: %s" % r.url)
             logger.info(
-                "--- URL: %s, Status: %s, (%.3f sec) ---"
-                % (t_api, r.status_code, time.time() - start_time)
+                "--- URL: %s, Status: %s, Retries: %d, (%.3f sec) ---"
+                % (t_api, r.status_code, retries, time.time() - start_time)
             )
         return (r, (time.time() - start_time))
 
@@ -185,6 +437,9 @@ class ServiceOperation:
         url_ext_get=None,
         http="get",
         res_type="json",
+        idempotent=False,
+        max_retries=None,
+        headers=None,
     ):
 
         if not self.isFunValid(func):
@@ -205,6 +460,7 @@ class ServiceOperation:
             api_key=api_key,
             user_agent=user_agent,
             ctype=ctype,
+            header_extra=headers,
         )
         # if not isNone(url_ext_get):
         #     t_url += "?"
@@ -215,7 +471,12 @@ class ServiceOperation:
         #     t_url += "&".join(t_url_tmp)
 
         res = self._api_act(
-            t_url, t_header, t_params=url_ext_get, t_data=data_dict, mtype=http
+            t_url,
+            t_header,
+            t_params=url_ext_get,
+            t_data=data_dict,
+            mtype=http,
+            retry=RetryPolicy(idempotent=idempotent, max_retries=max_retries),
         )
         import sys
 
@@ -255,12 +516,9 @@ class ServiceOperation:
         api_key=None,
         user_agent=None,
         ctype="application/json",
+        header_extra=None,
     ):
 
-        self.api_host = api_host
-
-        self.ctype = ctype
-
         from twccli.version import __version__
 
         if not user_agent == None:
@@ -271,12 +529,13 @@ class ServiceOperation:
             "User-Agent": this_user_agent,
             "X-API-HOST": site_sn,
             "x-API-KEY": api_key,
-            "Content-Type": self.ctype,
+            "Content-Type": ctype,
         }
 
-        if len(self.header_extra.keys()) > 0:
-            for key in self.header_extra.keys():
-                return_header[key] = self.header_extra[key]
+        # header_extra on the object is kept for old callers
+        return_header.update(self.header_extra)
+        if not isNone(header_extra):
+            return_header.update(header_extra)
 
         return return_header
 
@@ -326,17 +585,16 @@ class ServiceOperation:
         url_str = self.url_format[func]
         url_parts = {}
         # check if this site_sn is valid
-        if not type(site_sn) == type(None):
-            self.api_pf = site_sn
-        else:
-            self.api_pf = api_host
+        api_pf = site_sn if not type(site_sn) == type(None) else api_host
 
         if "PLATFORM" in url_ptn.keys():
-            url_parts["PLATFORM"] = self.api_pf
+            url_parts["PLATFORM"] = api_pf
 
         # given url_dict
         ptn = func
         if not type(url_dict) == type(None):
+            # the caller's dict is left untouched
+            url_dict = dict(url_dict)
             # check if function name is in given url_dict
             if func in url_dict:
                 ptn = "%s/%s" % (func, url_dict[func])
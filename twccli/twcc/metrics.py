@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Prometheus textfile exporter, `twccli --metrics-file FILE` or TWCC_METRICS_FILE.
+
+At exit the summary kept by profiler.py is written in the text exposition
+format, for node_exporter's textfile collector. The file is replaced
+atomically, give each cron job its own file, ie:
+/var/lib/node_exporter/textfile/twccli_reconcile.prom
+"""
+import atexit
+import os
+import tempfile
+import time
+from twccli.twcc import profiler
+
+PREFIX = "twccli"
+
+
+def _escape(val):
+    return str(val).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if len(labels) == 0:
+        return ""
+    return "{%s}" % ",".join(
+        ['%s="%s"' % (k, _escape(v)) for (k, v) in sorted(labels.items())]
+    )
+
+
+class TextFile(object):
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, mtype, help_txt):
+        # samples of one metric must follow its TYPE line
+        self.lines.append("# HELP %s_%s %s" % (PREFIX, name, help_txt))
+        self.lines.append("# TYPE %s_%s %s" % (PREFIX, name, mtype))
+
+    def sample(self, name, val, labels=None):
+        self.lines.append("%s_%s%s %s" % (PREFIX, name, _labels(labels or {}), val))
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def render(summary, command=""):
+    """Text exposition of a profiler summary"""
+    out = TextFile()
+    cmd = {"command": command}
+    endpoints = [
+        (dict(cmd, verb=x["verb"], endpoint=x["endpoint"]), x)
+        for x in summary["http"]["endpoints"]
+    ]
+
+    out.family("http_requests_total", "counter", "API requests sent.")
+    for lbl, ele in endpoints:
+        out.sample("http_requests_total", ele["calls"], lbl)
+
+    out.family(
+        "http_request_duration_seconds",
+        "summary",
+        "API request latency, retries included.",
+    )
+    for lbl, ele in endpoints:
+        for quantile, key in [("0.5", "p50"), ("0.95", "p95"), ("1", "max")]:
+            out.sample(
+                "http_request_duration_seconds", ele[key], dict(lbl, quantile=quantile)
+            )
+        out.sample("http_request_duration_seconds_sum", ele["total"], lbl)
+        out.sample("http_request_duration_seconds_count", ele["calls"], lbl)
+
+    out.family("http_request_bytes_total", "counter", "Request body bytes sent.")
+    for lbl, ele in endpoints:
+        out.sample("http_request_bytes_total", ele["bytes_out"], lbl)
+
+    out.family("http_response_bytes_total", "counter", "Response bytes received.")
+    for lbl, ele in endpoints:
+        out.sample("http_response_bytes_total", ele["bytes_in"], lbl)
+
+    out.family("http_errors_total", "counter", "API responses by error status.")
+    for status, cnt in sorted(summary["http"]["status"].items()):
+        if int(status) >= 400:
+            out.sample("http_errors_total", cnt, dict(cmd, status=status))
+
+    out.family("cos_bytes_total", "counter", "COS bytes transferred.")
+    for direction, key in [("out", "bytes_out"), ("in", "bytes_in")]:
+        out.sample(
+            "cos_bytes_total", summary["cos"][key], dict(cmd, direction=direction)
+        )
+
+    out.family(
+        "wait_duration_seconds",
+        "summary",
+        "Time spent polling until a resource is ready.",
+    )
+    for name, ele in sorted(summary["waits"].items()):
+        lbl = dict(cmd, waiter=name)
+        out.sample("wait_duration_seconds_sum", ele["seconds"], lbl)
+        out.sample("wait_duration_seconds_count", ele["calls"], lbl)
+
+    if not summary["exit_status"] is None:
+        out.family("command_exit_status", "gauge", "Exit status of the last run.")
+        out.sample("command_exit_status", summary["exit_status"], cmd)
+    out.family("command_duration_seconds", "gauge", "Wall time of the last run.")
+    out.sample("command_duration_seconds", summary["wall_time"], cmd)
+    out.family(
+        "command_last_run_timestamp_seconds", "gauge", "Unix time the last run ended."
+    )
+    out.sample("command_last_run_timestamp_seconds", round(time.time(), 3), cmd)
+    return out.text()
+
+
+def write_textfile(file_name, summary, command=""):
+    # the collector must never read a half written file
+    dir_name = os.path.dirname(os.path.abspath(file_name))
+    fd, tmp_name = tempfile.mkstemp(dir=dir_name, prefix=".twccli_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as fn:
+            fn.write(render(summary, command))
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, file_name)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def enable(file_name, command=""):
+    """Writes the metrics of the running profiler to file_name at exit"""
+
+    def finish():
+        prof = profiler.current()
+        if not prof is None:
+            write_textfile(file_name, prof.summary(), command)
+
+    atexit.register(finish)
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""Request accounting for `twccli --profile`.
+
+Nothing is recorded until `enable()` is called, the hooks in the transport
+and in util/session only check a module global then.
+
+This module must not import other twccli modules, util.py and session.py
+import it while the package is being loaded.
+"""
+
+from __future__ import print_function
+import atexit
+import io
+import functools
+import json
+import math
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+
+SECTIONS = ["yaml", "table", "telemetry"]
+# S3 operations are recorded as /cos/<operation>
+COS_ENDPOINT = "/cos/"
+
+_profile = None
+
+
+def _percentile(values, pct):
+    # nearest rank, values are sorted
+    if len(values) == 0:
+        return 0.0
+    idx = max(0, int(math.ceil(pct / 100.0 * len(values))) - 1)
+    return values[min(idx, len(values) - 1)]
+
+
+def endpoint_of(url):
+    """Path of url with ids folded, ie: /api/v3/<site>/sites/:id/"""
+    path = re.sub(r"^[a-z]+://[^/]+", "", url).split("?")[0]
+    return "/".join([":id" if x.isdigit() else x for x in path.split("/")])
+
+
+class Profiler(object):
+    def __init__(self, start_time=None):
+        self.start_time = time.time() if start_time is None else start_time
+        self.calls = defaultdict(list)
+        self.sections = dict([(x, [0.0, 0]) for x in SECTIONS])
+        self.waits = defaultdict(list)
+        self.exit_status = None
+        self._lock = threading.Lock()
+        self._depth = threading.local()
+
+    def recordCall(self, verb, url, seconds, bytes_out=0, bytes_in=0, status=None):
+        key = (verb.upper(), endpoint_of(url))
+        with self._lock:
+            self.calls[key].append((seconds, bytes_out, bytes_in, status))
+
+    def recordWait(self, name, seconds):
+        with self._lock:
+            self.waits[name].append(seconds)
+
+    def enterSection(self, name):
+        depth = getattr(self._depth, name, 0)
+        setattr(self._depth, name, depth + 1)
+        return depth == 0
+
+    def leaveSection(self, name, seconds, is_outer):
+        setattr(self._depth, name, getattr(self._depth, name) - 1)
+        # nested calls, ie: table_layout -> stream_table_layout, count once
+        if is_outer:
+            with self._lock:
+                self.sections[name][0] += seconds
+                self.sections[name][1] += 1
+
+    def summary(self):
+        endpoints = []
+        total_out, total_in, total_calls = 0, 0, 0
+        statuses = defaultdict(int)
+        with self._lock:
+            calls = dict([(k, list(v)) for (k, v) in self.calls.items()])
+            sections = dict([(k, list(v)) for (k, v) in self.sections.items()])
+            waits = dict([(k, list(v)) for (k, v) in self.waits.items()])
+        for (verb, endpoint), rows in sorted(calls.items()):
+            secs = sorted([x[0] for x in rows])
+            bytes_out = sum([x[1] for x in rows])
+            bytes_in = sum([x[2] for x in rows])
+            endpoints.append(
+                {
+                    "verb": verb,
+                    "endpoint": endpoint,
+                    "calls": len(rows),
+                    "errors": len([x for x in rows if (x[3] or 0) >= 400]),
+                    "p50": round(_percentile(secs, 50), 4),
+                    "p95": round(_percentile(secs, 95), 4),
+                    "max": round(secs[-1], 4),
+                    "total": round(sum(secs), 4),
+                    "bytes_out": bytes_out,
+                    "bytes_in": bytes_in,
+                }
+            )
+            total_calls += len(rows)
+            total_out += bytes_out
+            total_in += bytes_in
+            for row in rows:
+                if not row[3] is None:
+                    statuses[str(row[3])] += 1
+        cos = [x for x in endpoints if x["endpoint"].startswith(COS_ENDPOINT)]
+        return {
+            "wall_time": round(time.time() - self.start_time, 4),
+            "exit_status": self.exit_status,
+            "http": {
+                "calls": total_calls,
+                "bytes_out": total_out,
+                "bytes_in": total_in,
+                "status": dict(statuses),
+                "endpoints": endpoints,
+            },
+            "cos": {
+                "bytes_out": sum([x["bytes_out"] for x in cos]),
+                "bytes_in": sum([x["bytes_in"] for x in cos]),
+            },
+            "waits": dict(
+                [
+                    (k, {"seconds": round(sum(v), 4), "calls": len(v)})
+                    for (k, v) in waits.items()
+                ]
+            ),
+            "sections": dict(
+                [
+                    (k, {"seconds": round(v[0], 4), "calls": v[1]})
+                    for (k, v) in sections.items()
+                ]
+            ),
+        }
+
+    def report(self, out=None):
+        out = sys.stderr if out is None else out
+        ans = self.summary()
+        http = ans["http"]
+        lines = [
+            "",
+            "--- twccli profile ---",
+            "wall time: %.3f sec" % ans["wall_time"],
+            "http calls: %d, bytes out: %d, bytes in: %d"
+            % (http["calls"], http["bytes_out"], http["bytes_in"]),
+        ]
+        if len(http["endpoints"]) > 0:
+            lines.append(
+                "%6s %6s %9s %9s %9s %10s %10s  %s"
+                % (
+                    "calls",
+                    "errors",
+                    "p50(ms)",
+                    "p95(ms)",
+                    "max(ms)",
+                    "out(B)",
+                    "in(B)",
+                    "endpoint",
+                )
+            )
+        for ele in sorted(http["endpoints"], key=lambda x: -x["total"]):
+            lines.append(
+                "%6d %6d %9.1f %9.1f %9.1f %10d %10d  %s %s"
+                % (
+                    ele["calls"],
+                    ele["errors"],
+                    ele["p50"] * 1000,
+                    ele["p95"] * 1000,
+                    ele["max"] * 1000,
+                    ele["bytes_out"],
+                    ele["bytes_in"],
+                    ele["verb"],
+                    ele["endpoint"],
+                )
+            )
+        lines.append(
+            ", ".join(
+                [
+                    "%s: %.3f sec (%d)"
+                    % (x, ans["sections"][x]["seconds"], ans["sections"][x]["calls"])
+                    for x in SECTIONS
+                ]
+            )
+        )
+        if ans["cos"]["bytes_out"] + ans["cos"]["bytes_in"] > 0:
+            lines.append(
+                "cos bytes out: %d, bytes in: %d"
+                % (ans["cos"]["bytes_out"], ans["cos"]["bytes_in"])
+            )
+        for name, ele in sorted(ans["waits"].items()):
+            lines.append(
+                "wait %s: %.3f sec (%d)" % (name, ele["seconds"], ele["calls"])
+            )
+        print("\n".join(lines), file=out)
+
+    def dump(self, json_path):
+        with open(json_path, "w") as fn:
+            json.dump(self.summary(), fn, indent=2, sort_keys=True)
+
+
+def enable(start_time=None, is_print=True, json_path=None):
+    """Starts recording, the summary is printed / dumped at exit"""
+    global _profile
+    _profile = Profiler(start_time)
+
+    def finish(prof=_profile):
+        if is_print:
+            prof.report()
+        if not json_path is None:
+            prof.dump(json_path)
+
+    atexit.register(finish)
+    return _profile
+
+
+def disable():
+    global _profile
+    _profile = None
+
+
+def current():
+    return _profile
+
+
+def recordCall(verb, url, seconds, bytes_out=0, bytes_in=0, status=None):
+    if not _profile is None:
+        _profile.recordCall(verb, url, seconds, bytes_out, bytes_in, status)
+
+
+def recordWait(name, seconds):
+    """Time spent polling until a resource is ready, ie: doSiteStable"""
+    if not _profile is None:
+        _profile.recordWait(name, seconds)
+
+
+def exit_code_of(err):
+    if err is None:
+        return 0
+    if isinstance(err, SystemExit):
+        if err.code is None:
+            return 0
+        return err.code if isinstance(err.code, int) else 1
+    # click.exceptions.Exit and ClickException
+    code = getattr(err, "exit_code", None)
+    return code if isinstance(code, int) else 1
+
+
+def recordExit(err=None):
+    """Keeps the exit status of the command, called when click closes it"""
+    if _profile is None:
+        return
+    if err is None:
+        err = sys.exc_info()[1]
+    _profile.exit_status = exit_code_of(err)
+
+
+def _body_size(body):
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, bytearray, str)):
+        return len(body)
+    try:
+        pos = body.tell()
+        body.seek(0, io.SEEK_END)
+        end = body.tell()
+        body.seek(pos)
+        return end - pos
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+def instrument_boto(client):
+    """Records every API operation of a boto3 client as /cos/<operation>"""
+    if _profile is None:
+        return client
+    service = client.meta.service_model.service_name
+
+    def before_call(model, params, context, **kwargs):
+        context["twcc_profile"] = (time.time(), _body_size(params.get("body")))
+
+    def after_call(http_response, model, context, **kwargs):
+        start = context.pop("twcc_profile", None)
+        if start is None:
+            return
+        recordCall(
+            model.http.get("method", "get"),
+            COS_ENDPOINT + model.name,
+            time.time() - start[0],
+            start[1],
+            int(http_response.headers.get("content-length", 0) or 0),
+            http_response.status_code,
+        )
+
+    client.meta.events.register("before-call.%s" % service, before_call)
+    client.meta.events.register("after-call.%s" % service, after_call)
+    return client
+
+
+def timed(name):
+    """Decorator, adds the time spent in the function to section `name`"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            prof = _profile
+            if prof is None:
+                return func(*args, **kwargs)
+            is_outer = prof.enterSection(name)
+            start_time = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                prof.leaveSection(name, time.time() - start_time, is_outer)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""Client-side token buckets in front of the TWCC API gateway.
+
+Off unless configured:
+
+- TWCC_API_RATE: requests per second for every call, ie: `10` or `10/20`
+  for a burst of 20 (the burst defaults to one second worth of calls)
+- TWCC_API_RATE_LIMITS: per endpoint budgets, `[VERB ]PATTERN=RATE[/BURST]`
+  separated by `,`. PATTERN is matched with fnmatch against the url path
+  with ids folded, ie: `POST */sites/=0.5/2,GET */sites/:id/*=5`.
+  A call takes a token from the first matching budget and from
+  TWCC_API_RATE.
+- TWCC_API_RATE_SHARED=on: keep the buckets in files under
+  `TWCC_DATA_PATH/ratelimit`, so all twccli processes of the host share them.
+"""
+from __future__ import print_function
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+import time
+from twccli.twcc.util import isNone, get_environment_params
+from twccli.twcc import profiler
+
+try:
+    import fcntl
+except ImportError:
+    # no flock on windows, buckets stay per process there
+    fcntl = None
+
+
+def parse_rate(val):
+    """`10` or `10/20` -> (rate, burst)"""
+    parts = str(val).strip().split("/")
+    rate = float(parts[0])
+    burst = float(parts[1]) if len(parts) > 1 else max(rate, 1.0)
+    if rate <= 0 or burst < 1:
+        raise ValueError("rate limit '{}' is not valid.".format(val))
+    return rate, burst
+
+
+def parse_rules(val):
+    """`GET */sites/*=5/10,*/images/*=1` -> [(verb, pattern, rate, burst)]"""
+    rules = []
+    for ele in [x.strip() for x in val.split(",") if len(x.strip()) > 0]:
+        if not "=" in ele:
+            raise ValueError("rate limit rule '{}' is not valid.".format(ele))
+        key, rate = ele.rsplit("=", 1)
+        key = key.strip().split(None, 1)
+        verb, ptn = (key[0].upper(), key[1]) if len(key) > 1 else ("*", key[0])
+        rules.append((verb, ptn) + parse_rate(rate))
+    return rules
+
+
+class TokenBucket(object):
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.ts = time.time()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens, ts, now):
+        # tokens may go below zero, those are reservations of later callers
+        tokens = min(self.burst, tokens + (now - ts) * self.rate) - 1
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        return tokens, wait
+
+    def reserve(self):
+        """Takes a token, returns seconds to wait before using it"""
+        with self._lock:
+            now = time.time()
+            self.tokens, wait = self._take(self.tokens, self.ts, now)
+            self.ts = now
+        return wait
+
+    def drain(self):
+        """Empties the bucket, ie: after the gateway answered 429"""
+        with self._lock:
+            self.tokens, self.ts = min(self.tokens, 0.0), time.time()
+
+
+class SharedTokenBucket(TokenBucket):
+    """TokenBucket kept in a json file, updated under flock"""
+
+    def __init__(self, rate, burst, path):
+        TokenBucket.__init__(self, rate, burst)
+        self.path = path
+        dir_name = os.path.dirname(path)
+        if not os.path.isdir(dir_name):
+            os.makedirs(dir_name, exist_ok=True)
+
+    def _update(self, func):
+        with self._lock:
+            with open(self.path, "a+") as fn:
+                fcntl.flock(fn.fileno(), fcntl.LOCK_EX)
+                try:
+                    fn.seek(0)
+                    try:
+                        state = json.loads(fn.read())
+                        tokens, ts = float(state["tokens"]), float(state["ts"])
+                    except (ValueError, KeyError, TypeError):
+                        tokens, ts = self.burst, time.time()
+                    tokens, ts, ans = func(tokens, ts, time.time())
+                    fn.seek(0)
+                    fn.truncate()
+                    fn.write(json.dumps({"tokens": tokens, "ts": ts}))
+                    fn.flush()
+                finally:
+                    fcntl.flock(fn.fileno(), fcntl.LOCK_UN)
+        return ans
+
+    def reserve(self):
+        def take(tokens, ts, now):
+            tokens, wait = self._take(tokens, ts, now)
+            return tokens, now, wait
+
+        return self._update(take)
+
+    def drain(self):
+        self._update(lambda tokens, ts, now: (min(tokens, 0.0), now, None))
+
+
+class RateLimiter(object):
+    """Buckets of TWCC_API_RATE and TWCC_API_RATE_LIMITS, see module doc"""
+
+    def __init__(self, rate=None, rules=None, shared=None):
+        if isNone(rate):
+            rate = get_environment_params("TWCC_API_RATE", None)
+        if isNone(rules):
+            rules = get_environment_params("TWCC_API_RATE_LIMITS", "")
+        if isNone(shared):
+            shared = get_environment_params(
+                "TWCC_API_RATE_SHARED", "off"
+            ).lower() in ("on", "1", "true")
+        self.shared = shared and not fcntl is None
+        self.rules = parse_rules(rules) if isinstance(rules, str) else list(rules)
+        self.default = (
+            None if isNone(rate) else self._bucket("*", "*", *parse_rate(rate))
+        )
+        self.buckets = [self._bucket(*x) for x in self.rules]
+
+    def _bucket(self, verb, ptn, rate, burst):
+        if not self.shared:
+            return TokenBucket(rate, burst)
+        # one file per budget, the same config in another process finds it
+        name = hashlib.sha1(
+            json.dumps([verb, ptn, rate, burst]).encode("utf8")
+        ).hexdigest()
+        return SharedTokenBucket(
+            rate,
+            burst,
+            os.path.join(os.environ["TWCC_DATA_PATH"], "ratelimit", name + ".json"),
+        )
+
+    def isEnabled(self):
+        return not isNone(self.default) or len(self.buckets) > 0
+
+    def bucketsOf(self, verb, url):
+        ans = []
+        endpoint = profiler.endpoint_of(url)
+        for (r_verb, ptn, _, _), bucket in zip(self.rules, self.buckets):
+            if (r_verb == "*" or r_verb == verb.upper()) and fnmatch.fnmatch(
+                endpoint, ptn
+            ):
+                ans.append(bucket)
+                break
+        if not isNone(self.default):
+            ans.append(self.default)
+        return ans
+
+    def reserve(self, verb, url):
+        """Takes the tokens of one call, returns seconds to wait"""
+        return max([0.0] + [x.reserve() for x in self.bucketsOf(verb, url)])
+
+    def acquire(self, verb, url):
+        """Blocks until the call may be sent, returns the seconds waited"""
+        wait = self.reserve(verb, url)
+        if wait > 0:
+            time.sleep(wait)
+            profiler.recordWait("ratelimit", wait)
+        return wait
+
+    def drain(self, verb, url):
+        for bucket in self.bucketsOf(verb, url):
+            bucket.drain()
+
+
+_limiter = None
+
+
+def shared_rate_limiter():
+    """One RateLimiter per process, None when no budget is configured"""
+    global _limiter
+    if isNone(_limiter):
+        _limiter = RateLimiter()
+    return _limiter if _limiter.isEnabled() else None
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""Async counterparts of the compute services.
+
+Methods build an ApiRequest and await it, nothing is kept on the object
+between calls, so one instance can serve any number of concurrent tasks.
+"""
+
+from twccli.twcc.async_clidriver import ApiRequest
+from twccli.twcc.session import Session2
+from twccli.twcc.util import isNone
+
+
+class AsyncService(object):
+    func = None
+    cluster_tag = "VCS"
+
+    def __init__(self, twcc, project_id=None):
+        """
+        Args:
+            twcc (AsyncServiceOperation): shared transport
+            project_id (str): default is the project in credential
+        """
+        self.twcc = twcc
+        self._csite_ = Session2._getClusterName(self.cluster_tag)
+        if isNone(project_id):
+            self.twcc_session = Session2()
+            project_id = self.twcc_session.twcc_proj_id[self.cluster_tag]
+        self._project_id = project_id
+
+    def _request(self, verb="get", url_dict=None, func=None, **kwargs):
+        return self.twcc.request(
+            ApiRequest(
+                self.func if isNone(func) else func,
+                verb=verb,
+                site=self._csite_,
+                url_dict=url_dict,
+                **kwargs
+            )
+        )
+
+    async def list(self):
+        return await self._request(params={"project": self._project_id})
+
+    async def queryById(self, mid):
+        return await self._request(url_dict={self.func: mid})
+
+    async def delete(self, mid):
+        return await self._request("delete", {self.func: mid}, res_type="txt")
+
+
+class AsyncGpuSite(AsyncService):
+    func = "sites"
+    cluster_tag = "CNTR"
+
+    async def list(self, is_all=False):
+        if is_all:
+            params = {"project": self._project_id, "all_users": 1}
+        else:
+            params = {"project": self._project_id, "category": "container"}
+        return await self._request(params=params)
+
+    async def getDetail(self, site_id):
+        return await self._request(url_dict={"sites": site_id, "container": ""})
+
+    async def create(self, name, sol_id, extra_prop):
+        username = Session2().twcc_username
+        headers = dict(extra_prop)
+        headers["x-extra-property-gpfs01-mount-path"] = "/work/{}".format(username)
+        headers["x-extra-property-gpfs02-mount-path"] = "/home/{}".format(username)
+        return await self._request(
+            "post",
+            headers=headers,
+            data={
+                "name": name,
+                "desc": "TWCC-Cli created GPU container",
+                "project": self._project_id,
+                "solution": sol_id,
+            },
+        )
+
+    async def isStable(self, site_id):
+        site_info = await self.queryById(site_id)
+        return site_info["status"] == "Ready" or site_info["status"] == "Error"
+
+
+class AsyncVcsSite(AsyncService):
+    func = "sites"
+
+    async def list(self, isAll=False):
+        params = {"project": self._project_id}
+        if isAll:
+            params.update({"sol_categ": "os", "all_users": 1})
+        return await self._request(params=params)
+
+    async def create(self, name, sol_id, extra_prop):
+        return await self._request(
+            "post",
+            headers=extra_prop,
+            data={
+                "name": name,
+                "desc": "TWCC-Cli created VCS",
+                "project": self._project_id,
+                "solution": sol_id,
+            },
+        )
+
+    async def _action(self, site_id, status):
+        return await self._request(
+            "put", {"sites": site_id, "action": ""}, data={"status": status}
+        )
+
+    async def stop(self, site_id):
+        return await self._action(site_id, "shelve")
+
+    async def start(self, site_id):
+        return await self._action(site_id, "unshelve")
+
+    async def reboot(self, site_id):
+        return await self._action(site_id, "reboot")
+
+    async def isStable(self, site_id):
+        site_info = await self.queryById(site_id)
+        return site_info["status"] == "Ready" or site_info["status"] == "Error"
+
+
+class AsyncSecurityGroups(AsyncService):
+    func = "security-groups"
+
+    async def create(self, name, desc=""):
+        return await self._request(
+            "post", data={"project": self._project_id, "name": name, "desc": desc}
+        )
+
+    async def deleteById(self, secg_id):
+        return await self._request("delete", {"security-groups": secg_id})
+
+    async def addRule(self, secg_id, port_min, port_max, cidr, protocol, direction):
+        return await self._request(
+            "post",
+            func="security-group-rules",
+            data={
+                "sg": secg_id,
+                "direction": direction,
+                "protocol": protocol,
+                "remote_ip_prefix": cidr,
+                "port_range_max": port_max,
+                "port_range_min": port_min,
+            },
+        )
+
+    async def deleteRule(self, rule_id):
+        return await self._request(
+            "delete",
+            {"security-group-rules": rule_id},
+            func="security-group-rules",
+            params={"project": self._project_id},
+        )
+
+
+class AsyncNetworks(AsyncService):
+    func = "networks"
+
+    async def create(self, name, getway, cidr):
+        return await self._request(
+            "post",
+            data={
+                "project": self._project_id,
+                "name": name,
+                "gateway": getway,
+                "cidr": cidr,
+                "with_router": True,
+            },
+        )
+
+    async def delete(self, vnet_id):
+        return await self._request("delete", {"networks": vnet_id})
+
+    async def isStable(self, vnet_id):
+        vnet_info = await self.queryById(vnet_id)
+        return vnet_info["status"] == "ACTIVE"
+
+
+class AsyncLoadBalancers(AsyncService):
+    func = "loadbalancers"
+
+    async def list(self, isAll=False):
+        params = {"project": self._project_id}
+        if isAll:
+            params["all_users"] = 1
+        return await self._request(params=params)
+
+    async def create(
+        self, vlb_name, pools, vnet_id, listeners, vlb_desc, json_data=None, eip_id=None
+    ):
+        data = {
+            "name": vlb_name,
+            "private_net": vnet_id,
+            "pools": pools,
+            "listeners": listeners,
+            "desc": vlb_desc,
+        }
+        if not isNone(eip_id):
+            data.update({"ip": eip_id})
+        if not isNone(json_data):
+            data = json_data
+        return await self._request("post", data=data)
+
+    async def deleteById(self, vlb_id):
+        return await self._request("delete", {"loadbalancers": vlb_id})
+
+    async def isStable(self, vlb_id):
+        vlb_info = await self.queryById(vlb_id)
+        return vlb_info["status"] == "ACTIVE"
+
+
+class AsyncVolumes(AsyncService):
+    func = "volumes"
+
+    async def create(self, name, size, desc="", volume_type="hdd"):
+        return await self._request(
+            "post",
+            data={
+                "project": self._project_id,
+                "name": name,
+                "size": size,
+                "desc": desc,
+                "volume_type": volume_type,
+            },
+        )
+
+    async def deleteById(self, sys_vol_id):
+        return await self._request("delete", {"volumes": sys_vol_id})
+
+    async def update(self, sys_vol_id, vol_status, srvid=0, size=None):
+        if vol_status in ["attach", "detach"]:
+            data = {"status": vol_status, "server": srvid}
+        elif vol_status == "extend":
+            data = {"status": vol_status, "server": 0, "size": size}
+        else:
+            raise ValueError("please provide -sts")
+        return await self._request(
+            "put", {"volumes": sys_vol_id, "action": ""}, data=data
+        )
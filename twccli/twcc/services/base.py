@@ -82,14 +82,15 @@ class image_commit(GenericService):
 
     def getCommitList(self):
         return table_layout(
-            "commited images", self._do_api(), isPrint=False, is_warp=False
+            "commited images", self.request(), isPrint=False, is_warp=False
         )
 
     def createCommit(self, siteid, tag, image):
-        self.http_verb = "post"
-        self.data_dic = {"site": siteid, "tag": tag, "image": image}
-        self.res_type = "txt"
-        self._do_api()
+        self.request(
+            verb="post",
+            data={"site": siteid, "tag": tag, "image": image},
+            res_type="txt",
+        )
 
 
 class ApiKey(GenericService):
@@ -103,9 +104,7 @@ class ApiKey(GenericService):
 
     def list(self):
         print("in list" * 3, self._api_key_)
-        self.http_verb = "get"
-        self.res_type = "json"
-        return self._do_api()
+        return self.request()
 
 
 class acls(GenericService):
@@ -125,8 +124,7 @@ class acls(GenericService):
 
     def listGroup(self):
         """this api is the same with acl"""
-        self._func_ = "acls-g"
-        return self._do_api()
+        return self.request("acls-g")
 
 
 class Keypairs(GenericService):
@@ -143,16 +141,13 @@ class Keypairs(GenericService):
         self._csite_ = Session2._getClusterName("VCS")
 
     def list(self):
-        return self._do_api()
+        return self.request()
 
     def createKeyPair(self, keyPairName, public_key):
-        self.http_verb = "post"
-        self.data_dic = {"name": keyPairName}
+        data_dic = {"name": keyPairName}
         if not isNone(public_key):
-            self.data_dic.update({"public_key": public_key})
-        self.res_type = "txt"
-        res = self._do_api()
-        return res
+            data_dic.update({"public_key": public_key})
+        return self.request(verb="post", data=data_dic, res_type="txt")
 
 
 class projects(GenericService):
@@ -169,8 +164,7 @@ class projects(GenericService):
             self._csite_ = cluster_name
 
     def getProjectSolution(self, proj_id, sol_id):
-        self.url_dic = {"projects": proj_id, "solutions": sol_id}
-        return self.list()
+        return self.cached_request(url_dict={"projects": proj_id, "solutions": sol_id})
 
     def getProjects(self, isAll=False, is_table=True, is_print=True):
         s = iservice(api_key=self._api_key_)
@@ -243,8 +237,7 @@ class projects(GenericService):
 
     def getS3Keys(self, proj_code):
         proj_id = self.getS3ProjId(proj_code)
-        self.url_dic = {"projects": proj_id, "key": ""}
-        return self.list()
+        return self.request(url_dict={"projects": proj_id, "key": ""})
 
 
 class api_key(GenericService):
@@ -253,9 +246,7 @@ class api_key(GenericService):
         self._csite_ = "admin"
 
     def getInfo(self):
-        self.url_dic = {"api_key": "api_key"}
-        self._csite_ = "admin"
-        return self.list()
+        return self.request(url_dict={"api_key": "api_key"}, site="admin")
 
 
 class iservice(GenericService):
@@ -264,15 +255,11 @@ class iservice(GenericService):
 
     def getProjects(self, isAll=False):
         if isAll:
-            self.url_dic = {"iservice": "user/all_wallet"}
-        else:
-            self.url_dic = {"iservice": "user/wallet"}
-        return self.list()
+            return self.request(url_dict={"iservice": "user/all_wallet"})
+        return self.request(url_dict={"iservice": "user/wallet"})
 
     def getProducts(self):
-        # self.ext_get = {}
-        self.url_dic = {"iservice": "projects/products/AI"}
-        return self.list()
+        return self.request(url_dict={"iservice": "projects/products/AI"})
 
     def getVCSProducts(self):
         """先不處理這個功能，因為產品/價格還沒穩定"""
@@ -296,3 +283,6 @@ class Flavors(GenericService):
         self._csite_ = csite
         if not isNone(api_key):
             self._api_key_ = api_key
+
+    def list(self):
+        return self.cached_request()
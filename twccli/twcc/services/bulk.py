@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""Create or delete many resources of one kind at once.
+
+Delete, ie: `twccli rm vcs 1 2 3 ...`
+
+    BulkDelete("VCS", vsite.delete, check=check_vcs).run(ids, is_force)
+
+1. `check(id)` runs for every id in parallel, it returns a line describing
+   the resource for the confirmation or raises BulkSkip, ie: protected.
+2. One confirmation lists every id which passed.
+3. `delete(id)` runs for those in parallel.
+4. With `list_ids`, one poll of the listing per round waits until every
+   deleted id is gone.
+
+Create, ie: `twccli mk ccs -n sweep-{i:02d} --count 50`
+
+    BulkCreate("CCS", create, list_sites=site.list).run(names, wait=True)
+
+1. `create(name)` runs for every name in parallel, the catalogs are
+   resolved once before.
+2. With `list_sites`, one poll of the listing per round waits until every
+   created site is Ready or Error.
+3. `conn_info(site)` adds the connection info of the Ready ones.
+
+At most TWCC_BULK_CONCURRENCY (8) calls are on the wire at once, the
+services are shared between the threads. The API rate limiter paces them,
+ie: TWCC_API_RATE_LIMITS="POST */sites/=1/5".
+"""
+from __future__ import print_function
+import time
+import click
+from concurrent.futures import ThreadPoolExecutor
+from twccli.twcc import profiler, tracing
+from twccli.twcc.cache import shared_single_flight, with_cache_mode
+from twccli.twcc.util import isNone, get_environment_params
+
+
+STABLE_STATUS = ("Ready", "Error")
+
+
+class BulkSkip(Exception):
+    """The resource is left as it is, the message says why"""
+
+
+def _error_text(err):
+    return "%s" % err if len("%s" % err) > 0 else type(err).__name__
+
+
+class _Bulk(object):
+    def __init__(self, res_name, concurrency=None):
+        self.res_name = res_name
+        self.concurrency = int(
+            get_environment_params("TWCC_BULK_CONCURRENCY", 8)
+            if isNone(concurrency)
+            else concurrency
+        )
+
+    def _map(self, func, ids):
+        """[(id, answer, error)] in the order of ids"""
+
+        @with_cache_mode
+        def call(res_id):
+            try:
+                return (res_id, func(res_id), None)
+            except Exception as e:
+                return (res_id, None, e)
+
+        if len(ids) <= 1 or self.concurrency <= 1:
+            return [call(x) for x in ids]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(ids))) as pool:
+            return list(pool.map(call, ids))
+
+    @staticmethod
+    def _timeout(timeout):
+        if isNone(timeout):
+            return float(get_environment_params("TWCC_BULK_WAIT_TIMEOUT", 1800))
+        return timeout
+
+
+class BulkDelete(_Bulk):
+    def __init__(self, res_name, delete, check=None, list_ids=None, concurrency=None):
+        """
+        Args:
+            res_name (str): shown in the confirmation, ie: VCS
+            delete (function): delete(id)
+            check (function): check(id), returns a description or None
+            list_ids (function): no arguments, ids which still exist
+            concurrency (int): calls on the wire, TWCC_BULK_CONCURRENCY
+        """
+        super(BulkDelete, self).__init__(res_name, concurrency)
+        self.delete = delete
+        self.check = check
+        self.list_ids = list_ids
+
+    def run(self, ids, is_force=False, wait=False, timeout=None):
+        """Checks, confirms and deletes ids
+
+        Returns:
+            list of {"id", "status", "message"}, one per id
+        """
+        # compute_util imports this module
+        from twccli.twcc.services.compute_util import getConfirm
+
+        ans = dict([(x, {"id": x, "status": "", "message": ""}) for x in ids])
+        ok_ids, desc = list(ids), []
+        if not isNone(self.check):
+            ok_ids = []
+            for res_id, info, err in self._map(self.check, ids):
+                if isNone(err):
+                    ok_ids.append(res_id)
+                    if not isNone(info):
+                        desc.append(info)
+                else:
+                    status = "Skipped" if isinstance(err, BulkSkip) else "Failed"
+                    ans[res_id].update({"status": status, "message": _error_text(err)})
+        if len(ok_ids) == 0:
+            return self._report([ans[x] for x in ids])
+
+        if not getConfirm(
+            self.res_name,
+            ", ".join([str(x) for x in ok_ids]),
+            is_force,
+            ext_txt="\n".join(desc),
+        ):
+            print("No delete operations.")
+            return [ans[x] for x in ids]
+
+        deleted = []
+        for res_id, _, err in self._map(self.delete, ok_ids):
+            if isNone(err):
+                deleted.append(res_id)
+                ans[res_id]["status"] = "Deleted"
+            else:
+                ans[res_id].update({"status": "Failed", "message": _error_text(err)})
+
+        if wait and not isNone(self.list_ids) and len(deleted) > 0:
+            for res_id in self.waitGone(deleted, timeout):
+                ans[res_id].update(
+                    {"status": "Deleting", "message": "still there after the wait"}
+                )
+        return self._report([ans[x] for x in ids])
+
+    def waitGone(self, ids, timeout=None, interval=5):
+        """Polls list_ids() until none of ids is left, returns ids left"""
+        timeout = self._timeout(timeout)
+        left = set([str(x) for x in ids])
+        start_time = time.time()
+        with tracing.span(
+            "waitGone", {"twcc.resource": self.res_name, "twcc.ids": len(left)}
+        ), shared_single_flight().fresh():
+            while len(left) > 0 and time.time() - start_time < timeout:
+                left &= set([str(x) for x in self.list_ids()])
+                if len(left) > 0:
+                    time.sleep(interval)
+        profiler.recordWait("waitGone", time.time() - start_time)
+        return [x for x in ids if str(x) in left]
+
+    def _report(self, rows):
+        for row in rows:
+            if row["status"] == "Deleted":
+                print("Successfully remove {}".format(row["id"]))
+            elif not row["status"] == "":
+                click.echo(
+                    click.style(
+                        "{} {}: {}".format(self.res_name, row["id"], row["message"]),
+                        fg="red",
+                        bold=True,
+                    ),
+                    err=True,
+                )
+        return rows
+
+
+class BulkCreate(_Bulk):
+    def __init__(
+        self, res_name, create, list_sites=None, conn_info=None, concurrency=None
+    ):
+        """
+        Args:
+            res_name (str): ie: CCS
+            create (function): create(name), returns the created site
+            list_sites (function): no arguments, the sites with their status
+            conn_info (function): conn_info(site) of a Ready site, returns a dict
+            concurrency (int): calls on the wire, TWCC_BULK_CONCURRENCY
+        """
+        super(BulkCreate, self).__init__(res_name, concurrency)
+        self.create = create
+        self.list_sites = list_sites
+        self.conn_info = conn_info
+
+    def run(self, names, wait=False, timeout=None):
+        """Creates one site per name
+
+        Returns:
+            list of {"name", "id", "status", "message"}, one per name, Ready
+            sites have their connection info too
+        """
+        rows = []
+        for name, res, err in self._map(self.create, names):
+            row = {"name": name, "id": None, "status": "Failed", "message": ""}
+            if isNone(err):
+                row.update({"id": res["id"], "status": res.get("status", "")})
+            else:
+                row["message"] = _error_text(err)
+            rows.append(row)
+        created = [x for x in rows if not isNone(x["id"])]
+
+        if wait and not isNone(self.list_sites) and len(created) > 0:
+            sites = self.waitReady([x["id"] for x in created], timeout)
+            for row in created:
+                site = sites.get(str(row["id"]), {})
+                row["status"] = site.get("status", row["status"])
+                if not row["status"] in STABLE_STATUS:
+                    row["message"] = "not ready after the wait"
+                elif not isNone(self.conn_info) and row["status"] == "Ready":
+                    row["site"] = site
+
+        ready = [x for x in created if "site" in x]
+        for row, info, err in self._map(lambda x: self.conn_info(x.pop("site")), ready):
+            if isNone(err):
+                row.update(info)
+            else:
+                row["message"] = _error_text(err)
+        return self._report(rows)
+
+    def waitReady(self, ids, timeout=None, interval=5):
+        """Polls list_sites() until all of ids are stable, returns {id: site}"""
+        timeout = self._timeout(timeout)
+        left = set([str(x) for x in ids])
+        sites = {}
+        start_time = time.time()
+        with tracing.span(
+            "waitReady", {"twcc.resource": self.res_name, "twcc.ids": len(left)}
+        ), shared_single_flight().fresh():
+            while len(left) > 0 and time.time() - start_time < timeout:
+                for site in self.list_sites():
+                    if str(site.get("id")) in left:
+                        sites[str(site["id"])] = site
+                        if site.get("status") in STABLE_STATUS:
+                            left.discard(str(site["id"]))
+                if len(left) > 0:
+                    time.sleep(interval)
+        profiler.recordWait("waitReady", time.time() - start_time)
+        return sites
+
+    def _report(self, rows):
+        for row in rows:
+            if not row["message"] == "":
+                click.echo(
+                    click.style(
+                        "{} {}: {}".format(self.res_name, row["name"], row["message"]),
+                        fg="red",
+                        bold=True,
+                    ),
+                    err=True,
+                )
+        return rows
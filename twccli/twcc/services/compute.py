@@ -68,8 +68,9 @@ class GpuSolutions(GenericService):
         self._csite_ = "goc"
 
     def list(self):
-        self.ext_get = {"project": self._project_id, "category": "container"}
-        return super(GpuSolutions, self).list()
+        return self.cached_request(
+            params={"project": self._project_id, "category": "container"}
+        )
 
 
 class GpuSite(GpuService):
@@ -144,9 +145,7 @@ class GpuSite(GpuService):
             return dict(sol_list)
 
     def getCommitList(self, mtype="list"):
-        self.func = "image_commit"
-
-        return self._do_api()
+        return self.request("image_commit")
 
     @staticmethod
     def getGpuDefaultHeader(flavor, sol_name, gpus="1"):
@@ -230,13 +229,10 @@ class GpuSite(GpuService):
 
     def list(self, is_all=False):
         if is_all:
-            self.ext_get = {"project": self._project_id, "all_users": 1}
-        elif not self.url_dic == None and self.url_dic["container"] == "":
-            pass
+            params = {"project": self._project_id, "all_users": 1}
         else:
-            self.ext_get = {"project": self._project_id, "category": "container"}
-        ans = self._do_api()
-        return ans
+            params = {"project": self._project_id, "category": "container"}
+        return self.request(params=params)
 
     def create(self, name, sol_id, extra_prop):
 
@@ -248,40 +244,39 @@ class GpuSite(GpuService):
             self.twcc_session.twcc_username
         )
 
-        self.twcc.header_extra = extra_prop
-        self.http_verb = "post"
-        self.data_dic = {
-            "name": name,
-            "desc": "TWCC-Cli created GPU container",
-            "project": self._project_id,
-            "solution": sol_id,
-        }
-        return self._do_api()
+        return self.request(
+            verb="post",
+            headers=extra_prop,
+            data={
+                "name": name,
+                "desc": "TWCC-Cli created GPU container",
+                "project": self._project_id,
+                "solution": sol_id,
+            },
+        )
 
-    def update(self, data_dic):
-        self.http_verb = "put"
-        self.res_type = "txt"
-        self.data_dic = data_dic
-        self.ext_get = None
-        return self._do_api()
+    def update(self, site_id, data_dic):
+        return self.request(
+            verb="put",
+            url_dict={"sites": site_id, "container/action": ""},
+            data=data_dic,
+            res_type="txt",
+        )
 
     def delete(self, site_id):
-        self.http_verb = "delete"
-        self.res_type = "txt"
-        self.url_dic = {"sites": site_id}
-        return self._do_api()
+        return self.request(verb="delete", url_dict={"sites": site_id}, res_type="txt")
 
     def patch_desc(self, site_id, desc):
-        self.http_verb = "patch"
-        self.url_dic = {"sites": site_id}
-        self.data_dic = {"desc": desc}
-        return self._do_api()
+        return self.request(
+            verb="patch", url_dict={"sites": site_id}, data={"desc": desc}
+        )
 
     def patch_keep(self, site_id, keep):
-        self.http_verb = "patch"
-        self.url_dic = {"sites": site_id}
-        self.data_dic = {"termination_protection": keep}
-        return self._do_api()
+        return self.request(
+            verb="patch",
+            url_dict={"sites": site_id},
+            data={"termination_protection": keep},
+        )
 
     def list_solution(self, sol_id, isShow=True):
         if sol_id in self._cache_sol_:
@@ -345,10 +340,7 @@ class GpuSite(GpuService):
         return site_info["status"] == "Ready" or site_info["status"] == "Error"
 
     def getDetail(self, site_id):
-        self.url_dic = {"sites": site_id, "container": ""}
-        self.http_verb = "get"
-        self.res_type = "json"
-        return self.list()
+        return self.request(url_dict={"sites": site_id, "container": ""})
 
     def getPodName(self, site_id):
         detail = self.getDetail(site_id)
@@ -366,8 +358,7 @@ class GpuSite(GpuService):
             "pod_name": pod_name,
             "ports": [{"targetPort": int(port_id)}],
         }
-        self.url_dic = {"sites": site_id, "container/action": ""}
-        self.update(bindAttr)
+        self.update(site_id, bindAttr)
 
     def unbindPort(self, site_id, port_id):
         pod_name = self.getPodName(site_id)
@@ -376,18 +367,16 @@ class GpuSite(GpuService):
             "pod_name": pod_name,
             "ports": [{"targetPort": int(port_id)}],
         }
-        self.url_dic = {"sites": site_id, "container/action": ""}
-        self.update(unbindAttr)
+        self.update(site_id, unbindAttr)
 
     def getLog(self, site_id):
         detail = self.getDetail(site_id)
         pod_name = detail["Pod"][0]["name"]
         cntr_name = detail["Pod"][0]["container"][0]["name"]
-        self.ext_get = {"pod_name": pod_name, "container_name": cntr_name}
-        self.url_dic = {"sites": site_id, "container/logs": ""}
-        self.http_verb = "get"
-        self.res_type = "json"
-        return self._do_api()
+        return self.request(
+            url_dict={"sites": site_id, "container/logs": ""},
+            params={"pod_name": pod_name, "container_name": cntr_name},
+        )
 
     def getJpnbToken(self, site_id):
         log_txt = self.getLog(site_id)
@@ -414,45 +403,38 @@ class VcsSite(CpuService):
 
     def list(self, isAll=False):
         if isAll:
-            self.ext_get = {
+            params = {
                 "project": self._project_id,
                 "sol_categ": "os",
                 "all_users": 1,
             }
         else:
-            self.ext_get = {"project": self._project_id}
+            params = {"project": self._project_id}
 
-        return self._do_api()
+        return self.request(params=params)
 
     def list_itype(self, isAll=False):
-        self._csite_ = Session2._getClusterName("goc")
-        self._func_ = "solutions"
-        self.ext_get = {
-            "category": "os",
-            "project": self._project_id,
-        }
-        result = self._do_api()
-        self._func_ = "sites"
-        self._csite_ = Session2._getClusterName("VCS")
-        return result
+        return self.request(
+            "solutions",
+            params={"category": "os", "project": self._project_id},
+            site=Session2._getClusterName("goc"),
+        )
+
+    def _action(self, site_id, status):
+        return self.request(
+            verb="put",
+            url_dict={"sites": site_id, "action": ""},
+            data={"status": status},
+        )
 
     def stop(self, site_id):
-        self.data_dic = {"status": "shelve"}
-        self.url_dic = {"sites": site_id, "action": ""}
-        self.http_verb = "put"
-        return self._do_api()
+        return self._action(site_id, "shelve")
 
     def start(self, site_id):
-        self.data_dic = {"status": "unshelve"}
-        self.url_dic = {"sites": site_id, "action": ""}
-        self.http_verb = "put"
-        return self._do_api()
+        return self._action(site_id, "unshelve")
 
     def reboot(self, site_id):
-        self.data_dic = {"status": "reboot"}
-        self.url_dic = {"sites": site_id, "action": ""}
-        self.http_verb = "put"
-        return self._do_api()
+        return self._action(site_id, "reboot")
 
     @staticmethod
     def getSolList(mtype="list", name_only=False, reverse=False):
@@ -582,27 +564,28 @@ class VcsSite(CpuService):
         #     return dict([(fid_desc[x]['desc'], fid_desc[x])for x in fid_desc])
 
     def create(self, name, sol_id, extra_prop):
-        self.twcc.header_extra = extra_prop
-        self.http_verb = "post"
-        self.data_dic = {
-            "name": name,
-            "desc": "TWCC-Cli created VCS",
-            "project": self._project_id,
-            "solution": sol_id,
-        }
-        return self._do_api()
+        return self.request(
+            verb="post",
+            headers=extra_prop,
+            data={
+                "name": name,
+                "desc": "TWCC-Cli created VCS",
+                "project": self._project_id,
+                "solution": sol_id,
+            },
+        )
 
     def patch_desc(self, site_id, desc):
-        self.http_verb = "patch"
-        self.url_dic = {"sites": site_id}
-        self.data_dic = {"desc": desc}
-        return self._do_api()
+        return self.request(
+            verb="patch", url_dict={"sites": site_id}, data={"desc": desc}
+        )
 
     def patch_keep(self, site_id, keep):
-        self.http_verb = "patch"
-        self.url_dic = {"sites": site_id}
-        self.data_dic = {"termination_protection": keep}
-        return self._do_api()
+        return self.request(
+            verb="patch",
+            url_dict={"sites": site_id},
+            data={"termination_protection": keep},
+        )
 
     def isStable(self, site_id):
         site_info = self.queryById(site_id)
@@ -627,19 +610,20 @@ class VcsServerNet(CpuService):
         self.action(site_id, is_bind=False)
 
     def reboot(self, server_id):
-        self.http_verb = "put"
-        self.url_dic = {self._func_: server_id, "action": ""}
-        self.data_dic = {"action": "reboot"}
-        self._do_api()
+        self.request(
+            verb="put",
+            url_dict={self._func_: server_id, "action": ""},
+            data={"action": "reboot"},
+        )
 
     def action(self, site_id, is_bind=True, eip_id=None):
         server_id = getServerId(site_id)
-        self.http_verb = "put"
-        self.url_dic = {self._func_: server_id, "action": ""}
-        self.data_dic = {"action": "associateIP" if is_bind else "disassociateIP"}
+        data_dic = {"action": "associateIP" if is_bind else "disassociateIP"}
         if not isNone(eip_id):
-            self.data_dic.update({"ip": int(eip_id)})
-        self._do_api()
+            data_dic.update({"ip": int(eip_id)})
+        self.request(
+            verb="put", url_dict={self._func_: server_id, "action": ""}, data=data_dic
+        )
 
 
 class VcsSecurityGroup(CpuService):
@@ -652,14 +636,12 @@ class VcsSecurityGroup(CpuService):
 
     def list(self, server_id=None):
         if not isNone(server_id):
-            self.ext_get = {"project": self._project_id, "server": server_id}
-            return self._do_api()
+            return self.request(
+                params={"project": self._project_id, "server": server_id}
+            )
 
     def addSecurityGroup(self, secg_id, port_min, port_max, cidr, protocol, direction):
-
-        self.http_verb = "patch"
-        self.url_dic = {"security_groups": secg_id}
-        self.data_dic = {
+        data_dic = {
             "project": self._project_id,
             "direction": direction,
             "protocol": protocol,
@@ -668,16 +650,17 @@ class VcsSecurityGroup(CpuService):
             "port_range_min": port_min,
         }
         if port_min == "" and port_max == "":
-            del self.data_dic["port_range_max"]
-            del self.data_dic["port_range_min"]
-        self._do_api()
+            del data_dic["port_range_max"]
+            del data_dic["port_range_min"]
+        self.request(verb="patch", url_dict={"security_groups": secg_id}, data=data_dic)
 
     def deleteRule(self, rule_id):
-        self.http_verb = "delete"
-        self.ext_get = {"project": self._project_id}
-        self._func_ = "security_group_rules"
-        self.url_dic = {self._func_: rule_id}
-        return self._do_api()
+        return self.request(
+            "security_group_rules",
+            verb="delete",
+            url_dict={"security_group_rules": rule_id},
+            params={"project": self._project_id},
+        )
 
 
 class SecurityGroups(CpuService):
@@ -688,13 +671,10 @@ class SecurityGroups(CpuService):
         self._csite_ = Session2._getClusterName("VCS")
 
     def create(self, name, desc=""):
-        self.http_verb = "post"
-        self.data_dic = {
-            "project": self._project_id,
-            "name": name,
-            "desc": desc,
-        }
-        return self._do_api()
+        return self.request(
+            verb="post",
+            data={"project": self._project_id, "name": name, "desc": desc},
+        )
 
     def _ls_diff_type(self, secg_type, ids, isall, my_username):
         all_secgs = []
@@ -704,11 +684,15 @@ class SecurityGroups(CpuService):
             if secg_type == "server":
                 id = getServerId(id)
             if secg_type == "site":
-                GpuService.__init__(self)
-                self._func_ = "security_groups"
-                self._csite_ = Session2._getClusterName("CNTR")
-            self.ext_get = {secg_type: id, "project": self._project_id}
-            all_secgs_one_id = self._do_api()
+                all_secgs_one_id = self.request(
+                    "security_groups",
+                    params={secg_type: id, "project": self.project_ids["CNTR"]},
+                    site=Session2._getClusterName("CNTR"),
+                )
+            else:
+                all_secgs_one_id = self.request(
+                    params={secg_type: id, "project": self._project_id}
+                )
             if secg_type == "site":
                 all_secgs_one_id[0]["type"] = "CCS"
                 all_secgs.extend(all_secgs_one_id)
@@ -735,12 +719,10 @@ class SecurityGroups(CpuService):
 
     def list(self, ids=None, secg_type=None, isall=False):
         all_secgs = []
-        my_username = Session2().twcc_username
+        my_username = self.twcc_session.twcc_username
         if secg_type == "detail" or (secg_type == None and not ids == ()):
             for id in ids:
-                self.res_type = "json"
-                self.url_dic = {"security-groups": id}
-                res = self._do_api()
+                res = self.request(url_dict={"security-groups": id})
                 short_detail_rules = self._short_detail_rules_process(res)
                 res["security group_rules"] = short_detail_rules
                 all_secgs.append(res)
@@ -749,7 +731,6 @@ class SecurityGroups(CpuService):
             filter_type = ""
             return self.get_all_secg("project", filter_type, isall, my_username)
         else:
-            self.http_verb = "get"
             all_secgs = self._ls_diff_type(secg_type, ids, isall, my_username)
             for secg in all_secgs:
                 short_detail_rules = self._short_detail_rules_process(secg)
@@ -757,47 +738,44 @@ class SecurityGroups(CpuService):
             return all_secgs
 
     def deleteById(self, secg_id):
-        self.http_verb = "delete"
-        self.url_dic = {"security-groups": secg_id}
-        return self._do_api()
+        return self.request(verb="delete", url_dict={"security-groups": secg_id})
 
     def patch_desc(self, secg_id, desc):
-        self.http_verb = "patch"
-        self.url_dic = {"security-groups": secg_id}
-        self.data_dic = {"desc": desc}
-        return self._do_api()
+        return self.request(
+            verb="patch", url_dict={"security-groups": secg_id}, data={"desc": desc}
+        )
 
     def addRule(self, secg_id, port_min, port_max, cidr, protocol, direction):
-
-        self.http_verb = "post"
-        self._func_ = "security-group-rules"
-        self.data_dic = {
-            "sg": secg_id,
-            "direction": direction,
-            "protocol": protocol,
-            "remote_ip_prefix": cidr,
-            "port_range_max": port_max,
-            "port_range_min": port_min,
-        }
-        self._do_api()
+        self.request(
+            "security-group-rules",
+            verb="post",
+            data={
+                "sg": secg_id,
+                "direction": direction,
+                "protocol": protocol,
+                "remote_ip_prefix": cidr,
+                "port_range_max": port_max,
+                "port_range_min": port_min,
+            },
+        )
 
     def deleteRule(self, rule_id):
-        self.http_verb = "delete"
-        self._func_ = "security-group-rules"
-        self.ext_get = {"project": self._project_id}
-        self.url_dic = {self._func_: rule_id}
-        return self._do_api()
+        return self.request(
+            "security-group-rules",
+            verb="delete",
+            url_dict={"security-group-rules": rule_id},
+            params={"project": self._project_id},
+        )
 
     def get_all_secg(self, secg_type, filter_type, isall, my_username):
         if filter_type == "site":
-            GpuService.__init__(self)
-            self._func_ = "security_groups"
-            self._csite_ = Session2._getClusterName("CNTR")
-            self.ext_get = {secg_type: id, "project": self._project_id}
+            all_secgs = self.request(
+                "security_groups",
+                params={"project": self.project_ids["CNTR"]},
+                site=Session2._getClusterName("CNTR"),
+            )
         else:
-            self.res_type = "json"
-            self.ext_get = {secg_type: self._project_id}
-        all_secgs = self._do_api()
+            all_secgs = self.request(params={secg_type: self._project_id})
         filter_type_dict = {"loadbalancer": "LB", "server": "VM", "site": "CCS"}
         if not filter_type == "":
             all_secgs = [
@@ -818,6 +796,9 @@ class VcsFalvor(CpuService):
         self._func_ = "flavors"
         self._csite_ = Session2._getClusterName("VCS")
 
+    def list(self):
+        return self.cached_request()
+
 
 class VcsSolutions(CpuService):
 
@@ -827,13 +808,10 @@ class VcsSolutions(CpuService):
         self._csite_ = "goc"
 
     def list(self, return_in_dic=False):
-        self.http_verb = "get"
-        self.url_dic = {"solutions": ""}
-        self.ext_get = {
-            "category": "os",
-            "project": self._project_id,
-        }
-        ans = self._do_api()
+        ans = self.cached_request(
+            url_dict={"solutions": ""},
+            params={"category": "os", "project": self._project_id},
+        )
         if return_in_dic:
             return dict([(x["name"], x["id"]) for x in ans])
         return ans
@@ -880,16 +858,11 @@ class VcsSolutions(CpuService):
         if len(found_sol_id) > 0:
             found_sol_id = found_sol_id[0]["id"]
 
-            self._csite_ = Session2._getClusterName("VCS")
-            self._func_ = "projects"
-            self.url_dic = {
-                "projects": self._project_id,
-                "solutions": found_sol_id,
-            }
-            ans = self._do_api()
-            # reset
-            self._func_ = "solutions"
-            self._csite_ = "goc"
+            ans = self.request(
+                "projects",
+                url_dict={"projects": self._project_id, "solutions": found_sol_id},
+                site=Session2._getClusterName("VCS"),
+            )
             return ans["site_extra_prop"][field_name]
 
 
@@ -901,32 +874,28 @@ class VcsImage(CpuService):
         self._csite_ = "goc"
 
     def deleteById(self, image_id):
-        self.http_verb = "delete"
-        self.res_type = "txt"
-        self.url_dic = {"images": image_id}
-        return self._do_api()
+        return self.request(
+            verb="delete", url_dict={"images": image_id}, res_type="txt"
+        )
 
     def list(self, srv_id=None, isAll=False, image_id=None):
         if not isNone(srv_id):
             images = []
-            self.ext_get = {"project": self._project_id}
-            all_images = self._do_api()
+            all_images = self.request(params={"project": self._project_id})
             for one_image in all_images:
                 if not isNone(one_image["server"]):
                     if one_image["server"]["id"] == srv_id:
                         images.append(one_image)
             return images
         elif not isNone(image_id):
-            self.url_dic = {"images": image_id}
-            return self._do_api()
+            return self.request(url_dict={"images": image_id})
         else:
-            self.ext_get = {"project": self._project_id, "sol_categ": "os"}
-            ans = self._do_api()
+            ans = self.request(params={"project": self._project_id, "sol_categ": "os"})
             all_sys_snap = [x for x in ans if not x["is_public"]]
             if isAll:
                 return all_sys_snap
             else:
-                my_username = sess = Session2().twcc_username
+                my_username = self.twcc_session.twcc_username
                 return [x for x in all_sys_snap if x["user"]["username"] == my_username]
 
     def createSnapshot(self, sid, name, desc_str):
@@ -938,15 +907,17 @@ class VcsImage(CpuService):
         if len(server_detail) > 0:
             tsrv = server_detail[0]
 
-            self.http_verb = "put"
-            self.url_dic = {self._func_: "{}/save/".format(tsrv["id"])}
-            self.data_dic = {
-                "name": name,
-                "desc": desc_str,
-                "os": tsrv["os"],
-                "os_version": tsrv["os_version"],
-            }
-        return self._do_api()
+            return self.request(
+                verb="put",
+                url_dict={self._func_: "{}/save/".format(tsrv["id"])},
+                data={
+                    "name": name,
+                    "desc": desc_str,
+                    "os": tsrv["os"],
+                    "os_version": tsrv["os_version"],
+                },
+            )
+        return self.request()
 
     def isStable(self, site_id):
         srv_id = getServerId(site_id)
@@ -957,18 +928,16 @@ class VcsImage(CpuService):
         return True
 
     def patch(self, image_id, desc=None):
-        self.http_verb = "patch"
-        self.url_dic = {"images": image_id}
-        self.data_dic = {}
+        data_dic = {}
         if not isNone(desc):
-            self.data_dic.update({"desc": desc})
+            data_dic.update({"desc": desc})
         # if not isNone(is_public):
-        #     self.data_dic.update({"is_public": is_public})
+        #     data_dic.update({"is_public": is_public})
         # if not isNone(license_type):
-        #     self.data_dic.update({"license_type": license_type})
-        if self.data_dic == {}:
+        #     data_dic.update({"license_type": license_type})
+        if data_dic == {}:
             raise ValueError
-        return self._do_api()
+        return self.request(verb="patch", url_dict={"images": image_id}, data=data_dic)
 
 
 class VcsServer(CpuService):
@@ -979,19 +948,20 @@ class VcsServer(CpuService):
         self._csite_ = Session2._getClusterName("VCS")
 
     def getServerDetail(self, site_id):
-        self.ext_get = {"project": self._project_id, "site": site_id}
-        return self._do_api()
+        return self.request(params={"project": self._project_id, "site": site_id})
 
     def getInfoByServerId(self, server_id):
-        self.url_dic = {"servers": server_id}
-        self.ext_get = {"project": self._project_id, "server": server_id}
-        return self._do_api()
+        return self.request(
+            url_dict={"servers": server_id},
+            params={"project": self._project_id, "server": server_id},
+        )
 
     def putSecg(self, action, sg, iid):
-        self.http_verb = "put"
-        self.url_dic = {"servers": iid, "action": ""}
-        self.data_dic = {"action": action, "sg": sg}
-        return self._do_api()
+        return self.request(
+            verb="put",
+            url_dict={"servers": iid, "action": ""},
+            data={"action": action, "sg": sg},
+        )
 
 
 class Fixedip(CpuService):
@@ -1002,43 +972,35 @@ class Fixedip(CpuService):
         self._csite_ = Session2._getClusterName("VCS")
 
     def create(self, desc=None):
-        self.http_verb = "post"
-        self.data_dic = {"project": self._project_id, "desc": desc}
-        return self._do_api()
+        return self.request(
+            verb="post", data={"project": self._project_id, "desc": desc}
+        )
 
     def list(self, ip_id=None, filter=None, isAll=False):
         if isNone(ip_id):
-            self.ext_get = {"project": self._project_id}
+            params = {"project": self._project_id}
             if not isNone(filter) and not filter == "ALL":
-                self.ext_get.update({"type": filter.upper()})
-            all_fixedips = self._do_api()
-            my_username = Session2().twcc_username
+                params.update({"type": filter.upper()})
+            all_fixedips = self.request(params=params)
+            my_username = self.twcc_session.twcc_username
             if isAll:
                 return all_fixedips
             else:
                 return [x for x in all_fixedips if x["user"]["username"] == my_username]
 
         else:
-            self.http_verb = "get"
-            self.res_type = "json"
-            self.url_dic = {"ips": ip_id}
-            return self._do_api()
+            return self.request(url_dict={"ips": ip_id})
 
     def patch_desc(self, ip_id, desc):
-        self.http_verb = "patch"
-        self.url_dic = {"ips": ip_id}
-        self.data_dic = {"desc": desc}
-        return self._do_api()
+        return self.request(verb="patch", url_dict={"ips": ip_id}, data={"desc": desc})
 
     def deleteById(self, ip_id):
-        self.http_verb = "delete"
-        self.url_dic = {"ips": ip_id}
-        return self._do_api()
+        return self.request(verb="delete", url_dict={"ips": ip_id})
 
     def get_id_by_ip(self, eip):
-        self.ext_get = {"project": self._project_id}
-        self.ext_get.update({"type": "STATIC"})
-        all_fixedips = self._do_api()
+        all_fixedips = self.request(
+            params={"project": self._project_id, "type": "STATIC"}
+        )
         for ips in all_fixedips:
             if ips["address"] == eip and ips["status"] == "AVAILABLE":
                 return ips["id"]
@@ -1084,8 +1046,7 @@ class LoadBalancers(CpuService):
     def create(
         self, vlb_name, pools, vnet_id, listeners, vlb_desc, json_data=None, eip_id=None
     ):
-        self.http_verb = "post"
-        self.data_dic = {
+        data_dic = {
             "name": vlb_name,
             "private_net": vnet_id,
             "pools": pools,
@@ -1093,14 +1054,12 @@ class LoadBalancers(CpuService):
             "desc": vlb_desc,
         }
         if not isNone(eip_id):
-            self.data_dic.update({"ip": eip_id})
+            data_dic.update({"ip": eip_id})
         if not isNone(json_data):
-            self.data_dic = json_data
-        return self._do_api()
+            data_dic = json_data
+        return self.request(verb="post", data=data_dic)
 
     def update(self, vlb_id, listeners, pools, eip_id=None):
-        self.http_verb = "patch"
-        self.url_dic = {"loadbalancers": vlb_id}
         for pool in pools:
             for col in ["expected_codes", "http_method", "url_path"]:
                 if isNone(pool[col]):
@@ -1109,10 +1068,12 @@ class LoadBalancers(CpuService):
             for col in ["default_tls_container_ref", "sni_container_refs"]:
                 if isNone(listener[col]) or listener[col] == []:
                     del listener[col]
-        self.data_dic = {"pools": pools, "listeners": listeners}
+        data_dic = {"pools": pools, "listeners": listeners}
         if not isNone(eip_id):
-            self.data_dic.update({"ip": eip_id})
-        return self._do_api()
+            data_dic.update({"ip": eip_id})
+        return self.request(
+            verb="patch", url_dict={"loadbalancers": vlb_id}, data=data_dic
+        )
 
     def isStable(self, site_id):
         site_info = self.queryById(site_id)
@@ -1121,24 +1082,19 @@ class LoadBalancers(CpuService):
     def list(self, vlb_id=None, isAll=False):
         if isNone(vlb_id):
             if isAll:
-                self.ext_get = {"project": self._project_id, "all_users": 1}
-                return self._do_api()
+                return self.request(
+                    params={"project": self._project_id, "all_users": 1}
+                )
             else:
-                self.ext_get = {"project": self._project_id}
-                all_vlbs = self._do_api()
-                my_username = Session2().twcc_username
+                all_vlbs = self.request(params={"project": self._project_id})
+                my_username = self.twcc_session.twcc_username
                 return [x for x in all_vlbs if x["user"]["username"] == my_username]
 
         else:
-            self.http_verb = "get"
-            self.res_type = "json"
-            self.url_dic = {"loadbalancers": vlb_id}
-            return self._do_api()
+            return self.request(url_dict={"loadbalancers": vlb_id})
 
     def deleteById(self, vlb_id):
-        self.http_verb = "delete"
-        self.url_dic = {"loadbalancers": vlb_id}
-        return self._do_api()
+        return self.request(verb="delete", url_dict={"loadbalancers": vlb_id})
 
 
 class Secrets(CpuService):
@@ -1149,40 +1105,29 @@ class Secrets(CpuService):
         self._csite_ = Session2._getClusterName("VCS")
 
     def create(self, name, desc="", payload="", expire_time=""):
-        self.http_verb = "post"
-        self.data_dic = {
+        data_dic = {
             "project": self._project_id,
             "name": name,
             "desc": desc,
             "payload": payload,
         }
         if not isNone(expire_time):
-            self.data_dic.update({"expire_time": expire_time})
-        return self._do_api()
+            data_dic.update({"expire_time": expire_time})
+        return self.request(verb="post", data=data_dic)
 
     def deleteById(self, sys_vol_id):
-        self.http_verb = "delete"
-        self.url_dic = {"secrets": sys_vol_id}
-        return self._do_api()
+        return self.request(verb="delete", url_dict={"secrets": sys_vol_id})
 
     def list(self, ssl_id=None, isall=False):
         if isNone(ssl_id):
-            self.http_verb = "get"
-            self.res_type = "json"
+            all_volumes = self.request(params={"project": self._project_id})
             if isall:
-                self.ext_get = {"project": self._project_id}
-                all_volumes = self._do_api()
                 return all_volumes
             else:
-                self.ext_get = {"project": self._project_id}
-                all_volumes = self._do_api()
-                my_username = Session2().twcc_username
+                my_username = self.twcc_session.twcc_username
                 return [x for x in all_volumes if x["user"]["username"] == my_username]
         else:
-            self.http_verb = "get"
-            self.res_type = "json"
-            self.url_dic = {"secrets": ssl_id}
-            return self._do_api()
+            return self.request(url_dict={"secrets": ssl_id})
 
 
 class Secrets(CpuService):
@@ -1193,40 +1138,29 @@ class Secrets(CpuService):
         self._csite_ = Session2._getClusterName("VCS")
 
     def create(self, name, desc="", payload="", expire_time=""):
-        self.http_verb = "post"
-        self.data_dic = {
+        data_dic = {
             "project": self._project_id,
             "name": name,
             "desc": desc,
             "payload": payload,
         }
         if not isNone(expire_time):
-            self.data_dic.update({"expire_time": expire_time})
-        return self._do_api()
+            data_dic.update({"expire_time": expire_time})
+        return self.request(verb="post", data=data_dic)
 
     def deleteById(self, sys_vol_id):
-        self.http_verb = "delete"
-        self.url_dic = {"secrets": sys_vol_id}
-        return self._do_api()
+        return self.request(verb="delete", url_dict={"secrets": sys_vol_id})
 
     def list(self, ssl_id=None, isall=False):
         if isNone(ssl_id):
-            self.http_verb = "get"
-            self.res_type = "json"
+            all_volumes = self.request(params={"project": self._project_id})
             if isall:
-                self.ext_get = {"project": self._project_id}
-                all_volumes = self._do_api()
                 return all_volumes
             else:
-                self.ext_get = {"project": self._project_id}
-                all_volumes = self._do_api()
-                my_username = Session2().twcc_username
+                my_username = self.twcc_session.twcc_username
                 return [x for x in all_volumes if x["user"]["username"] == my_username]
         else:
-            self.http_verb = "get"
-            self.res_type = "json"
-            self.url_dic = {"secrets": ssl_id}
-            return self._do_api()
+            return self.request(url_dict={"secrets": ssl_id})
 
 
 class Secrets(CpuService):
@@ -1237,40 +1171,29 @@ class Secrets(CpuService):
         self._csite_ = Session2._getClusterName("VCS")
 
     def create(self, name, desc="", payload="", expire_time=""):
-        self.http_verb = "post"
-        self.data_dic = {
+        data_dic = {
             "project": self._project_id,
             "name": name,
             "desc": desc,
             "payload": payload,
         }
         if not isNone(expire_time):
-            self.data_dic.update({"expire_time": expire_time})
-        return self._do_api()
+            data_dic.update({"expire_time": expire_time})
+        return self.request(verb="post", data=data_dic)
 
     def deleteById(self, sys_vol_id):
-        self.http_verb = "delete"
-        self.url_dic = {"secrets": sys_vol_id}
-        return self._do_api()
+        return self.request(verb="delete", url_dict={"secrets": sys_vol_id})
 
     def list(self, ssl_id=None, isall=False):
         if isNone(ssl_id):
-            self.http_verb = "get"
-            self.res_type = "json"
+            all_volumes = self.request(params={"project": self._project_id})
             if isall:
-                self.ext_get = {"project": self._project_id}
-                all_volumes = self._do_api()
                 return all_volumes
             else:
-                self.ext_get = {"project": self._project_id}
-                all_volumes = self._do_api()
-                my_username = Session2().twcc_username
+                my_username = self.twcc_session.twcc_username
                 return [x for x in all_volumes if x["user"]["username"] == my_username]
         else:
-            self.http_verb = "get"
-            self.res_type = "json"
-            self.url_dic = {"secrets": ssl_id}
-            return self._do_api()
+            return self.request(url_dict={"secrets": ssl_id})
 
 
 class Volumes(CpuService):
@@ -1281,15 +1204,16 @@ class Volumes(CpuService):
         self._csite_ = Session2._getClusterName("VCS")
 
     def create(self, name, size, desc="", volume_type="hdd"):
-        self.http_verb = "post"
-        self.data_dic = {
-            "project": self._project_id,
-            "name": name,
-            "size": size,
-            "desc": desc,
-            "volume_type": volume_type,
-        }
-        return self._do_api()
+        return self.request(
+            verb="post",
+            data={
+                "project": self._project_id,
+                "name": name,
+                "size": size,
+                "desc": desc,
+                "volume_type": volume_type,
+            },
+        )
 
     def snapshot(self, name, volume, desc=""):
         """_summary_
@@ -1302,50 +1226,35 @@ class Volumes(CpuService):
         Returns:
             _type_: _description_
         """
-        self.http_verb = "post"
-        self._func_ = "snapshots"
-        self.data_dic = {"desc": desc, "name": name, "volume": volume}
-        return self._do_api()
+        return self.request(
+            "snapshots",
+            verb="post",
+            data={"desc": desc, "name": name, "volume": volume},
+        )
 
     def deleteById(self, sys_vol_id, snapshot):
-        self.http_verb = "delete"
-        self.url_dic = {"volumes": sys_vol_id}
-        if snapshot:
-            self._func_ = "snapshots"
-            self.url_dic = {"snapshots": sys_vol_id}
-        return self._do_api()
+        func = "snapshots" if snapshot else "volumes"
+        return self.request(func, verb="delete", url_dict={func: sys_vol_id})
 
     def update(self, sys_vol_id, vol_status, srvid, size, wait):
-        self.http_verb = "put"
-        self.url_dic = {"volumes": sys_vol_id, "action": ""}
         if vol_status in ["attach", "detach"]:
-            self.data_dic = {"status": vol_status, "server": srvid}
+            data_dic = {"status": vol_status, "server": srvid}
         elif vol_status == "extend":
-            self.data_dic = {"status": vol_status, "server": 0, "size": size}
+            data_dic = {"status": vol_status, "server": 0, "size": size}
         else:
             raise ValueError("please provide -sts")
-        return self._do_api()
+        return self.request(
+            verb="put", url_dict={"volumes": sys_vol_id, "action": ""}, data=data_dic
+        )
 
     def list(self, vol_id=None, isAll=False, snapshot=None):
-        if snapshot:
-            self._func_ = "snapshots"
+        func = "snapshots" if snapshot else "volumes"
         if isNone(vol_id):
-            self.http_verb = "get"
-            self.res_type = "json"
+            all_volumes = self.request(func, params={"project": self._project_id})
             if isAll:
-                self.ext_get = {"project": self._project_id}
-                all_volumes = self._do_api()
                 return all_volumes
             else:
-                self.ext_get = {"project": self._project_id}
-                all_volumes = self._do_api()
-                my_username = Session2().twcc_username
+                my_username = self.twcc_session.twcc_username
                 return [x for x in all_volumes if x["user"]["username"] == my_username]
         else:
-            print(self._func_)
-            self.http_verb = "get"
-            self.res_type = "json"
-            self.url_dic = {"volumes": vol_id}
-            if snapshot:
-                self.url_dic = {"snapshots": vol_id}
-            return self._do_api()
+            return self.request(func, url_dict={func: vol_id})
@@ -2,7 +2,7 @@ import re
 import click
 import time
 import json
-from twccli.twcc import GupSiteBlockSet
+from twccli.twcc import GupSiteBlockSet, profiler, tracing
 from twccli.twcc.services.compute import GpuSite as Sites
 from twccli.twcc.services.compute import (
     VcsSite,
@@ -17,12 +17,15 @@ from twccli.twcc.services.compute import (
     SecurityGroups,
 )
 from twccli.twcc.services.network import Networks
+from twccli.twcc.services.bulk import BulkCreate, BulkDelete, BulkSkip
+from twccli.twcc.cache import refreshed_cache, shared_single_flight
 from twccli.twcc.util import (
     jpp,
     table_layout,
     isNone,
     name_validator,
     protection_desc,
+    stream_layout,
     _debug,
 )
 
@@ -53,7 +56,37 @@ def getConfirm(res_name, entity_name, is_force, ext_txt=""):
         return click.confirm(text=str_text)  # title=str_title,
 
 
-def list_vcs(ids_or_names, is_table, column="", is_all=False, is_print=True):
+def iter_vcs_by_ids(vcs, ids_or_names):
+    for site_id in ids_or_names:
+        site_info = vcs.queryById(site_id)
+        srvid = getServerId(site_id)
+        if not isNone(srvid):
+            srv = VcsServer().queryById(srvid)
+            if len(srv) > 0 and (
+                "private_nets" in srv and len(srv["private_nets"]) > 0
+            ):
+                srv_net = srv["private_nets"][0]
+                site_info["private_network"] = srv_net["name"]
+                site_info["private_ip"] = srv_net["ip"]
+            else:
+                site_info["private_network"] = ""
+                site_info["private_ip"] = ""
+        yield site_info
+
+
+def stream_vcs(ans, cols, out_fmt):
+    def fmt_row(each_vcs):
+        vcs_status_mapping([each_vcs])
+        if "termination_protection" in each_vcs:
+            each_vcs["Protected"] = protection_desc(each_vcs)
+        return each_vcs
+
+    stream_layout((fmt_row(x) for x in ans), cols, out_fmt)
+
+
+def list_vcs(
+    ids_or_names, is_table, column="", is_all=False, is_print=True, out_fmt=None
+):
     vcs = VcsSite()
     ans = []
 
@@ -89,21 +122,7 @@ def list_vcs(ids_or_names, is_table, column="", is_all=False, is_print=True):
             if not "name" in cols:
                 cols.append("name")
 
-        for i, site_id in enumerate(ids_or_names):
-            site_id = ids_or_names[i]
-            ans.extend([vcs.queryById(site_id)])
-            srvid = getServerId(site_id)
-            if not isNone(srvid):
-                srv = VcsServer().queryById(srvid)
-                if len(srv) > 0 and (
-                    "private_nets" in srv and len(srv["private_nets"]) > 0
-                ):
-                    srv_net = srv["private_nets"][0]
-                    ans[i]["private_network"] = srv_net["name"]
-                    ans[i]["private_ip"] = srv_net["ip"]
-                else:
-                    ans[i]["private_network"] = ""
-                    ans[i]["private_ip"] = ""
+        ans = iter_vcs_by_ids(vcs, ids_or_names)
     else:
         if column == "":
             cols = ["id", "name", "public_ip", "create_time", "status", "Protected"]
@@ -115,13 +134,11 @@ def list_vcs(ids_or_names, is_table, column="", is_all=False, is_print=True):
                 cols.append("name")
         ans = vcs.list(is_all)
 
-    for each_vcs in ans:
-        if each_vcs["status"] == "NotReady":
-            each_vcs["status"] = "Stopped"
-        if each_vcs["status"] == "Shelving":
-            each_vcs["status"] = "Stopping"
-        if each_vcs["status"] == "Unshelving":
-            each_vcs["status"] = "Starting"
+    if is_print and not isNone(out_fmt):
+        return stream_vcs(ans, cols, out_fmt)
+
+    ans = list(ans)
+    vcs_status_mapping(ans)
     ans = sorted(ans, key=lambda k: k["create_time"])
     if len(ans) > 0:
         if not is_print:
@@ -134,7 +151,7 @@ def list_vcs(ids_or_names, is_table, column="", is_all=False, is_print=True):
                 (
                     "VCS VMs"
                     if not len(ids_or_names) == 1
-                    else "VCS Info.: {}".format(site_id)
+                    else "VCS Info.: {}".format(ids_or_names[0])
                 ),
                 ans,
                 cols,
@@ -163,7 +180,7 @@ def list_vcs_img(sol_name, is_table):
         jpp(ans)
 
 
-def list_vcsi_img(ids_or_names, is_table, is_all):
+def list_vcsi_img(ids_or_names, is_table, is_all, out_fmt=None):
     """list user built bootable images"""
     table_col = [
         "id",
@@ -183,13 +200,15 @@ def list_vcsi_img(ids_or_names, is_table, is_all):
     else:
         ans = VcsImage().list(isAll=is_all)
 
-    if is_table:
+    if not isNone(out_fmt):
+        stream_layout(ans, table_col, out_fmt)
+    elif is_table:
         table_layout("Abvl. VCS images", ans, table_col, isPrint=True, is_warp=False)
     else:
         jpp(ans)
 
 
-def list_vcsi_img(ids_or_names, is_table, is_all):
+def list_vcsi_img(ids_or_names, is_table, is_all, out_fmt=None):
     """list user built bootable images"""
     table_col = [
         "id",
@@ -209,13 +228,15 @@ def list_vcsi_img(ids_or_names, is_table, is_all):
     else:
         ans = VcsImage().list(isAll=is_all)
 
-    if is_table:
+    if not isNone(out_fmt):
+        stream_layout(ans, table_col, out_fmt)
+    elif is_table:
         table_layout("Abvl. VCS images", ans, table_col, isPrint=True, is_warp=False)
     else:
         jpp(ans)
 
 
-def list_secg(ids_or_names, secg_type, is_table, is_all):
+def list_secg(ids_or_names, secg_type, is_table, is_all, out_fmt=None):
     secg_type_dict = {
         "proj": "project",
         "vlb": "loadbalancer",
@@ -229,7 +250,9 @@ def list_secg(ids_or_names, secg_type, is_table, is_all):
     )
     col = ["id", "name", "create_time", "type"]
 
-    if is_table:
+    if not isNone(out_fmt):
+        stream_layout(ans, col, out_fmt)
+    elif is_table:
         if not ids_or_names == ():
             col.append("security group_rules")
         table_layout("Abvl. SecurityGroups", ans, col, isPrint=True, is_warp=False)
@@ -339,8 +362,7 @@ def ch_secg(ids_or_names, desc=None, is_table=None, secg_id=None, action=None):
             jpp(ans)
 
 
-def create_vcs(
-    name,
+def prep_vcs(
     sol=None,
     img_name=None,
     network=None,
@@ -357,12 +379,22 @@ def create_vcs(
     sys_vol_size=None,
     secg=None,
 ):
+    """Resolves the solution, image, flavor and volumes of an instance, creates
+    the default security group when missing
 
+    Returns:
+        (vcs, sol_id, headers) for VcsSite.create
+    """
     vcs = VcsSite()
     vcs_sol = VcsSolutions()
     exists_sol = dict(
         [(k.lower(), v) for (k, v) in vcs_sol.list(return_in_dic=True).items()]
     )
+    if not isNone(sol) and not sol.lower() in exists_sol.keys():
+        with refreshed_cache():
+            exists_sol = dict(
+                [(k.lower(), v) for (k, v) in vcs_sol.list(return_in_dic=True).items()]
+            )
     if isNone(sol):
         raise ValueError(
             "Please provide solution name. ie:{}".format(", ".join(exists_sol.keys()))
@@ -371,16 +403,25 @@ def create_vcs(
         raise ValueError("Solution name: {} not found or not given.".format(sol))
 
     required = {}
-    # check for all param
-    if isNone(name):
-        raise ValueError("Missing parameter: `-n`.")
-
-    if not name_validator(name):
-        raise ValueError(
-            "Name '{0}' is not valid. ^[a-z][a-z-_0-9]{{5,15}}$ only.".format(name)
-        )
-
+    default_sg_name = "clisg_" + vcs._api_key_[:8]
     extra_props, candidate_secg = vcs.getExtraProp(exists_sol[sol.lower()])
+    # keypairs and security groups are in the cached solution too, a miss may
+    # only mean they were created after it was cached
+    if (
+        not default_sg_name in candidate_secg
+        or (
+            isNone(password)
+            and not isNone(keypair)
+            and not keypair in extra_props["x-extra-property-keypair"]
+        )
+        or not flavor in extra_props["x-extra-property-flavor"].keys()
+        or (
+            not isNone(img_name)
+            and not img_name in extra_props["x-extra-property-image"]
+        )
+    ):
+        with refreshed_cache():
+            extra_props, candidate_secg = vcs.getExtraProp(exists_sol[sol.lower()])
     # x-extra-property-image
     if isNone(img_name):
         # img_name = "Ubuntu 20.04"
@@ -391,7 +432,6 @@ def create_vcs(
     if isNone(network):
         network = "default_network"
     required["x-extra-property-private-network"] = network
-    default_sg_name = "clisg_" + vcs._api_key_[:8]
     # check secg default exist or not
     if not default_sg_name in candidate_secg:
         secgObj = SecurityGroups()
@@ -468,7 +508,40 @@ def create_vcs(
             )
         required["x-extra-property-volume-type"] = data_vol
 
-    return vcs.create(name, exists_sol[sol], required)
+    return vcs, exists_sol[sol], required
+
+
+def create_vcs(name, **kwargs):
+    """Create an instance, kwargs are the ones of prep_vcs"""
+    # check for all param
+    if isNone(name):
+        raise ValueError("Missing parameter: `-n`.")
+    check_site_name(name)
+    vcs, sol_id, required = prep_vcs(**kwargs)
+    return vcs.create(name, sol_id, required)
+
+
+def create_vcs_batch(names, wait=False, **kwargs):
+    """Create one instance per name, the catalogs are resolved once
+
+    Returns:
+        list of {"name", "id", "status", "message", "public_ip", "private_ip"}
+    """
+    if not isNone(kwargs.get("eip")):
+        raise ValueError("An EIP can be assigned to one instance only.")
+    for name in names:
+        check_site_name(name)
+    vcs, sol_id, required = prep_vcs(**kwargs)
+
+    def conn_info(site):
+        return dict([(k, site.get(k, "")) for k in ("public_ip", "private_ip")])
+
+    return BulkCreate(
+        "VCS",
+        lambda name: vcs.create(name, sol_id, required),
+        list_sites=vcs.list,
+        conn_info=conn_info,
+    ).run(names, wait=wait)
 
 
 def get_ch_json_by_vlbid(vlb_id, members=None):
@@ -816,84 +889,49 @@ def change_vcsi(ids_or_names, is_table, desc):
             jpp(ans)
 
 
-def check_proteced(site_info, vsite, ele):
-    if site_info["termination_protection"]:
-        click.echo(
-            click.style(
-                "Delete fail! VCS resources {} is protected.".format(ele),
-                bg="red",
-                fg="white",
-                blink=True,
-                bold=True,
-            )
-        )
-    else:
-        vsite.delete(ele)
-        print("VCS resources {} deleted.".format(ele))
-
-
-def check_proteced(site_info, vsite, ele):
-    if site_info["termination_protection"]:
-        click.echo(
-            click.style(
-                "Delete fail! VCS resources {} is protected.".format(ele),
-                bg="red",
-                fg="white",
-                blink=True,
-                bold=True,
-            )
-        )
-    else:
-        vsite.delete(ele)
-        print("VCS resources {} deleted.".format(ele))
-
-
-def check_proteced(site_info, vsite, ele):
-    if site_info["termination_protection"]:
-        click.echo(
-            click.style(
-                "Delete fail! VCS resources {} is protected.".format(ele),
-                bg="red",
-                fg="white",
-                blink=True,
-                bold=True,
-            )
-        )
-    else:
-        vsite.delete(ele)
-        print("VCS resources {} deleted.".format(ele))
-
-
-def del_vcs(ids_or_names, is_force=False):
-    """delete a vcs
+def del_vcs(ids_or_names, is_force=False, wait=False):
+    """delete vcs, protection checks and deletes run in parallel
 
     :param ids_or_names: name for deleting object.
     :type ids_or_names: string
     :param is_force: Force to delete any resources at your own cost.
     :type is_force: bool
+    :param wait: wait until every vcs is gone
+    :type wait: bool
     """
-    if getConfirm("VCS", ",".join(ids_or_names), is_force):
-        vsite = VcsSite()
-        if len(ids_or_names) > 0:
-            for ele in ids_or_names:
-                site_info = vsite.queryById(ele)
-                if site_info and "detail" in site_info:
-                    click.echo(
-                        click.style(
-                            site_info["detail"], bg="red", fg="white", bold=True
-                        )
-                    )
-                else:
-                    check_proteced(site_info, vsite, ele)
+    vsite = VcsSite()
+
+    def check(site_id):
+        site_info = vsite.queryById(site_id)
+        if site_info and "detail" in site_info:
+            raise BulkSkip(site_info["detail"])
+        if site_info["termination_protection"]:
+            raise BulkSkip("Delete fail! VCS resources {} is protected.".format(site_id))
+        return "- {}: {}".format(site_id, site_info["name"])
+
+    return BulkDelete(
+        "VCS",
+        vsite.delete,
+        check=check,
+        list_ids=lambda: [x["id"] for x in vsite.list(isAll=True)],
+    ).run(ids_or_names, is_force, wait=wait)
 
 
 def doSiteStopped(site_id):
     b = VcsSite()
-    wait_ready = False
-    while not wait_ready:
-        if b.isStopped(site_id):
-            wait_ready = True
-        time.sleep(5)
+    with tracing.span(
+        "doSiteStopped", {"twcc.site_id": site_id}
+    ) as sp, shared_single_flight().fresh():
+        start_time = time.time()
+        polls = 0
+        wait_ready = False
+        while not wait_ready:
+            polls += 1
+            if b.isStopped(site_id):
+                wait_ready = True
+            time.sleep(5)
+        sp.setAttribute("twcc.polls", polls)
+    profiler.recordWait("doSiteStopped", time.time() - start_time)
     return site_id
 
 
@@ -920,11 +958,19 @@ def doSiteStable(site_id, site_type="cntr"):
             "This site_type:{} has no site stable function.".format(site_type)
         )
 
-    wait_ready = False
-    while not wait_ready:
-        if b.isStable(site_id):
-            wait_ready = True
-        time.sleep(5)
+    with tracing.span(
+        "doSiteStable", {"twcc.site_id": site_id, "twcc.site_type": site_type}
+    ) as sp, shared_single_flight().fresh():
+        start_time = time.time()
+        polls = 0
+        wait_ready = False
+        while not wait_ready:
+            polls += 1
+            if b.isStable(site_id):
+                wait_ready = True
+            time.sleep(5)
+        sp.setAttribute("twcc.polls", polls)
+    profiler.recordWait("doSiteStable", time.time() - start_time)
     return site_id
 
 
@@ -935,7 +981,7 @@ def format_ccs_env_dict(env_dict):
         return ""
 
 
-def get_ccs_sol_id(sol_name):
+def get_ccs_sol_id(sol_name, is_refreshed=False):
     avbl_sols = Sites(debug=False).getSolList(reverse=True)
 
     cntrs = dict(
@@ -948,11 +994,14 @@ def get_ccs_sol_id(sol_name):
     )
     if len(cntrs) > 0:
         return cntrs[sol_name.lower()]
+    elif not is_refreshed:
+        with refreshed_cache():
+            return get_ccs_sol_id(sol_name, is_refreshed=True)
     else:
         raise ValueError("Solution name '{0}' is not valid.".format(sol_name))
 
 
-def get_ccs_img(sol_id, sol_name, sol_img, gpu=1):
+def get_ccs_img(sol_id, sol_name, sol_img, gpu=1, is_refreshed=False):
     ccs_site = Sites(debug=False)
     imgs = ccs_site.getAvblImg(sol_id, sol_name, latest_first=True)
     if isNone(sol_img) or len(sol_name) == 0:
@@ -960,6 +1009,9 @@ def get_ccs_img(sol_id, sol_name, sol_img, gpu=1):
     else:
         if sol_img in imgs:
             return sol_img
+        elif not is_refreshed:
+            with refreshed_cache():
+                return get_ccs_img(sol_id, sol_name, sol_img, gpu, is_refreshed=True)
         else:
             raise ValueError(
                 "Container image '{0}' for '{1}' is not valid.".format(
@@ -981,12 +1033,19 @@ def get_pass_api_key_params(is_apikey, env_dict):
         env_dict["_TWCC_CREDENTIAL_TRANSER_FROM_SITE_"] = socket.gethostname()
 
 
-def create_ccs(cntr_name, gpu, flavor, sol_name, sol_img, cmd, env_dict, is_apikey):
-    """Create container
-    Create container by default value
-    Create container by set vaule of name, solution name, gpu number, solution number
-    """
+def check_site_name(name):
+    if not name_validator(name):
+        raise ValueError(
+            "Name '{0}' is not valid. ^[a-z][a-z-_0-9]{{5,15}}$ only.".format(name)
+        )
+
+
+def prep_ccs(gpu, flavor, sol_name, sol_img, cmd, env_dict, is_apikey):
+    """Resolves the solution, image and headers of a container
 
+    Returns:
+        (sol_id, headers) for send_ccs
+    """
     get_pass_api_key_params(is_apikey, env_dict)
 
     def_header = Sites.getGpuDefaultHeader(flavor, sol_name, gpu)
@@ -995,13 +1054,13 @@ def create_ccs(cntr_name, gpu, flavor, sol_name, sol_img, cmd, env_dict, is_apik
     def_header["x-extra-property-env"] = format_ccs_env_dict(env_dict)
     if not cmd == None:
         def_header["x-extra-property-command"] = cmd
-    if not name_validator(cntr_name):
-        raise ValueError(
-            "Name '{0}' is not valid. ^[a-z][a-z-_0-9]{{5,15}}$ only.".format(cntr_name)
-        )
+    return sol_id, def_header
 
-    ccs_site = Sites(debug=False)
-    res = ccs_site.create(cntr_name, sol_id, def_header)
+
+def send_ccs(cntr_name, sol_id, def_header, ccs_site=None):
+    ccs_site = Sites(debug=False) if isNone(ccs_site) else ccs_site
+    # create() adds the mount paths to the headers
+    res = ccs_site.create(cntr_name, sol_id, dict(def_header))
 
     if "id" not in res.keys():
         if "message" in res:
@@ -1016,6 +1075,44 @@ def create_ccs(cntr_name, gpu, flavor, sol_name, sol_img, cmd, env_dict, is_apik
         return res
 
 
+def create_ccs(cntr_name, gpu, flavor, sol_name, sol_img, cmd, env_dict, is_apikey):
+    """Create container
+    Create container by default value
+    Create container by set vaule of name, solution name, gpu number, solution number
+    """
+    sol_id, def_header = prep_ccs(
+        gpu, flavor, sol_name, sol_img, cmd, env_dict, is_apikey
+    )
+    check_site_name(cntr_name)
+    return send_ccs(cntr_name, sol_id, def_header)
+
+
+def create_ccs_batch(
+    names, gpu, flavor, sol_name, sol_img, cmd, env_dict, is_apikey, wait=False
+):
+    """Create one container per name, the catalogs are resolved once
+
+    Returns:
+        list of {"name", "id", "status", "message", "ssh"}
+    """
+    for name in names:
+        check_site_name(name)
+    sol_id, def_header = prep_ccs(
+        gpu, flavor, sol_name, sol_img, cmd, env_dict, is_apikey
+    )
+    ccs_site = Sites(debug=False)
+
+    def conn_info(site):
+        return {"ssh": ccs_site.getConnInfo(site["id"], ssh_info=True)}
+
+    return BulkCreate(
+        "CCS",
+        lambda name: send_ccs(name, sol_id, def_header, ccs_site),
+        list_sites=ccs_site.list,
+        conn_info=conn_info,
+    ).run(names, wait=wait)
+
+
 def net_vcs_protocol_check(protocol):
     avbl_proto = [
         "ah",
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""The same listing in many projects at once, ie: `twccli ls vcs --all-projects`
+
+    rows, errors = fan_out(project_codes(None, True), lambda: VcsSite().list())
+
+`fetch()` runs in every project of the credential file in parallel, the
+services it makes in its thread use that project. The rows are merged in the
+order of the projects with a `project` column, a project which fails does not
+stop the others.
+
+At most TWCC_PROJECT_CONCURRENCY (8) projects are listed at once.
+"""
+
+from __future__ import print_function
+import click
+from concurrent.futures import ThreadPoolExecutor
+from twccli.twcc import tracing
+from twccli.twcc.cache import with_cache_mode
+from twccli.twcc.session import Session2, in_project
+from twccli.twcc.util import isNone, get_environment_params
+
+
+def project_options(func):
+    """--projects and --all-projects of a listing"""
+    func = click.option(
+        "-all-projs",
+        "--all-projects",
+        "is_all_projects",
+        is_flag=True,
+        default=False,
+        help="List in every project of the credential file.",
+    )(func)
+    func = click.option(
+        "-projs",
+        "--projects",
+        "proj_codes",
+        default=None,
+        type=str,
+        help="List in these projects, ie: GOV108009,ENT107001",
+    )(func)
+    return func
+
+
+def project_codes(proj_codes, is_all_projects):
+    """Project codes asked for, None for the default project only
+
+    Args:
+        proj_codes (str): comma separated, ie: "GOV108009,ENT107001"
+        is_all_projects (bool): every project of the credential file
+    """
+    if isNone(proj_codes) and not is_all_projects:
+        return None
+    known = Session2._getProjectCodes()
+    if is_all_projects:
+        return known
+    ans = []
+    for code in [x.strip() for x in proj_codes.split(",")]:
+        if len(code) == 0 or code in ans:
+            continue
+        if not code in known:
+            raise ValueError(
+                "Project {} is not in the credential file, known: {}".format(
+                    code, ", ".join(known)
+                )
+            )
+        ans.append(code)
+    if len(ans) == 0:
+        raise ValueError("No project in --projects.")
+    return ans
+
+
+def fan_out(proj_codes, fetch, concurrency=None):
+    """Rows of fetch() in every project
+
+    Args:
+        proj_codes (list): from project_codes()
+        fetch (function): fetch() returns a list of dicts for the project
+        concurrency (int): projects listed at once, TWCC_PROJECT_CONCURRENCY
+
+    Returns:
+        (rows with a "project" key, [(project code, error)])
+    """
+    concurrency = int(
+        get_environment_params("TWCC_PROJECT_CONCURRENCY", 8)
+        if isNone(concurrency)
+        else concurrency
+    )
+
+    @with_cache_mode
+    def call(proj_code):
+        with tracing.span("project %s" % proj_code, {"twcc.project": proj_code}):
+            try:
+                with in_project(proj_code):
+                    return (proj_code, fetch(), None)
+            except Exception as e:
+                return (proj_code, None, e)
+
+    if len(proj_codes) <= 1 or concurrency <= 1:
+        ans = [call(x) for x in proj_codes]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(proj_codes))) as pool:
+            ans = list(pool.map(call, proj_codes))
+
+    rows, errors = [], []
+    for proj_code, proj_rows, err in ans:
+        if not isNone(err):
+            errors.append((proj_code, err))
+            continue
+        for row in [] if isNone(proj_rows) else proj_rows:
+            row["project"] = proj_code
+            rows.append(row)
+    return rows, errors
+
+
+def echo_errors(errors, proj_codes):
+    """Warns about the failed projects, raises when all of them failed"""
+    for proj_code, err in errors:
+        click.echo(click.style("{}: {}".format(proj_code, err), fg="yellow"), err=True)
+    if len(errors) > 0 and len(errors) == len(proj_codes):
+        raise ValueError("Listing failed in every project.")
@@ -5,9 +5,18 @@ import re
 import sys
 import yaml
 import traceback
-from twccli.twcc.session import Session2
-from twccli.twcc.util import isNone, isDebug, timezone2local, send_ga
+from concurrent.futures import ThreadPoolExecutor
+from twccli.twcc.session import Session2, in_project
+from twccli.twcc.util import (
+    isNone,
+    isDebug,
+    timezone2local,
+    send_ga,
+    get_environment_params,
+)
 from twccli.twcc.clidriver import ServiceOperation
+from twccli.twcc.cache import MetaCache, with_cache_mode
+from twccli.twcc import profiler, tracing
 from twccli.twccli import logger
 
 # change to new-style-class https://goo.gl/AYgxqp
@@ -54,6 +63,11 @@ class GenericService(object):
         self.http_verb = "get"
         self.http_verb_valid = self.twcc.http_verb_valid
 
+        # a POST/PATCH which is safe to send twice, ex: with a unique name
+        self.idempotent = False
+        # None for TWCC_API_RETRIES, 0 to never retry
+        self.max_retries = None
+
     def _chkSite_(self):
         if isNone(self._csite_):
             raise ValueError("No site value.")
@@ -69,6 +83,7 @@ class GenericService(object):
     def _isAlive(self):
         return self.twcc.try_alive()
 
+    @profiler.timed("telemetry")
     def _send_ga(self, event_name, t_url=None):
         twcc_file_session = Session2._getSessionFile()
         sessConf = yaml.load(
@@ -111,30 +126,63 @@ class GenericService(object):
                 }
             send_ga(event_name, sessConf["_meta"]["ga_cid"], ga_params)
 
-    def _do_api(self):
+    def request(
+        self,
+        func=None,
+        verb="get",
+        url_dict=None,
+        params=None,
+        data=None,
+        headers=None,
+        res_type="json",
+        site=None,
+        idempotent=None,
+    ):
+        """Calls one API, nothing on the service is read or changed but the
+        defaults below, so an instance can be shared by many threads.
+
+        Args:
+            func (str): function in TWCC_API.yaml, default self._func_
+            verb (str): get, post, put, patch or delete
+            url_dict (dict): ie: {"sites": site_id, "action": ""}
+            params (dict): query string, ie: {"project": proj_id}
+            data (dict): json body
+            headers (dict): extra headers, ie: x-extra-property-*
+            res_type (str): json or txt
+            site (str): platform, default self._csite_
+            idempotent (bool): allow retrying POST/PATCH, default self.idempotent
+
+        Returns:
+            json object or bytes
+        """
+        func = self._func_ if isNone(func) else func
+        site = self._csite_ if isNone(site) else site
         if self._debug_:
-            logger_info = {
-                "csite": self._csite_,
-                "func": self._func_,
-                "res_type": self.res_type,
-            }
-            if not isNone(self.url_dic):
-                logger_info.update({"url_dic": self.url_dic})
-            if not isNone(self.data_dic):
-                logger_info.update({"data_dic": self.data_dic})
+            logger_info = {"csite": site, "func": func, "res_type": res_type}
+            if not isNone(url_dict):
+                logger_info.update({"url_dic": url_dict})
+            if not isNone(data):
+                logger_info.update({"data_dic": data})
             logger.info(logger_info)
 
-        res, t_url = self.twcc.doAPI(
-            site_sn=self._csite_,
-            api_key=self._api_key_,
-            user_agent=self._user_agent,
-            func=self._func_.lower(),
-            url_dict=self.url_dic if not isNone(self.url_dic) else None,
-            data_dict=self.data_dic if not isNone(self.data_dic) else None,
-            http=self.http_verb,
-            url_ext_get=self.ext_get,
-            res_type=self.res_type,
-        )
+        with tracing.span(
+            "%s %s" % (self.__class__.__name__, verb.upper()),
+            {"twcc.func": func.lower(), "twcc.site": site, "http.method": verb},
+        ):
+            res, t_url = self.twcc.doAPI(
+                site_sn=site,
+                api_key=self._api_key_,
+                user_agent=self._user_agent,
+                func=func.lower(),
+                url_dict=url_dict,
+                data_dict=data,
+                http=verb,
+                url_ext_get=params,
+                res_type=res_type,
+                idempotent=self.idempotent if isNone(idempotent) else idempotent,
+                max_retries=self.max_retries,
+                headers=headers,
+            )
 
         if self._debug_:
             logger.info({"res": res})
@@ -155,20 +203,44 @@ class GenericService(object):
                 raise ValueError("API Key is not validated.")
         return res
 
+    def cached_request(self, func=None, url_dict=None, params=None, site=None):
+        """GET through MetaCache, for catalogs which rarely change"""
+        func = self._func_ if isNone(func) else func
+        site = self._csite_ if isNone(site) else site
+        key = MetaCache.mkKey(
+            self.twcc.host_url,
+            self._api_key_,
+            getattr(self, "_project_id", None),
+            site,
+            func.lower(),
+            url_dict,
+            params,
+            "json",
+        )
+        return MetaCache().fetch(
+            key,
+            lambda: self.request(func, url_dict=url_dict, params=params, site=site),
+        )
+
+    def _do_api(self):
+        """request() with the arguments kept on the service, for old callers"""
+        return self.request(
+            self._func_,
+            self.http_verb,
+            url_dict=self.url_dic,
+            params=self.ext_get,
+            data=self.data_dic,
+            res_type=self.res_type,
+        )
+
     def create(self, mid):
         pass
 
     def list(self):
-        self.http_verb = "get"
-        self.res_type = "json"
-        return self._do_api()
+        return self.request(url_dict=self.url_dic, params=self.ext_get)
 
     def queryById(self, mid):
-        self.url_dic = {self._func_: mid}
-        self.http_verb = "get"
-        res = self._do_api()
-        self.url_dic = None
-        return res
+        return self.request(url_dict={self._func_: mid})
 
     @property
     def project_id(self):
@@ -179,10 +251,7 @@ class GenericService(object):
         self._project_id = proj_id
 
     def delete(self, mid):
-        self.http_verb = "delete"
-        self.url_dic = {self._func_: mid}
-        res = self._do_api()
-        return res
+        return self.request(verb="delete", url_dict={self._func_: mid})
 
     def __log(self, mstr):
         if self._debug_:
@@ -195,13 +264,15 @@ class CpuService(GenericService):
 
     def getQuota(self, isAll=False):
         if isAll:
-            self._func_ = "projects"
-            self.url_dic = {"projects": "%s/user_quotas" % (self._project_id)}
-        else:
-            self._func_ = "project_quotas"
-            self.url_dic = {"project_quotas": ""}
-            self.ext_get = {"project": self._project_id}
-        return self.list()
+            return self.request(
+                "projects",
+                url_dict={"projects": "%s/user_quotas" % (self._project_id)},
+            )
+        return self.request(
+            "project_quotas",
+            url_dict={"project_quotas": ""},
+            params={"project": self._project_id},
+        )
 
 
 class GpuService(GenericService):
@@ -212,10 +283,64 @@ class GpuService(GenericService):
 
     def getQuota(self, isAll=False):
         if isAll:
-            self._func_ = "projects"
-            self.url_dic = {"projects": "%s/user_quotas" % (self._project_id)}
-        else:
-            self._func_ = "project_quotas"
-            self.url_dic = {"project_quotas": ""}
-            self.ext_get = {"project": self._project_id}
-        return self.list()
+            return self.request(
+                "projects",
+                url_dict={"projects": "%s/user_quotas" % (self._project_id)},
+            )
+        return self.request(
+            "project_quotas",
+            url_dict={"project_quotas": ""},
+            params={"project": self._project_id},
+        )
+
+
+def getQuotas(isAll=False, ttl=None):
+    """VCS and CCS quota of the project, both asked at once
+
+    Kept TWCC_QUOTA_TTL (30) seconds in the `quota` cache, so a dashboard
+    can poll it cheaply, TWCC_CLI_CACHE=off always asks.
+
+    Args:
+        isAll (bool): one entry per member, Tenant Administrators only
+        ttl (int): seconds an answer is reused
+
+    Returns:
+        {"VCS": [...], "CCS": [...]}
+    """
+    # the threads below use the project of the caller, ie: in_project()
+    proj_code = Session2._getDefaultProject()
+    ttl = int(get_environment_params("TWCC_QUOTA_TTL", 30)) if isNone(ttl) else ttl
+
+    @with_cache_mode
+    def call(service):
+        with in_project(proj_code):
+            ans = service().getQuota(isAll=isAll)
+        if not type(ans) == type([]):
+            raise ValueError("{} quota: {}".format(service.__name__, ans))
+        return ans
+
+    def load():
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            quota_vcs = pool.submit(call, CpuService)
+            quota_ccs = pool.submit(call, GpuService)
+            return {"VCS": quota_vcs.result(), "CCS": quota_ccs.result()}
+
+    key = MetaCache.mkKey(
+        Session2._getTwccApiHost(), Session2._getApiKey(None), proj_code, isAll
+    )
+    return MetaCache("quota", ttl=ttl, stale_ttl=0).fetch(key, load)
+
+
+def joinUserQuota(quotas):
+    """Member quotas of getQuotas(isAll=True) by username
+
+    A member with quota in only one of VCS and CCS has only that key.
+
+    Returns:
+        {username: {"VCS": {...}, "CCS": {...}}}
+    """
+    ans = {}
+    for res_type in ("VCS", "CCS"):
+        for x in quotas[res_type]:
+            ans.setdefault(x["user"]["username"], {})[res_type] = x
+    return ans
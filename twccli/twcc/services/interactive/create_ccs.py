@@ -6,6 +6,7 @@ import time
 import questionary
 from questionary import Choice
 from yaspin import yaspin
+from twccli.twcc.cache import shared_single_flight
 from twccli.twcc.services.compute import GpuSite
 from twccli.twcc.services.compute_util import (
     format_ccs_env_dict,
@@ -256,7 +257,7 @@ def _create_ccs_container(
 def _wait_for_container_ready(ccs_site: GpuSite, site_id: str):
     with yaspin(
         text="Waiting for container to be ready...", color="cyan", timer=True
-    ) as spinner:
+    ) as spinner, shared_single_flight().fresh():
         while True:
             site_info = ccs_site.queryById(site_id)
             status = site_info.get("status", "Unknown")
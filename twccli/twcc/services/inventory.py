@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""Ansible dynamic inventory of the VCS instances, see ansible/inventory.py
+
+    Inventory().list()          # `--list`
+    Inventory().host("web-01")  # `--host web-01`
+
+A host is named after its instance, `ansible_host` is its public IP, or
+its private one without. Hostvars: twcc_id, twcc_project, twcc_status,
+twcc_flavor, twcc_private_ip, twcc_private_network, twcc_public_ip and
+twcc_security_groups.
+
+Groups:
+
+- twccli: every host, with `ansible_user` TWCC_INVENTORY_USER (ubuntu)
+- name_<prefix>: the name without its `-<number>` suffix, ie: web-01
+- net_<network>, project_<code>: its private network and project
+- TWCC_INVENTORY_GROUPS: more groups by name, `group=regex` separated by
+  `,`, ie: `gpu=.*-gpu-.*,db=^db`
+
+The inventory is kept TWCC_INVENTORY_TTL (300) seconds in
+`TWCC_DATA_PATH/cache/inventory`, so the many calls of one play list the
+sites once and `--host` never asks the API. Past it, the sites are listed
+again and only the new or changed ones, or the ones asked more than
+TWCC_INVENTORY_VARS_TTL (3600) seconds ago, are asked for their server,
+TWCC_BULK_CONCURRENCY (8) at once. `--refresh` asks every server again.
+TWCC_INVENTORY_PROJECTS lists other projects of the credential file, ie:
+`GOV108009,ENT107001` or `all`.
+"""
+
+from __future__ import print_function
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from twccli.twcc.cache import MetaCache, cache_mode, with_cache_mode, _atomic_json_dump
+from twccli.twcc.session import Session2, in_project
+from twccli.twcc.services.compute import VcsSite, VcsServer
+from twccli.twcc.services.fanout import project_codes, fan_out
+from twccli.twcc.util import isNone, get_environment_params
+from twccli.twccli import logger
+
+
+def group_name(prefix, val):
+    """A valid Ansible group name, ie: net_default_network"""
+    return "%s_%s" % (prefix, re.sub(r"[^A-Za-z0-9_]", "_", str(val)))
+
+
+def group_patterns(text=None):
+    """TWCC_INVENTORY_GROUPS -> [(group, compiled regex)]"""
+    text = get_environment_params("TWCC_INVENTORY_GROUPS", "") if isNone(text) else text
+    ans = []
+    for item in [x.strip() for x in text.split(",") if len(x.strip()) > 0]:
+        if not "=" in item:
+            raise ValueError(
+                "TWCC_INVENTORY_GROUPS: '{}' is not group=regex.".format(item)
+            )
+        group, ptn = item.split("=", 1)
+        ans.append((group_name("name", group.strip())[len("name_") :], re.compile(ptn)))
+    return ans
+
+
+def site_key(site):
+    """What makes the cached server of a site stale at once, see vars_ttl"""
+    return [site.get("status"), site.get("public_ip"), site.get("name")]
+
+
+def _name_of(val):
+    return val.get("name", "") if type(val) == type({}) else val
+
+
+def server_vars(site):
+    """Hostvars from the server of a site, the API calls of an inventory"""
+    ans = {
+        "twcc_private_ip": "",
+        "twcc_private_network": "",
+        "twcc_flavor": "",
+        "twcc_security_groups": [],
+    }
+    servers = site.get("servers")
+    if isNone(servers):
+        servers = VcsSite().queryById(site["id"]).get("servers", [])
+    if len(servers) == 0:
+        # ie: not started yet
+        return ans
+    srv = VcsServer().getInfoByServerId(servers[0]["id"])
+    if len(srv.get("private_nets", [])) > 0:
+        ans["twcc_private_ip"] = srv["private_nets"][0].get("ip", "")
+        ans["twcc_private_network"] = srv["private_nets"][0].get("name", "")
+    ans["twcc_flavor"] = _name_of(srv.get("flavor", ""))
+    ans["twcc_security_groups"] = [_name_of(x) for x in srv.get("security_groups", [])]
+    return ans
+
+
+class Inventory(object):
+    def __init__(
+        self, ttl=None, projects=None, concurrency=None, path=None, vars_ttl=None
+    ):
+        """
+        Args:
+            ttl (int): seconds an inventory is used, TWCC_INVENTORY_TTL
+            projects (str): TWCC_INVENTORY_PROJECTS, the default project if empty
+            concurrency (int): servers asked at once, TWCC_BULK_CONCURRENCY
+            path (str): the cache file
+            vars_ttl (int): seconds the server of an unchanged site is reused
+                by the next inventories, TWCC_INVENTORY_VARS_TTL
+        """
+        self.ttl = int(
+            get_environment_params("TWCC_INVENTORY_TTL", 300) if isNone(ttl) else ttl
+        )
+        self.vars_ttl = int(
+            get_environment_params("TWCC_INVENTORY_VARS_TTL", 3600)
+            if isNone(vars_ttl)
+            else vars_ttl
+        )
+        projects = (
+            get_environment_params("TWCC_INVENTORY_PROJECTS", "")
+            if isNone(projects)
+            else projects
+        )
+        self.proj_codes = project_codes(
+            None if projects in ("", "all") else projects, projects == "all"
+        )
+        if isNone(self.proj_codes):
+            self.proj_codes = [Session2._getDefaultProject()]
+        self.concurrency = int(
+            get_environment_params("TWCC_BULK_CONCURRENCY", 8)
+            if isNone(concurrency)
+            else concurrency
+        )
+        self.path = (
+            os.path.join(
+                os.environ["TWCC_DATA_PATH"],
+                "cache",
+                "inventory",
+                "%s.json"
+                % MetaCache.mkKey(
+                    Session2._getTwccApiHost(),
+                    Session2._getApiKey(None),
+                    self.proj_codes,
+                ),
+            )
+            if isNone(path)
+            else path
+        )
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as fn:
+                return json.load(fn)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _sites(self, cached):
+        """Sites of every project with their hostvars, reusing cached ones"""
+        cached = {} if isNone(cached) else cached
+        concurrency, vars_ttl = self.concurrency, self.vars_ttl
+
+        def fetch():
+            proj_code = Session2._getDefaultProject()
+            sites = VcsSite().list()
+
+            @with_cache_mode
+            def enrich(site):
+                old = cached.get("%s:%s" % (proj_code, site["id"]))
+                # security groups, flavor or network may change while running
+                if (
+                    not isNone(old)
+                    and old["key"] == site_key(site)
+                    and time.time() - old.get("ts", 0) < vars_ttl
+                ):
+                    return {"site": site, "vars": old["vars"], "ts": old["ts"]}
+                with in_project(proj_code):
+                    srv_vars = server_vars(site)
+                return {"site": site, "vars": srv_vars, "ts": time.time()}
+
+            todo = [x for x in sites if "id" in x]
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                return list(pool.map(enrich, todo))
+
+        rows, errors = fan_out(self.proj_codes, fetch)
+        for proj_code, err in errors:
+            # a project which fails keeps its hosts of the last inventory
+            logger.warning("inventory of {}: {}".format(proj_code, err))
+            rows += [
+                dict(x, project=proj_code)
+                for x in cached.values()
+                if x["project"] == proj_code and "site" in x
+            ]
+        return rows
+
+    def build(self, cached=None):
+        """The `--list` answer and what the next build reuses"""
+        patterns = group_patterns()
+        user = get_environment_params("TWCC_INVENTORY_USER", "ubuntu")
+        rows = self._sites(None if isNone(cached) else cached.get("sites"))
+
+        names = {}
+        for row in rows:
+            names.setdefault(row["site"].get("name", ""), []).append(row)
+        inventory = {
+            "twccli": {"hosts": [], "vars": {"ansible_user": user}},
+            "_meta": {"hostvars": {}},
+        }
+        sites = {}
+        for row in sorted(
+            rows, key=lambda x: (x["project"], x["site"].get("name", ""))
+        ):
+            # the listing order within a name, ie: by id
+            site, srv_vars = row["site"], row["vars"]
+            name = site.get("name", "")
+            # names are not unique, the ids are
+            host = name if len(names[name]) == 1 else "%s-%s" % (name, site["id"])
+            hostvars = dict(srv_vars)
+            hostvars.update(
+                {
+                    "ansible_host": site.get("public_ip")
+                    or srv_vars["twcc_private_ip"],
+                    "twcc_id": site["id"],
+                    "twcc_project": row["project"],
+                    "twcc_status": site.get("status", ""),
+                    "twcc_public_ip": site.get("public_ip", ""),
+                }
+            )
+            inventory["_meta"]["hostvars"][host] = hostvars
+            groups = ["twccli", group_name("project", row["project"])]
+            groups.append(group_name("name", re.sub(r"-\d+$", "", name)))
+            if len(srv_vars["twcc_private_network"]) > 0:
+                groups.append(group_name("net", srv_vars["twcc_private_network"]))
+            groups += [group for group, ptn in patterns if ptn.search(name)]
+            for group in groups:
+                inventory.setdefault(group, {"hosts": []})["hosts"].append(host)
+            sites["%s:%s" % (row["project"], site["id"])] = {
+                "project": row["project"],
+                "site": site,
+                "key": site_key(site),
+                "vars": srv_vars,
+                "ts": row.get("ts", 0),
+            }
+        return {"ts": time.time(), "inventory": inventory, "sites": sites}
+
+    def _fresh(self, max_age, is_refresh=False):
+        """The cached build, a new one when older than max_age
+
+        A refresh asks every server again, else the unchanged sites reuse
+        theirs for vars_ttl.
+        """
+        mode = cache_mode()
+        cached = None if mode == "off" else self._load()
+        if (
+            not is_refresh
+            and not isNone(cached)
+            and time.time() - cached["ts"] <= max_age
+        ):
+            return cached
+        ans = self.build(None if mode == "refresh" or is_refresh else cached)
+        if not mode == "off":
+            _atomic_json_dump(self.path, ans)
+        return ans
+
+    def list(self, is_refresh=False):
+        """The inventory of `--list`"""
+        return self._fresh(self.ttl, is_refresh)["inventory"]
+
+    def host(self, host):
+        """The hostvars of `--host`, from any cached inventory"""
+        ans = self._fresh(float("inf"))["inventory"]["_meta"]["hostvars"]
+        return ans.get(host, {})
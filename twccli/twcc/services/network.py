@@ -11,26 +11,23 @@ class Networks(CpuService):
         self._func_ = "networks"
 
     def list(self):
-        self.ext_get = {"project": self._project_id}
-        return self._do_api()
+        return self.request(params={"project": self._project_id})
 
     def create(self, name, getway, cidr):
-        self.http_verb = "post"
-        self.data_dic = {
-            "project": self._project_id,
-            "name": name,
-            "gateway": getway,
-            "cidr": cidr,
-            "with_router": True,
-        }
-        return self._do_api()
+        return self.request(
+            verb="post",
+            data={
+                "project": self._project_id,
+                "name": name,
+                "gateway": getway,
+                "cidr": cidr,
+                "with_router": True,
+            },
+        )
 
     def isStable(self, vnet_id):
         vnet_info = self.queryById(vnet_id)
         return vnet_info["status"] == "ACTIVE"
 
     def delete(self, vnet_id):
-        self.http_verb = "delete"
-        self.url_dic = {"networks": vnet_id}
-        # self.data_dic = {'network_id ': vnet_id}
-        return self._do_api()
+        return self.request(verb="delete", url_dict={"networks": vnet_id})
@@ -11,7 +11,8 @@ from termcolor import colored
 from terminaltables import AsciiTable
 from tqdm import tqdm
 from twccli.twcc.session import Session2
-from twccli.twcc.util import sizeof_fmt, pp, isNone
+from twccli.twcc import profiler, tracing
+from twccli.twcc.util import sizeof_fmt, pp, isNone, get_environment_params
 from dateutil import tz
 from datetime import datetime
 import subprocess
@@ -22,7 +23,10 @@ class S3:
         """Initilaize information for s3 bucket"""
         # The setting for connect to s3 bucket
         self.service_name = "s3"
-        self.endpoint_url = "cos.twcc.ai"
+        # TWCC_COS_ENDPOINT, ie: http://127.0.0.1:9000 for a local S3 stand-in
+        self.endpoint_url = get_environment_params(
+            "TWCC_COS_ENDPOINT", "https://cos.twcc.ai"
+        )
         self.new_files = []
         self.new_bucket = []
         self.twcc = ServiceOperation()
@@ -35,12 +39,16 @@ class S3:
             raise Exception("No key entered by user")
 
         session = boto3.session.Session()
-        self.s3_cli = session.client(
-            service_name=self.service_name,
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            endpoint_url="https://" + self.endpoint_url,
-            verify=True,
+        self.s3_cli = tracing.instrument_boto(
+            profiler.instrument_boto(
+                session.client(
+                    service_name=self.service_name,
+                    aws_access_key_id=self.access_key,
+                    aws_secret_access_key=self.secret_key,
+                    endpoint_url=self.endpoint_url,
+                    verify=True,
+                )
+            )
         )
 
     def list_bucket(self, show_versioning=False):
@@ -130,7 +138,7 @@ class S3:
         }
         for grantee in res["Grants"]:
             if grantee == allow_public_read:
-                return {"is_public_read": "https://cos.twcc.ai/%s/%s" % (bkt, okey)}
+                return {"is_public_read": "%s/%s/%s" % (self.endpoint_url, bkt, okey)}
         return {"is_public_read": False}
 
     def set_obj_contet_type(self, bkt, okey, metadata="application/xml"):
@@ -148,51 +156,52 @@ class S3:
         :param bucket_name : Unique string name
         :return            : List all object inside of S3 bucket.
         """
-        res_list = []
+        tmp = list(self.iter_object(bucket_name))
+        if tmp:
+            return tmp
+        else:
+            return None
+
+    def iter_object(self, bucket_name):
+        """Yield the objects of a S3 bucket page by page.
+
+        :param bucket_name : Unique string name
+        :return            : generator of objects, same format as `list_object`
+        """
+        not_show = set(("ETag", "Owner", "StorageClass"))
+        to_zone = tz.tzlocal()
         NextMarker = ""
         while True:
             res = self.s3_cli.list_objects(Bucket=bucket_name, Marker=NextMarker)
-            res_list.append(res)
+
+            for ele in res["Contents"] if "Contents" in res else []:
+                if isNone(ele):
+                    continue
+                data = {}
+                for key in ele:
+                    if not key in not_show:
+                        if key == "Size":
+                            data[key] = sizeof_fmt(ele[key])
+                        elif key == "LastModified":
+                            data[key] = (
+                                ele[key]
+                                .astimezone(to_zone)
+                                .strftime("%m/%d/%Y %H:%M:%S")
+                            )
+                        else:
+                            data[key] = ele[key]
+                data["Versioning"] = len(
+                    self.s3_cli.list_object_versions(
+                        Bucket=bucket_name, Prefix=ele["Key"]
+                    )["Versions"]
+                )
+                yield data
+
             if "NextMarker" in res:
                 NextMarker = res["NextMarker"]
             else:
                 break
 
-        not_show = set(("ETag", "Owner", "StorageClass"))
-        tmp = []
-        to_zone = tz.tzlocal()
-        for res in res_list:
-
-            if not "Contents" in res:
-                continue
-            else:
-                for ele in res["Contents"]:
-                    if isNone(ele):
-                        continue  # return []
-                    data = {}
-                    for key in ele:
-                        if not key in not_show:
-                            if key == "Size":
-                                data[key] = sizeof_fmt(ele[key])
-                            elif key == "LastModified":
-                                data[key] = (
-                                    ele[key]
-                                    .astimezone(to_zone)
-                                    .strftime("%m/%d/%Y %H:%M:%S")
-                                )
-                            else:
-                                data[key] = ele[key]
-                    data["Versioning"] = len(
-                        self.s3_cli.list_object_versions(
-                            Bucket=bucket_name, Prefix=ele["Key"]
-                        )["Versions"]
-                    )
-                    tmp.append(data)
-        if tmp:
-            return tmp
-        else:
-            return None
-
     def upload_bucket(
         self, file_name=None, bucket_name=None, key=None, path=None, r=False
     ):
@@ -0,0 +1,590 @@
+# -*- coding: utf-8 -*-
+"""VCS resources described in a manifest, ie: `twccli apply -f stack.yaml`
+
+    resources:
+      net:
+        type: vnet
+        name: webnet
+        cidr: 10.10.0.0/24
+        gateway: 10.10.0.254
+      web-sg:
+        type: secg
+        name: websg
+        rules:
+          - {port: 80, cidr: 0.0.0.0/0}
+      web:
+        type: vcs
+        name: web001
+        keypair: mykey
+        network: ${net}
+        secg: ${web-sg}
+      web-ip:
+        type: eip
+        desc: web001 ip
+        server: ${web.id}
+
+`${key}` is the name of another resource, `${key.attr}` one of its fields,
+ie: id or private_ip. They, and `depends_on: [key]`, make the plan a DAG:
+a resource runs as soon as the ones it refers to are done, independent ones
+concurrently, at most TWCC_BULK_CONCURRENCY (8) at a time. A new resource
+is waited for only when another one refers to it.
+
+Resources are matched to live ones by name (eip by desc). Missing ones are
+created, existing ones kept or updated (secg rules, eip and vds
+attachments), destroy deletes them in the reverse order.
+"""
+from __future__ import print_function
+import re
+import yaml
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from twccli.twcc import tracing
+from twccli.twcc.cache import with_cache_mode
+from twccli.twcc.services.compute import (
+    Fixedip,
+    LoadBalancers,
+    SecurityGroups,
+    VcsServerNet,
+    VcsSite,
+    Volumes,
+    getServerId,
+)
+from twccli.twcc.services.network import Networks
+from twccli.twcc.services.bulk import BulkDelete
+from twccli.twcc.services.compute_util import create_vcs, doSiteStable
+from twccli.twcc.util import isNone, get_environment_params
+
+REF_PTN = re.compile(r"\$\{([A-Za-z0-9_-]+)(?:\.([A-Za-z0-9_]+))?\}")
+
+
+class _Kind(object):
+    """How one type of resource is listed, created, updated and deleted
+
+    A kind sets `service` and defines `create(spec)`, which answers the
+    created resource with its id.
+    """
+
+    name_field = "name"
+    site_type = None
+    required = ("name",)
+
+    def nameOf(self, spec):
+        return spec.get(self.name_field)
+
+    def list(self):
+        return self.service.list()
+
+    def changes(self, spec, live):
+        """What update() would change, ie: ["rule tcp 80"]"""
+        return []
+
+    def update(self, spec, live):
+        pass
+
+    def delete(self, live):
+        return self.service.delete(live["id"])
+
+    def wait(self, res_id):
+        if not isNone(self.site_type):
+            doSiteStable(res_id, site_type=self.site_type)
+
+    def get(self, res_id):
+        return self.service.queryById(res_id)
+
+
+class _Vnet(_Kind):
+    site_type = "vnet"
+    required = ("name", "cidr", "gateway")
+
+    def __init__(self):
+        self.service = Networks()
+
+    def create(self, spec):
+        return self.service.create(spec["name"], spec["gateway"], spec["cidr"])
+
+
+def _rule_of(rule):
+    """(direction, protocol, port_min, port_max, cidr) of a manifest rule"""
+    port_min = port_max = rule.get("port")
+    if "portrange" in rule:
+        port_min, port_max = [int(x) for x in str(rule["portrange"]).split("-")]
+    protocol = rule.get("protocol", "tcp")
+    if protocol == "icmp":
+        port_min = port_max = None
+    return (
+        rule.get("direction", "ingress"),
+        protocol,
+        None if isNone(port_min) else int(port_min),
+        None if isNone(port_max) else int(port_max),
+        rule.get("cidr", "0.0.0.0/0"),
+    )
+
+
+class _Secg(_Kind):
+    def __init__(self):
+        self.service = SecurityGroups()
+
+    def list(self):
+        return self.service.list(ids=(), secg_type="project")
+
+    def _missing(self, spec, live):
+        exists = set(
+            [
+                (
+                    x["direction"],
+                    x["protocol"],
+                    x["port_range_min"],
+                    x["port_range_max"],
+                    x["remote_ip_prefix"],
+                )
+                for x in live.get("security_group_rules", [])
+            ]
+        )
+        return [x for x in map(_rule_of, spec.get("rules", [])) if not x in exists]
+
+    def create(self, spec):
+        ans = self.service.create(spec["name"], desc=spec.get("desc", ""))
+        if "id" in ans:
+            self.update(spec, ans)
+        return ans
+
+    def changes(self, spec, live):
+        return ["rule %s %s %s-%s %s" % x for x in self._missing(spec, live)]
+
+    def update(self, spec, live):
+        for direction, protocol, port_min, port_max, cidr in self._missing(
+            spec, live
+        ):
+            self.service.addRule(
+                live["id"], port_min, port_max, cidr, protocol, direction
+            )
+
+    def delete(self, live):
+        return self.service.deleteById(live["id"])
+
+
+class _Vcs(_Kind):
+    site_type = "vcs"
+    required = ("name", "flavor")
+    # manifest field: create_vcs argument
+    ARGS = {
+        "solution": "sol",
+        "image": "img_name",
+        "network": "network",
+        "keypair": "keypair",
+        "flavor": "flavor",
+        "sys_vol": "sys_vol",
+        "sys_vol_size": "sys_vol_size",
+        "data_vol": "data_vol",
+        "data_vol_size": "data_vol_size",
+        "fip": "fip",
+        "password": "password",
+        "env": "env",
+        "pass_api": "pass_api",
+        "secg": "secg",
+    }
+    DEFAULTS = {
+        "sol": "ubuntu",
+        "sys_vol": "hdd",
+        "sys_vol_size": 100,
+        "data_vol": "hdd",
+        "data_vol_size": 0,
+        "fip": False,
+        "env": {},
+        "pass_api": False,
+    }
+
+    def __init__(self):
+        self.service = VcsSite()
+
+    def create(self, spec):
+        kwargs = dict(self.DEFAULTS)
+        for field, arg in self.ARGS.items():
+            if field in spec:
+                kwargs[arg] = spec[field]
+        if type(kwargs.get("secg")) == type([]):
+            kwargs["secg"] = ",".join(kwargs["secg"])
+        return create_vcs(spec["name"], **kwargs)
+
+
+class _Eip(_Kind):
+    name_field = "desc"
+    required = ("desc",)
+
+    def __init__(self):
+        self.service = Fixedip()
+
+    def create(self, spec):
+        ans = self.service.create(desc=spec["desc"])
+        if "id" in ans:
+            self.update(spec, ans)
+        return ans
+
+    def changes(self, spec, live):
+        if not isNone(spec.get("server")) and live.get("status") == "AVAILABLE":
+            return ["attach to %s" % spec["server"]]
+        return []
+
+    def update(self, spec, live):
+        if not isNone(spec.get("server")):
+            VcsServerNet().associateIP(spec["server"], eip_id=live["id"])
+
+    def delete(self, live):
+        return self.service.deleteById(live["id"])
+
+
+class _Vds(_Kind):
+    required = ("name", "size")
+
+    def __init__(self):
+        self.service = Volumes()
+
+    def create(self, spec):
+        ans = self.service.create(
+            spec["name"],
+            spec["size"],
+            desc=spec.get("desc", "CLI create Disk"),
+            volume_type=spec.get("volume_type", "hdd").lower(),
+        )
+        if "id" in ans:
+            self.update(spec, ans)
+        return ans
+
+    def changes(self, spec, live):
+        if not isNone(spec.get("server")) and len(live.get("mountpoint", [])) == 0:
+            return ["attach to %s" % spec["server"]]
+        return []
+
+    def update(self, spec, live):
+        if not isNone(spec.get("server")):
+            self.service.update(
+                live["id"], "attach", getServerId(spec["server"]), None, False
+            )
+
+    def delete(self, live):
+        return self.service.deleteById(live["id"], False)
+
+    def get(self, res_id):
+        return self.service.list(res_id)
+
+
+class _Vlb(_Kind):
+    site_type = "vlb"
+    required = ("name", "network", "listeners")
+    PROTOCOL = {"APP_LB": "HTTP", "NETWORK_LB": "TCP"}
+
+    def __init__(self):
+        self.service = LoadBalancers()
+
+    def create(self, spec):
+        listeners, pools = [], []
+        for idx, lsn in enumerate(spec["listeners"]):
+            protocol = self.PROTOCOL[lsn.get("type", "APP_LB").upper()]
+            members = []
+            for member in lsn.get("members", []):
+                ip, port = str(member).rsplit(":", 1)
+                members.append({"ip": ip, "port": int(port), "weight": 1})
+            listeners.append(
+                {
+                    "protocol": protocol,
+                    "protocol_port": lsn["port"],
+                    "name": "listener-{}".format(idx),
+                    "pool_name": "pool-{}".format(idx),
+                }
+            )
+            pools.append(
+                {
+                    "method": lsn.get("method", "ROUND_ROBIN").upper(),
+                    "protocol": protocol,
+                    "name": "pool-{}".format(idx),
+                    "members": members,
+                }
+            )
+        eip_id = None
+        if not isNone(spec.get("eip")):
+            eip_id = Fixedip().get_id_by_ip(spec["eip"])
+            if isNone(eip_id):
+                raise ValueError("EIP {} is not available.".format(spec["eip"]))
+        return self.service.create(
+            spec["name"],
+            pools,
+            spec["network"],
+            listeners,
+            spec.get("desc", ""),
+            eip_id=eip_id,
+        )
+
+    def delete(self, live):
+        return self.service.deleteById(live["id"])
+
+    def get(self, res_id):
+        return self.service.list(res_id)
+
+
+KINDS = {
+    "vnet": _Vnet,
+    "secg": _Secg,
+    "vcs": _Vcs,
+    "eip": _Eip,
+    "vds": _Vds,
+    "vlb": _Vlb,
+}
+
+
+def refs_of(value):
+    """Keys referred to by value, in nested lists and dicts too"""
+    if type(value) == type({}):
+        return set().union(*[refs_of(x) for x in value.values()])
+    if type(value) == type([]):
+        return set().union(*[refs_of(x) for x in value])
+    if type(value) == type(""):
+        return set([x[0] for x in REF_PTN.findall(value)])
+    return set()
+
+
+def resolve(value, lookup):
+    """Replaces ${key.attr} in value, lookup(key, attr) gives the field"""
+    if type(value) == type({}):
+        return dict([(k, resolve(v, lookup)) for k, v in value.items()])
+    if type(value) == type([]):
+        return [resolve(x, lookup) for x in value]
+    if type(value) == type(""):
+        whole = REF_PTN.fullmatch(value)
+        if whole:
+            # keep the type, ie: ids are int
+            return lookup(whole.group(1), whole.group(2))
+        return REF_PTN.sub(lambda m: "%s" % lookup(m.group(1), m.group(2)), value)
+    return value
+
+
+def run_dag(deps, func, concurrency=None):
+    """Runs func(key) once deps[key] are done, independent keys concurrently
+
+    Returns:
+        {key: (answer, error)}, keys whose deps failed are not run and have a
+        RuntimeError
+    """
+    concurrency = int(
+        get_environment_params("TWCC_BULK_CONCURRENCY", 8)
+        if isNone(concurrency)
+        else concurrency
+    )
+    # the workers use the cache mode of the caller, ie: --refresh-cache
+    func = with_cache_mode(func)
+    done, running = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        while len(done) < len(deps):
+            for key in deps:
+                if key in done or key in running:
+                    continue
+                failed = [x for x in deps[key] if x in done and done[x][1]]
+                if len(failed) > 0:
+                    done[key] = (
+                        None,
+                        RuntimeError("skipped, %s failed" % ", ".join(sorted(failed))),
+                    )
+                elif all([x in done for x in deps[key]]):
+                    running[key] = pool.submit(func, key)
+            if len(running) == 0:
+                continue
+            finished, _ = wait(list(running.values()), return_when=FIRST_COMPLETED)
+            for key in [k for k, f in running.items() if f in finished]:
+                fut = running.pop(key)
+                err = fut.exception()
+                done[key] = (None if err else fut.result(), err)
+    return done
+
+
+class Stack(object):
+    def __init__(self, doc, kinds=None):
+        """
+        Args:
+            doc (dict): the manifest, {"resources": {key: spec}}
+            kinds (dict): type: _Kind class, KINDS by default
+        """
+        self.kinds = KINDS if isNone(kinds) else kinds
+        if type(doc) != type({}) or type(doc.get("resources")) != type({}):
+            raise ValueError("The manifest needs a `resources` mapping.")
+        self.specs = doc["resources"]
+        self.deps = {}
+        for key, spec in self.specs.items():
+            if type(spec) != type({}) or not spec.get("type") in self.kinds:
+                raise ValueError(
+                    "Resource '{}' needs a type of: {}.".format(
+                        key, ", ".join(sorted(self.kinds))
+                    )
+                )
+            deps = refs_of(spec) | set(spec.get("depends_on", []))
+            unknown = deps - set(self.specs)
+            if len(unknown) > 0:
+                raise ValueError(
+                    "Resource '{}' refers to unknown {}.".format(
+                        key, ", ".join(sorted(unknown))
+                    )
+                )
+            self.deps[key] = deps
+        self.dependents = dict([(x, set()) for x in self.specs])
+        for key, deps in self.deps.items():
+            for dep in deps:
+                self.dependents[dep].add(key)
+        self.order()
+        self.live = {}
+        self._kinds = {}
+
+    @classmethod
+    def load(cls, file_name):
+        with open(file_name, "r") as fn:
+            return cls(yaml.safe_load(fn))
+
+    def order(self):
+        """Keys, each after the ones it depends on, raises on a cycle"""
+        ans, left = [], dict([(k, set(v)) for k, v in self.deps.items()])
+        while len(left) > 0:
+            ready = sorted([k for k, v in left.items() if len(v - set(ans)) == 0])
+            if len(ready) == 0:
+                raise ValueError(
+                    "Resources depend on each other: {}.".format(
+                        ", ".join(sorted(left))
+                    )
+                )
+            ans.extend(ready)
+            for key in ready:
+                del left[key]
+        return ans
+
+    def kindOf(self, key):
+        rtype = self.specs[key]["type"]
+        if not rtype in self._kinds:
+            self._kinds[rtype] = self.kinds[rtype]()
+        return self._kinds[rtype]
+
+    def _lookup(self, key, attr):
+        if isNone(attr):
+            return self.kindOf(key).nameOf(self.specs[key])
+        live = self.live.get(key)
+        if isNone(live) or not attr in live:
+            raise ValueError("${%s.%s} is not known yet." % (key, attr))
+        return live[attr]
+
+    def specOf(self, key):
+        """The spec of key with its references resolved"""
+        spec = resolve(self.specs[key], self._lookup)
+        for field in self.kindOf(key).required:
+            if isNone(spec.get(field)):
+                raise ValueError("Resource '{}' needs `{}`.".format(key, field))
+        return spec
+
+    def refresh(self):
+        """Matches every resource to a live one, one listing per type"""
+        rtypes = sorted(set([x["type"] for x in self.specs.values()]))
+        keys = dict([(self.specs[k]["type"], k) for k in self.specs])
+        listed = run_dag(
+            dict([(x, set()) for x in rtypes]),
+            lambda rtype: self.kindOf(keys[rtype]).list(),
+        )
+        self.live = {}
+        for key, spec in self.specs.items():
+            ans, err = listed[spec["type"]]
+            if err:
+                raise err
+            name = self.kindOf(key).nameOf(self.specs[key])
+            found = [x for x in ans if x.get(self.kindOf(key).name_field) == name]
+            if len(found) > 0:
+                self.live[key] = found[0]
+        return self.live
+
+    def plan(self, is_destroy=False):
+        """One row per resource, in the order they run
+
+        Returns:
+            list of {"key", "type", "name", "id", "action", "changes"}
+        """
+        self.refresh()
+        keys = self.order()
+        rows = []
+        for key in reversed(keys) if is_destroy else keys:
+            kind = self.kindOf(key)
+            live = self.live.get(key)
+            row = {
+                "key": key,
+                "type": self.specs[key]["type"],
+                "name": kind.nameOf(self.specs[key]),
+                "id": None if isNone(live) else live["id"],
+                "changes": [],
+            }
+            if is_destroy:
+                row["action"] = "absent" if isNone(live) else "delete"
+            elif isNone(live):
+                row["action"] = "create"
+            else:
+                try:
+                    row["changes"] = kind.changes(self.specOf(key), live)
+                except ValueError:
+                    # refers to a resource which is created first
+                    row["changes"] = ["unknown until applied"]
+                row["action"] = "update" if len(row["changes"]) > 0 else "keep"
+            rows.append(row)
+        return rows
+
+    def apply(self):
+        """Creates or updates what differs, returns the rows of plan()"""
+        plan = self.plan()
+        rows = dict([(x["key"], x) for x in plan])
+
+        def run(key):
+            kind, row = self.kindOf(key), rows[key]
+            with tracing.span(
+                "apply %s" % key, {"twcc.resource": row["type"], "twcc.action": ""}
+            ) as sp:
+                spec = self.specOf(key)
+                if row["action"] == "create":
+                    ans = kind.create(spec)
+                    if not "id" in ans:
+                        raise ValueError(
+                            ans.get("detail", ans.get("message", "%s" % ans))
+                        )
+                    row["id"] = ans["id"]
+                    self.live[key] = ans
+                    # only the ones others refer to are waited for
+                    if len(self.dependents[key]) > 0 or spec.get("wait", False):
+                        kind.wait(ans["id"])
+                        self.live[key] = kind.get(ans["id"])
+                else:
+                    row["changes"] = kind.changes(spec, self.live[key])
+                    if len(row["changes"]) > 0:
+                        kind.update(spec, self.live[key])
+                        row["action"] = "update"
+                sp.setAttribute("twcc.action", row["action"])
+
+        return self._run(plan, self.deps, run)
+
+    def destroy(self):
+        """Deletes the live resources, dependents first"""
+        plan = self.plan(is_destroy=True)
+        rows = dict([(x["key"], x) for x in plan])
+
+        def run(key):
+            kind, row = self.kindOf(key), rows[key]
+            if row["action"] == "absent":
+                return
+            with tracing.span("destroy %s" % key, {"twcc.resource": row["type"]}):
+                kind.delete(self.live[key])
+                # the resources it refers to are deleted once it is gone
+                if len([x for x in self.deps[key] if x in self.live]) > 0:
+                    left = BulkDelete(
+                        row["type"],
+                        None,
+                        list_ids=lambda: [x["id"] for x in kind.list()],
+                    ).waitGone([row["id"]])
+                    if len(left) > 0:
+                        raise RuntimeError("still there after the wait")
+                row["action"] = "deleted"
+
+        return self._run(plan, self.dependents, run)
+
+    def _run(self, plan, deps, func):
+        rows = dict([(x["key"], x) for x in plan])
+        for key, (_, err) in run_dag(deps, func).items():
+            rows[key]["message"] = "" if isNone(err) else "%s" % err
+            if err:
+                rows[key]["action"] = "failed"
+        return plan
@@ -11,21 +11,19 @@ class Volumes(CpuService):
         self._csite_ = Session2._getClusterName("VCS")
 
     def create(self, name, size, desc="", volume_type="hdd"):
-        self.http_verb = "post"
-        self.data_dic = {
-            "project": self._project_id,
-            "name": name,
-            "size": size,
-            "desc": desc,
-            "volume_type": volume_type,
-        }
-        return self._do_api()
+        return self.request(
+            verb="post",
+            data={
+                "project": self._project_id,
+                "name": name,
+                "size": size,
+                "desc": desc,
+                "volume_type": volume_type,
+            },
+        )
 
     def deleteById(self, sys_vol_id):
-        self.http_verb = "delete"
-        # self.res_type = 'txt'
-        self.url_dic = {"images": sys_vol_id}
-        return self._do_api()
+        return self.request(verb="delete", url_dict={"images": sys_vol_id})
 
 
 class snapshots(CpuService):
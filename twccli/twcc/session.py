@@ -7,11 +7,67 @@ import click
 import shutil
 import datetime
 import requests
+import threading
+import contextlib
 from collections import defaultdict
-from twccli.twcc.util import isNone, isFile, mkdir_p, table_layout, send_ga
+from twccli.twcc.util import (
+    isNone,
+    isFile,
+    mkdir_p,
+    table_layout,
+    send_ga,
+    get_environment_params,
+)
+from twccli.twcc import profiler
 from twccli.version import __version__
 
 
+@profiler.timed("yaml")
+def _parse_yaml(file_name):
+    with open(file_name, "r") as fn:
+        return yaml.load(fn.read(), Loader=yaml.SafeLoader)
+
+
+_yaml_files = {}
+_yaml_files_lock = threading.Lock()
+
+
+def _load_yaml(file_name):
+    """Parsed file_name, parsed again only when the file changes
+
+    A command builds many sessions and services, each one reading the
+    credential file and TWCC_API.yaml. Callers get their own copy.
+    """
+    path = os.path.abspath(file_name)
+    stat = os.stat(path)
+    sig = (stat.st_mtime_ns, stat.st_size)
+    with _yaml_files_lock:
+        entry = _yaml_files.get(path)
+    if isNone(entry) or not entry[0] == sig:
+        entry = (sig, _parse_yaml(path))
+        with _yaml_files_lock:
+            _yaml_files[path] = entry
+    return copy.deepcopy(entry[1])
+
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def in_project(proj_code):
+    """Sessions made in this thread use proj_code, ie: for one of many projects
+
+    with in_project("GOV108009"):
+        VcsSite().list()
+    """
+    saved = getattr(_local, "proj_code", None)
+    _local.proj_code = proj_code
+    try:
+        yield
+    finally:
+        _local.proj_code = saved
+
+
 class Session2(object):
     # static varibles
     PackageYaml = "{}/yaml/TWCC_API.yaml".format(
@@ -150,9 +206,7 @@ class Session2(object):
     def _isValidSession(isConfig=False):
         twcc_file_session = Session2._getSessionFile()
         if not isNone(twcc_file_session) and isFile(twcc_file_session):
-            sessConf = yaml.load(
-                open(twcc_file_session, "r").read(), Loader=yaml.SafeLoader
-            )
+            sessConf = _load_yaml(twcc_file_session)
             if not type(sessConf) == type(None):
                 if isConfig:
                     return sessConf
@@ -165,9 +219,7 @@ class Session2(object):
 
     def loadSession(self):
         if self.isValidSession():
-            self.sessConf = yaml.load(
-                open(self.twcc_file_session, "r").read(), Loader=yaml.SafeLoader
-            )
+            self.sessConf = _load_yaml(self.twcc_file_session)
             if isNone(self.sessConf):
                 raise ValueError(
                     "{} is not a valid credentials file".format(self.twcc_file_session)
@@ -180,6 +232,8 @@ class Session2(object):
 
             # map to proj_code
             self.twcc_proj_code = self.sessConf["_default"]["twcc_proj_code"]
+            if not isNone(getattr(_local, "proj_code", None)):
+                self.twcc_proj_code = _local.proj_code
             self.switchProj()
             return True
 
@@ -187,8 +241,22 @@ class Session2(object):
         if isNone(projCode):
             projCode = self.twcc_proj_code
 
+        if not projCode in self.sessConf["projects"]:
+            raise ValueError(
+                "Project {} is not in {}, run `twccli config init` again.".format(
+                    projCode, self.twcc_file_session
+                )
+            )
         self.twcc_proj_id = self.sessConf["projects"][projCode]
 
+    @staticmethod
+    def _getProjectCodes():
+        """Codes of the projects in the credential file"""
+        sessConf = Session2._isValidSession(isConfig=True)
+        if type(sessConf) == bool:
+            raise ValueError("No credential file, run `twccli config init` first.")
+        return sorted(sessConf["projects"].keys())
+
     @staticmethod
     def _getTwccResourses():
         config = Session2._getTwccliConfig()
@@ -199,7 +267,7 @@ class Session2(object):
         if isNone(yaml_file):
             yaml_file = Session2.PackageYaml
 
-        return yaml.load(open(Session2.PackageYaml, "r").read(), Loader=yaml.SafeLoader)
+        return _load_yaml(Session2.PackageYaml)
 
     @staticmethod
     def _getIsrvProjs(api_key=None):
@@ -223,6 +291,8 @@ class Session2(object):
     @staticmethod
     def _getDefaultProject(twcc_proj_code=None):
         if isNone(twcc_proj_code):
+            if not isNone(getattr(_local, "proj_code", None)):
+                return _local.proj_code
             if "_TWCC_PROJECT_CODE_" in os.environ and not isNone(
                 os.environ["_TWCC_PROJECT_CODE_"]
             ):
@@ -307,8 +377,9 @@ class Session2(object):
 
     @staticmethod
     def _getTwccApiHost():
+        # TWCC_API_HOST points the CLI at another gateway, ie: a local mock
         config = Session2._getTwccliConfig()
-        return config["production"]["host"]
+        return get_environment_params("TWCC_API_HOST", config["production"]["host"])
 
     def getTwccApiHost(self):
         return Session2._getTwccApiHost()
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""Tracing spans, enabled by `twccli --trace-file FILE` or TWCC_TRACE_FILE.
+
+Spans nest through a contextvar: command -> service request -> HTTP call,
+and S3 operations / waiters under whatever span is open. Every span is
+appended to the file when it ends, one OTLP json `ExportTraceServiceRequest`
+per line, so the file can be loaded by OTLP json file receivers.
+
+Like profiler.py, this module must not import other twccli modules.
+"""
+import binascii
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current = contextvars.ContextVar("twcc_span", default=None)
+_exporter = None
+_from_env = False
+# spans started in threads without a parent, ie: s3transfer workers, hang here
+_root = None
+
+
+def _new_id(nbytes):
+    return binascii.hexlify(os.urandom(nbytes)).decode("ascii")
+
+
+def _otlp_value(val):
+    if isinstance(val, bool):
+        return {"boolValue": val}
+    if isinstance(val, int):
+        return {"intValue": str(val)}
+    if isinstance(val, float):
+        return {"doubleValue": val}
+    return {"stringValue": str(val)}
+
+
+class JsonlExporter(object):
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [
+                                {"key": "service.name", "value": _otlp_value("twccli")},
+                                {"key": "process.pid", "value": _otlp_value(os.getpid())},
+                            ]
+                        },
+                        "scopeSpans": [
+                            {"scope": {"name": "twccli"}, "spans": [span.toOtlp()]}
+                        ],
+                    }
+                ]
+            }
+        )
+        with self._lock:
+            with open(self.file_name, "a") as fn:
+                fn.write(line + "\n")
+
+
+class Span(object):
+    def __init__(self, name, parent=None, attributes=None, kind=SPAN_KIND_INTERNAL):
+        self.name = name
+        self.trace_id = _new_id(16) if parent is None else parent.trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = None if parent is None else parent.span_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.status = (0, "")
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._token = None
+
+    def setAttribute(self, key, val):
+        self.attributes[key] = val
+
+    def setStatus(self, code, message=""):
+        self.status = (code, message)
+
+    def setError(self, err):
+        self.setStatus(STATUS_ERROR, "%s: %s" % (type(err).__name__, err))
+
+    def end(self, err=None):
+        if not self.end_ns is None:
+            return
+        if not err is None:
+            self.setError(err)
+        elif self.status[0] == 0:
+            self.status = (STATUS_OK, "")
+        self.end_ns = time.time_ns()
+        if not self._token is None:
+            try:
+                _current.reset(self._token)
+            except ValueError:
+                # ended in another context than it started in
+                pass
+        if not _exporter is None:
+            _exporter.export(self)
+
+    def toOtlp(self):
+        ans = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": k, "value": _otlp_value(v)}
+                for (k, v) in sorted(self.attributes.items())
+                if not v is None
+            ],
+            "status": {"code": self.status[0]},
+        }
+        if not self.parent_id is None:
+            ans["parentSpanId"] = self.parent_id
+        if self.status[1]:
+            ans["status"]["message"] = self.status[1]
+        return ans
+
+
+class _NoopSpan(object):
+    def setAttribute(self, key, val):
+        pass
+
+    def setStatus(self, code, message=""):
+        pass
+
+    def setError(self, err):
+        pass
+
+    def end(self, err=None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def enable(file_name):
+    global _exporter
+    _exporter = JsonlExporter(file_name)
+
+
+def disable():
+    global _exporter, _root
+    _exporter, _root = None, None
+
+
+@contextlib.contextmanager
+def using_file(file_name):
+    """Traces into file_name until the end of the block, ie: one command"""
+    global _exporter, _root
+    isEnabled()
+    saved = (_exporter, _root)
+    enable(file_name)
+    try:
+        yield
+    finally:
+        _exporter, _root = saved
+
+
+def isEnabled():
+    global _from_env
+    if not _from_env:
+        _from_env = True
+        if _exporter is None and os.environ.get("TWCC_TRACE_FILE"):
+            enable(os.environ["TWCC_TRACE_FILE"])
+    return not _exporter is None
+
+
+def current():
+    return _current.get()
+
+
+def start_span(name, attributes=None, kind=SPAN_KIND_INTERNAL, is_root=False):
+    """Opens a span as child of the current one, caller must `end()` it"""
+    global _root
+    if not isEnabled():
+        return NOOP_SPAN
+    parent = _current.get()
+    if parent is None and not is_root:
+        parent = _root
+    sp = Span(name, parent, attributes, kind)
+    sp._token = _current.set(sp)
+    if is_root:
+        _root = sp
+    return sp
+
+
+@contextlib.contextmanager
+def span(name, attributes=None, kind=SPAN_KIND_INTERNAL):
+    sp = start_span(name, attributes, kind)
+    try:
+        yield sp
+    except BaseException as e:
+        if not (isinstance(e, SystemExit) and e.code in (None, 0)):
+            sp.setError(e)
+        raise
+    finally:
+        sp.end()
+
+
+def traced(name):
+    """Decorator, runs the function inside span `name`"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not isEnabled():
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def start_http(verb, url):
+    """Opens a client span for one HTTP call, end it with `end_http()`"""
+    return start_span(
+        "HTTP %s" % verb.upper(),
+        {"http.method": verb.upper(), "http.url": url},
+        SPAN_KIND_CLIENT,
+    )
+
+
+def end_http(sp, status_code, retries=None):
+    sp.setAttribute("http.status_code", status_code)
+    if not retries is None:
+        sp.setAttribute("http.retries", retries)
+    if status_code >= 400:
+        sp.setStatus(STATUS_ERROR, "HTTP %d" % status_code)
+    sp.end()
+
+
+def instrument_boto(client):
+    """Adds a client span around every API operation of a boto3 client"""
+    if not isEnabled():
+        return client
+    service = client.meta.service_model.service_name
+
+    def before_call(model, context, **kwargs):
+        context["twcc_span"] = start_span(
+            "%s %s" % (service, model.name),
+            {"rpc.system": "aws-api", "rpc.service": service, "rpc.method": model.name},
+            SPAN_KIND_CLIENT,
+        )
+
+    def after_call(http_response, context, **kwargs):
+        sp = context.pop("twcc_span", None)
+        if not sp is None:
+            end_http(sp, http_response.status_code)
+
+    def after_call_error(exception, context, **kwargs):
+        sp = context.pop("twcc_span", None)
+        if not sp is None:
+            sp.end(exception)
+
+    client.meta.events.register("before-call.%s" % service, before_call)
+    client.meta.events.register("after-call.%s" % service, after_call)
+    client.meta.events.register("after-call-error.%s" % service, after_call_error)
+    return client
+
+
+def _is_secret(opt):
+    name = opt.lstrip("-").lower()
+    return name == "pwd" or any(x in name for x in ("key", "secret", "password"))
+
+
+def redact_args(argv):
+    """The command line without the values of -pwd, --apikey and alike"""
+    ans, is_value = [], False
+    for arg in argv:
+        if is_value:
+            ans.append("***")
+            is_value = False
+        elif arg.startswith("-") and "=" in arg and _is_secret(arg.split("=", 1)[0]):
+            ans.append(arg.split("=", 1)[0] + "=***")
+        else:
+            ans.append(arg)
+            is_value = arg.startswith("-") and _is_secret(arg)
+    return ans
+
+
+def end_root(err=None):
+    """Ends the command span opened by twccli.py"""
+    if _root is None:
+        return
+    if err is None:
+        err = sys.exc_info()[1]
+    if isinstance(err, SystemExit) and err.code in (None, 0):
+        err = None
+    _root.end(err)
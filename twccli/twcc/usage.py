@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""Quota and usage history, `twccli info quota --record` then `twccli info usage`
+
+Every record appends one sample per project, member and resource to an
+SQLite table in TWCC_USAGE_DB (TWCC_DATA_PATH/usage.sqlite3):
+
+    ts, project, user, resource, usage, quota
+
+`user` is empty for the project total, `resource` is ie: VCS.gpu, `quota`
+is NULL when unlimited. The rows are keyed by series and time, so reading
+one series over a time range only touches its rows. Samples older than
+TWCC_USAGE_RETENTION (90) days are dropped while recording.
+
+A query groups the samples in windows and gives the average and the peak
+usage and utilization of every series, without asking the API.
+"""
+
+from __future__ import print_function
+import datetime
+import os
+import re
+import sqlite3
+import time
+from twccli.twcc.util import isNone, get_environment_params
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS samples (
+        project TEXT NOT NULL,
+        resource TEXT NOT NULL,
+        user TEXT NOT NULL,
+        ts INTEGER NOT NULL,
+        usage REAL NOT NULL,
+        quota REAL,
+        PRIMARY KEY (project, resource, user, ts)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts)",
+)
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(val):
+    """`90`, `30m`, `24h` or `7d` -> seconds"""
+    found = re.match(r"^\s*(\d+)\s*([smhdw]?)\s*$", str(val))
+    if isNone(found) or int(found.group(1)) < 1:
+        raise ValueError("duration '{}' is not valid, ie: 30m, 24h, 7d".format(val))
+    return int(found.group(1)) * DURATION_UNITS[found.group(2) or "s"]
+
+
+def samples_of(quotas, proj_code, is_all=False):
+    """Samples of getQuotas(), one per member (or the project) and resource
+
+    Returns:
+        [(project, user, resource, usage, quota)]
+    """
+    ans = []
+    for res_type in ("VCS", "CCS"):
+        for entry in quotas[res_type]:
+            user = entry["user"]["username"] if is_all else ""
+            for res, val in sorted(entry.items()):
+                if not (type(val) == type({}) and "usage" in val and "quota" in val):
+                    continue
+                quota = None if val["quota"] == -1 else float(val["quota"])
+                ans.append(
+                    (
+                        proj_code,
+                        user,
+                        "%s.%s" % (res_type, res),
+                        float(val["usage"]),
+                        quota,
+                    )
+                )
+    return ans
+
+
+class UsageStore(object):
+    def __init__(self, path=None):
+        self.path = (
+            get_environment_params(
+                "TWCC_USAGE_DB",
+                os.path.join(os.environ["TWCC_DATA_PATH"], "usage.sqlite3"),
+            )
+            if isNone(path)
+            else path
+        )
+
+    def _connect(self):
+        db_dir = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        # cron runs may overlap, wait for the other writer
+        conn = sqlite3.connect(self.path, timeout=30)
+        for sql in SCHEMA:
+            conn.execute(sql)
+        return conn
+
+    def record(self, samples, ts=None, retention=None):
+        """Appends samples taken at ts, returns how many
+
+        Args:
+            samples (list): from samples_of()
+            ts (int): epoch seconds, now by default
+            retention (int): days kept, TWCC_USAGE_RETENTION
+        """
+        ts = int(time.time() if isNone(ts) else ts)
+        retention = int(
+            get_environment_params("TWCC_USAGE_RETENTION", 90)
+            if isNone(retention)
+            else retention
+        )
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO samples"
+                    " (project, user, resource, usage, quota, ts)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [tuple(x) + (ts,) for x in samples],
+                )
+                if retention > 0:
+                    conn.execute(
+                        "DELETE FROM samples WHERE ts < ?", (ts - retention * 86400,)
+                    )
+        finally:
+            conn.close()
+        return len(samples)
+
+    def query(
+        self,
+        since,
+        until=None,
+        window=None,
+        projects=None,
+        user=None,
+        resource=None,
+    ):
+        """Average and peak of every series in every window
+
+        Args:
+            since (int): epoch seconds
+            until (int): epoch seconds, now by default
+            window (int): seconds, windows start at multiples of it, one
+                window for the whole range by default
+            projects (list): project codes, all by default
+            user (str): a member, "" for the project totals
+            resource (str): ie: VCS.gpu
+
+        Returns:
+            [{"start", "project", "user", "resource", "samples", "avg",
+              "peak", "quota", "avg_pct", "peak_pct"}], the percents are None
+              when unlimited
+        """
+        until = int(time.time() if isNone(until) else until)
+        if isNone(window):
+            start_sql, start_args = "?", [since]
+        else:
+            # the same windows in every query, ie: on the hour
+            start_sql, start_args = "(ts / ?) * ?", [window, window]
+        where, args = ["ts >= ?", "ts <= ?"], [since, until]
+        if not isNone(projects) and len(projects) > 0:
+            where.append("project IN (%s)" % ", ".join(["?"] * len(projects)))
+            args += list(projects)
+        if not isNone(user):
+            where.append("user = ?")
+            args.append(user)
+        if not isNone(resource):
+            where.append("resource = ?")
+            args.append(resource)
+        sql = (
+            "SELECT %s AS start, project, user, resource,"
+            " COUNT(*), AVG(usage), MAX(usage), MAX(quota),"
+            " AVG(CASE WHEN quota > 0 THEN usage / quota END),"
+            " MAX(CASE WHEN quota > 0 THEN usage / quota END)"
+            " FROM samples WHERE %s"
+            " GROUP BY start, project, user, resource"
+            " ORDER BY start, project, user, resource"
+            % (start_sql, " AND ".join(where))
+        )
+        conn = self._connect()
+        try:
+            cur = conn.execute(sql, start_args + args)
+            rows = cur.fetchall()
+        finally:
+            conn.close()
+        pct = lambda x: None if isNone(x) else round(x * 100, 1)
+        return [
+            {
+                "start": datetime.datetime.fromtimestamp(x[0]).strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                ),
+                "project": x[1],
+                "user": x[2],
+                "resource": x[3],
+                "samples": x[4],
+                "avg": round(x[5], 2),
+                "peak": x[6],
+                "quota": "unlimited" if isNone(x[7]) else x[7],
+                "avg_pct": pct(x[8]),
+                "peak_pct": pct(x[9]),
+            }
+            for x in rows
+        ]
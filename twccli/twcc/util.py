@@ -1,4 +1,5 @@
 import datetime
+import functools
 import json
 import os
 import re
@@ -18,6 +19,7 @@ from colorclass import Color
 from termcolor import cprint
 from terminaltables import AsciiTable
 from twccli.twccli import pass_environment
+from twccli.twcc import profiler
 
 os.environ["LANG"] = "C.UTF-8"
 os.environ["LC_ALL"] = "C.UTF-8"
@@ -163,11 +165,13 @@ def _table_layout_data_cell_format(cell_ele, is_warp=True):
         ptn = "[{0:02d}] {1}\n" if len(ele) > 9 else "[{0:01d}] {1}\n"
         for idz in range(len(ele)):
             out_buf = ele[idz]
-            try:
-                out_buf = json.loads(out_buf)
-                out_buf = json.dumps(out_buf, indent=2, separators=(",", ": "))
-            except:
-                pass
+            # only strings that look like a JSON document are worth parsing
+            if type(out_buf) == type("") and out_buf[:1] in ("{", "["):
+                try:
+                    out_buf = json.loads(out_buf)
+                    out_buf = json.dumps(out_buf, indent=2, separators=(",", ": "))
+                except ValueError:
+                    pass
             tmp += ptn.format(idz + 1, out_buf)
         return tmp
     elif type(ele) == type({}):  # for dictionary
@@ -189,19 +193,40 @@ def _table_layout_colorful_val(val):
     )
 
 
+_PLAIN_CAPTION_PTN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _table_layout_compile_caption(cap):
+    """Build a getter for one table column.
+
+    Plain keys are read with `dict.get`, other captions are compiled once
+    as jmespath expressions. Captions which are not valid expressions,
+    ie. "members_IP,status", fall back to a literal key lookup.
+
+    Args:
+        cap (str): column caption
+
+    Returns:
+        function: takes a row (dict) and returns the cell value
+    """
+    if _PLAIN_CAPTION_PTN.match(cap):
+        return lambda ele: ele.get(cap) if type(ele) == type({}) else None
+    try:
+        return jmespath.compile(cap).search
+    except jmespath.exceptions.JMESPathError:
+        return lambda ele: ele[cap] if cap in ele else ""
+
+
+def _table_layout_compile_captions(caption_row):
+    return [_table_layout_compile_caption(cap) for cap in caption_row]
+
+
 def _table_layout_arrange_table_info(json_obj, caption_row):
+    getters = _table_layout_compile_captions(caption_row)
     table_info = []
     table_info.append([x for x in caption_row])
     for ele in json_obj:
-        row_data = []
-        for cap in caption_row:
-            try:
-                val = jmespath.search(cap, ele)
-            except jmespath.exceptions.ParseError:
-                val = ele[cap] if cap in ele else ""
-
-            row_data.append(_table_layout_colorful_val(val))
-        table_info.append(row_data)
+        table_info.append([_table_layout_colorful_val(get(ele)) for get in getters])
     return table_info
 
 
@@ -214,21 +239,14 @@ def _table_layout_data_cell_layout(list_of_list, is_warp=True):
     return list_of_list
 
 
-def table_layout(
+def _table_layout_ascii(
     title,
     json_obj,
-    caption_row=[],
+    caption_row,
     debug=False,
     is_warp=True,
-    max_len=10,
     isPrint=False,
-    captionInOrder=False,
 ):
-    json_obj = [json_obj] if type(json_obj) == type({}) else json_obj
-    caption_row = _table_layout_set_default_caption(
-        json_obj, caption_row, keep_order=captionInOrder
-    )
-
     start_time = time.time()
 
     table = AsciiTable(
@@ -247,6 +265,267 @@ def table_layout(
         return table.table
 
 
+@profiler.timed("table")
+def table_layout(
+    title,
+    json_obj,
+    caption_row=[],
+    debug=False,
+    is_warp=True,
+    max_len=10,
+    isPrint=False,
+    captionInOrder=False,
+):
+    json_obj = [json_obj] if type(json_obj) == type({}) else json_obj
+
+    # huge listings are streamed, AsciiTable needs every row in memory
+    if isPrint and len(json_obj) > int(
+        get_environment_params("TWCC_TABLE_STREAM_ROWS", 1000)
+    ):
+        return stream_table_layout(
+            title,
+            json_obj,
+            caption_row,
+            captionInOrder=captionInOrder,
+            debug=debug,
+            is_warp=is_warp,
+            max_len=max_len,
+        )
+
+    caption_row = _table_layout_set_default_caption(
+        json_obj, caption_row, keep_order=captionInOrder
+    )
+    return _table_layout_ascii(
+        title, json_obj, caption_row, debug=debug, is_warp=is_warp, isPrint=isPrint
+    )
+
+
+_RE_COLOR_ANSI = re.compile(r"(\033\[[\d;]+m)")
+
+
+def _char_width(char):
+    return 2 if unicodedata.east_asian_width(char) in ("F", "W") else 1
+
+
+@functools.lru_cache(maxsize=8192)
+def _visible_width(text):
+    """Display width of a cell, same measurement as terminaltables"""
+    if "\033" in text:
+        text = _RE_COLOR_ANSI.sub("", text)
+    return sum([_char_width(char) for char in text])
+
+
+@functools.lru_cache(maxsize=8192)
+def _truncate_to_width(text, width):
+    if _visible_width(text) <= width:
+        return text
+    text = _RE_COLOR_ANSI.sub("", text)
+    mark = "..." if width > 3 else ""
+    used = 0
+    for idx, char in enumerate(text):
+        used += _char_width(char)
+        if used > width - len(mark):
+            return text[:idx] + mark
+    return text
+
+
+def _stream_table_cell(val):
+    val = _table_layout_colorful_val(val)
+    if type(val) in (type([]), type({})):
+        val = _table_layout_data_cell_format(val, is_warp=False)
+    return "" if isNone(val) else ("%s" % val).strip().replace("\n", " ")
+
+
+@profiler.timed("table")
+def stream_table_layout(
+    title,
+    rows,
+    caption_row=[],
+    col_widths=None,
+    sample_rows=None,
+    max_width=None,
+    captionInOrder=False,
+    out=None,
+    debug=False,
+    is_warp=True,
+    max_len=10,
+):
+    """Print a table row by row with a fixed layout.
+
+    Column widths come from `col_widths`, or from the first `sample_rows`
+    rows capped at `max_width`; longer cells are truncated instead of
+    wrapped. When every row fits in the sample and no widths are declared
+    the regular AsciiTable output is printed, so small listings look the
+    same as with `table_layout`.
+
+    Args:
+        title (str): table title
+        rows (iterable): dicts, a list or a generator
+        caption_row (list): columns, same syntax as `table_layout`
+        col_widths (list or dict): fixed widths by position or by caption
+        sample_rows (int): rows used to size columns, default 200
+        max_width (int): upper bound of a sampled column width, default 40
+        captionInOrder (bool): keep caption_row order
+        out (file): defaults to sys.stdout
+        debug, is_warp, max_len: as in `table_layout`, for the small output
+
+    Returns:
+        int: number of rows printed
+    """
+    import itertools
+
+    if isNone(sample_rows):
+        sample_rows = int(get_environment_params("TWCC_TABLE_SAMPLE_ROWS", 200))
+    if isNone(max_width):
+        max_width = int(get_environment_params("TWCC_TABLE_MAX_WIDTH", 40))
+    out = sys.stdout if isNone(out) else out
+
+    rows = iter([rows] if type(rows) == type({}) else rows)
+    sample = list(itertools.islice(rows, sample_rows))
+    peek = next(rows, None)
+    if isNone(peek) and isNone(col_widths):
+        caption_row = _table_layout_set_default_caption(
+            sample, list(caption_row), keep_order=captionInOrder
+        )
+        out.write(
+            _table_layout_ascii(
+                title, sample, caption_row, debug=debug, is_warp=is_warp
+            )
+        )
+        out.write("\n")
+        return len(sample)
+    if not isNone(peek):
+        sample.append(peek)
+
+    caption_row = _table_layout_set_default_caption(
+        sample, list(caption_row), keep_order=captionInOrder
+    )
+    getters = _table_layout_compile_captions(caption_row)
+
+    def mk_cells(ele):
+        return [_stream_table_cell(get(ele)) for get in getters]
+
+    sample_cells = [mk_cells(ele) for ele in sample]
+
+    widths = []
+    for idx, cap in enumerate(caption_row):
+        if type(col_widths) == type({}) and cap in col_widths:
+            width = col_widths[cap]
+        elif type(col_widths) == type([]) and idx < len(col_widths):
+            width = col_widths[idx]
+        else:
+            width = max(
+                [_visible_width(cap)]
+                + [_visible_width(cells[idx]) for cells in sample_cells]
+            )
+            width = min(width, max_width)
+        widths.append(max(width, 1))
+
+    def mk_line(cells):
+        line = "|"
+        for cell, width in zip(cells, widths):
+            cell = _truncate_to_width(cell, width)
+            line += " " + cell + " " * (width - _visible_width(cell)) + " |"
+        return line
+
+    border = "+" + "+".join(["-" * (width + 2) for width in widths]) + "+"
+    top_border = border
+    title = " {} ".format(title)
+    if _visible_width(title) <= len(border) - 2:
+        top_border = border[0] + title + border[_visible_width(title) + 1 :]
+
+    out.write(top_border + "\n")
+    out.write(mk_line(caption_row) + "\n")
+    out.write(border + "\n")
+    cnt = 0
+    for cells in itertools.chain(sample_cells, (mk_cells(ele) for ele in rows)):
+        out.write(mk_line(cells) + "\n")
+        cnt += 1
+    out.write(border + "\n")
+    out.flush()
+    return cnt
+
+
+OUTPUT_FORMATS = ["ndjson", "csv", "tsv"]
+
+
+def _stream_layout_cell(val, out_fmt):
+    if out_fmt == "ndjson":
+        return val
+    if isNone(val):
+        return ""
+    if type(val) in (type([]), type({})):
+        val = json.dumps(val, ensure_ascii=False, separators=(",", ":"), default=str)
+    val = "%s" % val
+    if out_fmt == "tsv":
+        val = val.replace("\t", " ").replace("\r", " ").replace("\n", " ")
+    return val
+
+
+@profiler.timed("table")
+def stream_layout(rows, caption_row=[], out_fmt="ndjson", out=None):
+    """Write rows one at a time as NDJSON, CSV or TSV.
+
+    Unlike `table_layout` and `jpp`, nothing is buffered: every row is
+    written and flushed as soon as `rows` yields it, so generators can be
+    piped into jq/awk while the listing is still running.
+
+    Args:
+        rows (iterable): dicts, a list or a generator
+        caption_row (list): columns to emit, same syntax as `table_layout`
+        out_fmt (str): one of OUTPUT_FORMATS
+        out (file): defaults to sys.stdout
+
+    Returns:
+        int: number of rows written
+    """
+    import csv
+    import itertools
+
+    out_fmt = out_fmt.lower()
+    if not out_fmt in OUTPUT_FORMATS:
+        raise ValueError(
+            "Output format:'{0}' is not valid, available options: {1}".format(
+                out_fmt, ", ".join(OUTPUT_FORMATS)
+            )
+        )
+    out = sys.stdout if isNone(out) else out
+    rows = iter([rows] if type(rows) == type({}) else rows)
+
+    first = next(rows, None)
+    if isNone(first):
+        return 0
+    rows = itertools.chain([first], rows)
+    caption_row = _table_layout_set_default_caption([first], list(caption_row), True)
+    getters = _table_layout_compile_captions(caption_row)
+
+    writer = None
+    if out_fmt == "csv":
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(caption_row)
+    elif out_fmt == "tsv":
+        out.write("\t".join(caption_row) + "\n")
+
+    cnt = 0
+    for ele in rows:
+        cells = [_stream_layout_cell(get(ele), out_fmt) for get in getters]
+        if out_fmt == "ndjson":
+            out.write(
+                json.dumps(
+                    dict(zip(caption_row, cells)), ensure_ascii=False, default=str
+                )
+                + "\n"
+            )
+        elif out_fmt == "csv":
+            writer.writerow(cells)
+        else:
+            out.write("\t".join(cells) + "\n")
+        out.flush()
+        cnt += 1
+    return cnt
+
+
+@profiler.timed("telemetry")
 def send_ga(event_name, cid, params):
 
     if isNone(cid) or len(cid) == 0:
@@ -393,6 +672,27 @@ def mk_names(name, ids_or_names):
     return tuple(set(ids_or_names))
 
 
+def mk_batch_names(template, count):
+    """`count` names from `template`, ie: sweep-{i:02d} or sweep (sweep-1, ...)"""
+    if count < 1:
+        raise ValueError("count should be at least 1")
+    if not "{" in template:
+        if count == 1:
+            return [template]
+        template = template + "-{i}"
+    try:
+        names = [template.format(i=i) for i in range(1, count + 1)]
+    except (IndexError, KeyError, ValueError):
+        raise ValueError(
+            "Name template '{}' is not valid, use {{i}}. ie: sweep-{{i:02d}}".format(
+                template
+            )
+        )
+    if len(set(names)) < count:
+        raise ValueError("Name template '{}' repeats names.".format(template))
+    return names
+
+
 def sizeof_fmt(num, suffix="B"):
     for unit in ["", "Ki", "Mi", "Gi", "Ti", "Pi", "Ei", "Zi"]:
         if abs(num) < 1024.0:
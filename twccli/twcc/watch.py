@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""Re-lists until Ctrl-C and shows what changed, ie: `twccli ls ccs --watch`
+
+One process keeps its session and connections. The listing is polled
+every `interval` seconds while rows change or a site is in a transitional
+status (Waiting, Starting, Deleting...). After a quiet poll, the wait grows
+by half of it, up to TWCC_WATCH_MAX_INTERVAL (30) seconds. The polls skip
+the single-flight memo, the HTTP cache revalidates them.
+
+Rows are compared by `id`, a poll gives `added`, `removed` and `changed`
+events, the last one with the old and new value of every changed column.
+
+- FrameRender, on a terminal: the table and the last events, only the
+  lines which changed are written again
+- LogRender: the first table, then one line per event
+- StreamRender: one json event per line, for machines
+"""
+
+from __future__ import print_function
+import datetime
+import json
+import shutil
+import sys
+import time
+from twccli.twcc.cache import shared_single_flight
+from twccli.twcc.util import isNone, get_environment_params, table_layout
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def diff_rows(old, new, cols, key="id"):
+    """Events turning the rows old into new, both are {key: row}"""
+    events = []
+    for row_id, row in new.items():
+        if not row_id in old:
+            events.append(
+                {
+                    "event": "added",
+                    "id": row_id,
+                    "name": row.get("name", ""),
+                    "row": dict([(x, row.get(x)) for x in cols]),
+                }
+            )
+            continue
+        changes = dict(
+            [
+                (x, {"old": old[row_id].get(x), "new": row.get(x)})
+                for x in cols
+                if not old[row_id].get(x) == row.get(x)
+            ]
+        )
+        if len(changes) > 0:
+            events.append(
+                {
+                    "event": "changed",
+                    "id": row_id,
+                    "name": row.get("name", ""),
+                    "changes": changes,
+                }
+            )
+    for row_id, row in old.items():
+        if not row_id in new:
+            events.append(
+                {"event": "removed", "id": row_id, "name": row.get("name", "")}
+            )
+    return events
+
+
+def event_text(event):
+    """ie: `12:00:05 changed 1234 sweep-01 status: Waiting -> Ready`"""
+    head = "{} {} {} {}".format(
+        event["time"][-8:], event["event"], event["id"], event["name"]
+    )
+    if event["event"] == "changed":
+        return "{} {}".format(
+            head,
+            ", ".join(
+                [
+                    "{}: {} -> {}".format(k, v["old"], v["new"])
+                    for k, v in event["changes"].items()
+                ]
+            ),
+        )
+    if event["event"] == "error":
+        return "{} {}".format(head, event["message"])
+    return head
+
+
+def is_busy(row):
+    return str(row.get("status", "")).endswith("ing")
+
+
+class Watcher(object):
+    def __init__(self, fetch, cols, interval=2.0, max_interval=None, key="id"):
+        """
+        Args:
+            fetch (function): fetch() returns the rows
+            cols (list): the columns compared and shown
+            interval (float): seconds between polls while things change
+            max_interval (float): TWCC_WATCH_MAX_INTERVAL
+            key (str): the column identifying a row
+        """
+        self.fetch = fetch
+        self.cols = cols
+        self.interval = float(interval)
+        self.max_interval = max(
+            self.interval,
+            float(
+                get_environment_params("TWCC_WATCH_MAX_INTERVAL", 30)
+                if isNone(max_interval)
+                else max_interval
+            ),
+        )
+        self.key = key
+        self.wait = self.interval
+        self.rows = None
+
+    def poll(self):
+        """Lists again, returns the events since the last poll"""
+        with shared_single_flight().fresh():
+            try:
+                rows = self.fetch()
+            except Exception as e:
+                # a failed poll does not end the watch, the next one may work
+                self.wait = min(self.max_interval, self.wait * 2)
+                return [
+                    {
+                        "time": _now(),
+                        "event": "error",
+                        "id": "",
+                        "name": "",
+                        "message": "%s" % e,
+                    }
+                ]
+        new = dict([(x[self.key], x) for x in rows if self.key in x])
+        events = diff_rows(
+            {} if isNone(self.rows) else self.rows, new, self.cols, self.key
+        )
+        self.rows = new
+        for event in events:
+            event["time"] = _now()
+        if len(events) > 0 or any([is_busy(x) for x in new.values()]):
+            self.wait = self.interval
+        else:
+            self.wait = min(self.max_interval, self.wait * 1.5)
+        return events
+
+    def run(self, render, max_polls=None, sleep=time.sleep):
+        """Polls until Ctrl-C or max_polls, render(watcher, events) shows them"""
+        polls = 0
+        try:
+            while isNone(max_polls) or polls < max_polls:
+                render(self, self.poll())
+                polls += 1
+                if isNone(max_polls) or polls < max_polls:
+                    sleep(self.wait)
+        except KeyboardInterrupt:
+            pass
+
+
+class StreamRender(object):
+    """One json event per line"""
+
+    def __init__(self, out=None):
+        self.out = sys.stdout if isNone(out) else out
+
+    def __call__(self, watcher, events):
+        for event in events:
+            self.out.write(json.dumps(event, default=str) + "\n")
+        self.out.flush()
+
+
+class LogRender(object):
+    """The first table, then one line per event"""
+
+    def __init__(self, title, out=None):
+        self.title = title
+        self.out = sys.stdout if isNone(out) else out
+        self.is_first = True
+
+    def __call__(self, watcher, events):
+        if self.is_first:
+            self.is_first = False
+            self.out.write(_table_text(self.title, watcher) + "\n")
+            events = [x for x in events if not x["event"] == "added"]
+        for event in events:
+            self.out.write(event_text(event) + "\n")
+        self.out.flush()
+
+
+def _table_text(title, watcher):
+    rows = [] if isNone(watcher.rows) else list(watcher.rows.values())
+    if len(rows) == 0:
+        return "No {}.".format(title)
+    return table_layout(title, rows, watcher.cols, isPrint=False, captionInOrder=True)
+
+
+class FrameRender(object):
+    """The table and the last events, only changed lines are written again"""
+
+    def __init__(self, title, out=None, max_events=None):
+        self.title = title
+        self.out = sys.stdout if isNone(out) else out
+        self.max_events = int(
+            get_environment_params("TWCC_WATCH_EVENTS", 10)
+            if isNone(max_events)
+            else max_events
+        )
+        self.events = []
+        self.lines = []
+
+    def frame(self, watcher):
+        lines = _table_text(self.title, watcher).splitlines()
+        lines.append("")
+        lines += [event_text(x) for x in self.events]
+        lines.append(
+            "{} next poll in {:g}s, Ctrl-C to stop".format(
+                _now(), round(watcher.wait, 1)
+            )
+        )
+        return lines
+
+    def __call__(self, watcher, events):
+        if len(self.lines) == 0:
+            # the first table shows them
+            events = [x for x in events if not x["event"] == "added"]
+        self.events = (self.events + events)[-self.max_events :]
+        lines = self.frame(watcher)
+        buf = []
+        if max(len(lines), len(self.lines)) >= shutil.get_terminal_size().lines:
+            # the lines scrolled away cannot be reached, paint it all again
+            buf.append("\033[H\033[2J")
+            self.lines = []
+        elif len(self.lines) > 0:
+            # back to the first line of the last frame
+            buf.append("\r\033[%dA" % len(self.lines))
+        for idx, line in enumerate(lines):
+            if idx >= len(self.lines) or not self.lines[idx] == line:
+                buf.append("\033[2K" + line)
+            buf.append("\n")
+        if len(lines) < len(self.lines):
+            # the frame is shorter, clear what is left of the last one
+            buf.append("\033[J")
+        self.out.write("".join(buf))
+        self.out.flush()
+        self.lines = lines
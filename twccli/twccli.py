@@ -2,12 +2,15 @@
 import click
 import os
 import sys
+import time
 import yaml
 import requests
 import feedparser
 from os import path
 from urllib.parse import urlparse
 
+# process start, for the wall time of --profile
+_START_TIME_ = time.time()
 
 if "TWCC_DATA_PATH" in os.environ and os.path.isdir(os.environ["TWCC_DATA_PATH"]):
     _TWCC_DATA_DIR_ = os.environ["TWCC_DATA_PATH"]
@@ -177,8 +180,54 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
     is_flag=True,
     help="Enables verbose mode and show in console.",
 )
+@click.option(
+    "--no-cache",
+    "no_cache",
+    is_flag=True,
+    help="Do not use cached solutions, flavors and images.",
+)
+@click.option(
+    "--refresh-cache",
+    "refresh_cache",
+    is_flag=True,
+    help="Fetch solutions, flavors and images again and update the cache.",
+)
+@click.option(
+    "--profile",
+    "profile",
+    is_flag=True,
+    help="Print API calls, latency and time spent per stage at exit.",
+)
+@click.option(
+    "--profile-json",
+    "profile_json",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the --profile summary to this json file.",
+)
+@click.option(
+    "--trace-file",
+    "trace_file",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Append tracing spans to this file as OTLP json lines.",
+)
+@click.option(
+    "--metrics-file",
+    "metrics_file",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write Prometheus textfile metrics of this run to this file.",
+)
 @pass_environment
-def cli(env, verbose, show_and_verbose):
+def cli(
+    env,
+    verbose,
+    show_and_verbose,
+    no_cache,
+    refresh_cache,
+    profile,
+    profile_json,
+    trace_file,
+    metrics_file,
+):
     """\b
      _______      _____    ___\b
     |_   _\ \    / / __|  / __|___\b
@@ -194,7 +243,47 @@ def cli(env, verbose, show_and_verbose):
 
       Powered by https://TWS.twcc.ai
     """
+    ctx = click.get_current_context()
+    # ie: "ls vcs", for span and metric names
+    cmd_name = " ".join(
+        [str(ctx.invoked_subcommand)]
+        + [x for x in ctx.args if not x.startswith("-")][:1]
+    )
+    if metrics_file is None:
+        metrics_file = os.environ.get("TWCC_METRICS_FILE") or None
+    if profile or not profile_json is None or not metrics_file is None:
+        from twccli.twcc import profiler
+
+        profiler.enable(
+            start_time=_START_TIME_, is_print=profile, json_path=profile_json
+        )
+        ctx.call_on_close(profiler.recordExit)
+    if not metrics_file is None:
+        from twccli.twcc import metrics
+
+        metrics.enable(metrics_file, command=cmd_name)
+    if not trace_file is None or os.environ.get("TWCC_TRACE_FILE"):
+        from twccli.twcc import tracing
+        from .version import __version__
+
+        if not trace_file is None:
+            # this command only, not the next lines of a batch or the daemon
+            ctx.with_resource(tracing.using_file(trace_file))
+        tracing.start_span(
+            "twccli " + cmd_name,
+            {
+                "twccli.args": " ".join(tracing.redact_args(sys.argv[1:])),
+                "twccli.version": __version__,
+            },
+            is_root=True,
+        )
+        ctx.call_on_close(tracing.end_root)
     env.verbose = verbose
+    if no_cache or refresh_cache:
+        from twccli.twcc.cache import using_cache_mode
+
+        # this thread only, the lines of a batch run at once
+        ctx.with_resource(using_cache_mode("off" if no_cache else "refresh"))
     check_if_py2()
     convert_credential()
     if show_and_verbose: